@@ -0,0 +1,171 @@
+"""Offline suggestions for mapping framework controls onto unified controls.
+
+Unified controls (name + description) are vectorized into an L2-normalised
+TF-IDF matrix with sublinear term frequencies over word unigrams and bigrams.
+Framework controls (title + description + testing procedure) are projected
+into the same vocabulary. Cosine similarity is then a sparse matrix product,
+done in batches of framework controls so memory stays bounded for large
+catalogs. The top-k per row comes from a partition around the k-th best
+score; ties go to the earlier unified control, so results are repeatable.
+Unified controls already mapped to a framework control are left out of its
+suggestions.
+
+The unified-control matrix is cached against the `unified_controls` catalog
+version. It is refit only after a control is created or remapped, so
+repeated suggestion runs only vectorize the framework side. Everything runs
+locally; no text leaves the process.
+"""
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this to
+with within all any each must shall should such where which who will be been being per via
+""".split())
+
+DEFAULT_BATCH_SIZE = 512
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word unigrams plus adjacent-word bigrams, stop words removed"""
+    words = [w for w in TOKEN_RE.findall(text.lower()) if w not in STOP_WORDS and len(w) > 1]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfIndex:
+    """TF-IDF vocabulary and document matrix fitted on one corpus"""
+
+    def __init__(self, documents: Sequence[str]):
+        tokenized = [tokenize(d) for d in documents]
+        df = Counter()
+        for tokens in tokenized:
+            df.update(set(tokens))
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(sorted(df))}
+        n_docs = len(documents)
+        # Smoothed idf, as in scikit-learn
+        self.idf = np.array(
+            [math.log((1 + n_docs) / (1 + df[term])) + 1 for term in sorted(df)], dtype=np.float64
+        )
+        self.matrix = self._vectorize(tokenized)
+
+    def transform(self, documents: Sequence[str]) -> sparse.csr_matrix:
+        """Vectorize new documents in this index's vocabulary; unseen terms are dropped"""
+        return self._vectorize([tokenize(d) for d in documents])
+
+    def _vectorize(self, tokenized: Sequence[List[str]]) -> sparse.csr_matrix:
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for tokens in tokenized:
+            counts = Counter(t for t in tokens if t in self.vocabulary)
+            for term, count in counts.items():
+                indices.append(self.vocabulary[term])
+                data.append(1.0 + math.log(count))
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(tokenized), len(self.vocabulary)),
+        )
+        matrix = matrix.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms).dot(matrix).tocsr()
+
+
+def top_k_cosine(queries: sparse.csr_matrix, corpus: sparse.csr_matrix, k: int,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and scores of the k most similar corpus rows for every query row, best first.
+
+    Both matrices must be L2-normalised, so the dot product is the cosine.
+    Equal scores are ordered by corpus row.
+    """
+    n_queries, n_corpus = queries.shape[0], corpus.shape[0]
+    k = min(k, n_corpus)
+    top_idx = np.zeros((n_queries, k), dtype=np.int64)
+    top_scores = np.zeros((n_queries, k), dtype=np.float64)
+    if k == 0:
+        return top_idx, top_scores
+    corpus_t = corpus.T.tocsc()
+    for start in range(0, n_queries, batch_size):
+        neg = -(queries[start:start + batch_size] @ corpus_t).toarray()
+        # Everything scoring at least the k-th best, so ties at the cut are all candidates
+        kth = np.partition(neg, k - 1, axis=1)[:, k - 1:k]
+        rows, cols = np.nonzero(neg <= kth)
+        order = np.lexsort((cols, neg[rows, cols], rows))  # by row, best score, then corpus row
+        rows, cols = rows[order], cols[order]
+        first = np.searchsorted(rows, np.arange(neg.shape[0]))
+        picked = cols[first[:, None] + np.arange(k)]
+        top_idx[start:start + batch_size] = picked
+        top_scores[start:start + batch_size] = -np.take_along_axis(neg, picked, axis=1)
+    return top_idx, top_scores
+
+
+def unified_control_text(control: Dict) -> str:
+    return f"{control.get('name', '')} {control.get('description', '')}"
+
+
+def framework_control_text(control: Dict) -> str:
+    return " ".join(filter(None, [control.get("title"), control.get("description"), control.get("testing_procedure")]))
+
+
+class AutoMapper:
+    """Suggests unified controls for framework controls; caches the unified-control side"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._controls: List[Dict] = []
+        self._index: Optional[TfidfIndex] = None
+
+    def is_current(self, version: int) -> bool:
+        return self._index is not None and self._version == version
+
+    def fit(self, unified_controls: List[Dict], version: int):
+        """Vectorize the unified controls for a catalog version"""
+        index = TfidfIndex([unified_control_text(c) for c in unified_controls])
+        with self._lock:
+            self._controls, self._index, self._version = unified_controls, index, version
+
+    def suggest(self, framework_controls: List[Dict], top_k: int = 5, min_score: float = 0.1,
+                mapped: Optional[Dict[str, Set[str]]] = None) -> List[Dict]:
+        """Top-k candidate unified controls per framework control.
+
+        `mapped` is {framework control id: unified control ids already mapped to it}; those are left out.
+        """
+        with self._lock:
+            controls, index = self._controls, self._index
+        if index is None or not controls or not framework_controls:
+            return [{"framework_control_id": fc.get("id"), "candidates": []} for fc in framework_controls]
+
+        mapped = mapped or {}
+        # Ask for enough extra rows that excluding the mapped ones still leaves top_k
+        extra = max((len(mapped.get(fc.get("id"), ())) for fc in framework_controls), default=0)
+        queries = index.transform([framework_control_text(fc) for fc in framework_controls])
+        top_idx, top_scores = top_k_cosine(queries, index.matrix, top_k + extra)
+        results = []
+        for fc, idx_row, score_row in zip(framework_controls, top_idx, top_scores):
+            exclude = mapped.get(fc.get("id"), set())
+            candidates = [
+                {
+                    "unified_control_id": controls[i].get("id"),
+                    "ccf_id": controls[i].get("ccf_id"),
+                    "name": controls[i].get("name"),
+                    "score": round(float(score), 4),
+                }
+                for i, score in zip(idx_row, score_row)
+                if score >= min_score and controls[i].get("id") not in exclude
+            ][:top_k]
+            results.append({
+                "framework_control_id": fc.get("id"),
+                "control_id": fc.get("control_id"),
+                "title": fc.get("title"),
+                "candidates": candidates,
+            })
+        return results
@@ -0,0 +1,207 @@
+"""Near-duplicate detection for unified controls and policies (MinHash + LSH).
+
+Each document's text is reduced to a set of word 3-gram shingles, hashed to
+32 bits. A MinHash signature of `NUM_PERM` values is computed in one
+vectorized pass per document; the fraction of equal positions in two
+signatures estimates the Jaccard similarity of their shingle sets.
+Signatures are split into `BANDS` bands of `ROWS` rows. Two documents become
+a candidate pair only if some band hashes to the same bucket, so finding
+duplicates costs about one bucket lookup per band instead of n² comparisons.
+Candidates are then verified against the threshold using the signature estimate.
+
+With 16 bands x 8 rows, a pair becomes a candidate with probability ~0.6 at
+Jaccard 0.7, >0.99 at 0.85, and ~0.01 at 0.4.
+
+Run as a batch job:
+    python dedup.py --collection unified_controls --threshold 0.7
+"""
+import argparse
+import os
+import re
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.7
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(1)  # fixed seed: signatures must be comparable across runs
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Text compared per collection
+DEDUP_FIELDS = {
+    "unified_controls": ("name", "description"),
+    "policies": ("name", "description"),
+}
+
+
+def document_text(doc: Dict, fields: Iterable[str]) -> str:
+    return " ".join(str(doc.get(f) or "") for f in fields)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """32-bit hashes of the word n-grams of `text`"""
+    words = TOKEN_RE.findall(text.lower())
+    if len(words) < size:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.fromiter({zlib.crc32(g.encode("utf-8")) for g in grams}, dtype=np.uint64)
+
+
+def minhash(shingle_hashes: np.ndarray) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32 values); an empty set gets an all-max signature"""
+    if shingle_hashes.size == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    # (a * x + b) mod p for every permutation/shingle pair; the product wraps at 2^64 by design
+    with np.errstate(over="ignore"):
+        hashed = (np.outer(_PERM_A, shingle_hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return (hashed.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+class MinHashLSH:
+    """Banded LSH index over MinHash signatures, with incremental add/remove"""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._buckets: List[Dict[bytes, set]] = [defaultdict(set) for _ in range(BANDS)]
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _bands(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * ROWS:(i + 1) * ROWS].tobytes() for i in range(BANDS)]
+
+    def add(self, key: str, signature: np.ndarray):
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = signature
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            bucket[band].add(key)
+
+    def remove(self, key: str):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            members = bucket.get(band)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del bucket[band]
+
+    def query(self, signature: np.ndarray, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Indexed keys at or above the threshold, most similar first"""
+        candidates = set()
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            candidates |= bucket.get(band, set())
+        candidates.discard(exclude)
+        matches = [(key, similarity(signature, self._signatures[key])) for key in candidates]
+        return sorted((m for m in matches if m[1] >= self.threshold), key=lambda m: -m[1])
+
+    def candidate_pairs(self) -> Iterable[Tuple[str, str]]:
+        """Every pair sharing at least one bucket, each yielded once"""
+        seen = set()
+        for bucket in self._buckets:
+            for members in bucket.values():
+                if len(members) < 2:
+                    continue
+                ordered = sorted(members)
+                for i, a in enumerate(ordered):
+                    for b in ordered[i + 1:]:
+                        if (a, b) not in seen:
+                            seen.add((a, b))
+                            yield a, b
+
+    def clusters(self) -> List[Dict]:
+        """Groups of near-duplicates (connected components of verified pairs), largest first"""
+        parent: Dict[str, str] = {}
+
+        def find(x):
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        pairs = []
+        for a, b in self.candidate_pairs():
+            score = similarity(self._signatures[a], self._signatures[b])
+            if score >= self.threshold:
+                pairs.append((a, b, score))
+                parent[find(a)] = find(b)
+
+        groups: Dict[str, Dict] = {}
+        for a, b, score in pairs:
+            group = groups.setdefault(find(a), {"members": set(), "pairs": []})
+            group["members"].update((a, b))
+            group["pairs"].append({"a": a, "b": b, "score": round(score, 3)})
+
+        result = []
+        for group in groups.values():
+            scores = [p["score"] for p in group["pairs"]]
+            result.append({
+                "members": sorted(group["members"]),
+                "max_score": max(scores),
+                "min_score": min(scores),
+                "pairs": sorted(group["pairs"], key=lambda p: -p["score"]),
+            })
+        return sorted(result, key=lambda g: (-len(g["members"]), -g["max_score"]))
+
+
+def build_index(docs: Iterable[Dict], fields: Iterable[str], threshold: float = DEFAULT_THRESHOLD) -> MinHashLSH:
+    fields = tuple(fields)
+    index = MinHashLSH(threshold)
+    for doc in docs:
+        hashes = shingles(document_text(doc, fields))
+        if hashes.size:  # blank documents would all "match" each other
+            index.add(doc["id"], minhash(hashes))
+    return index
+
+
+def main():
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", choices=sorted(DEDUP_FIELDS), default="unified_controls")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--db", default=None, help="Override the database name")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / ".env")
+    client = MongoClient(args.mongo_url or os.getenv("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[args.db or os.environ["DB_NAME"]]
+
+    fields = DEDUP_FIELDS[args.collection]
+    projection = {"_id": 0, "id": 1, **{f: 1 for f in fields}}
+    docs = {d["id"]: d for d in db[args.collection].find({}, projection)}
+    index = build_index(docs.values(), fields, args.threshold)
+    clusters = index.clusters()
+
+    print(f"{len(docs)} {args.collection} indexed, {len(clusters)} near-duplicate cluster(s) at >= {args.threshold}")
+    for n, cluster in enumerate(clusters, 1):
+        print(f"\nCluster {n}: {len(cluster['members'])} documents, similarity {cluster['min_score']:.2f}-{cluster['max_score']:.2f}")
+        for doc_id in cluster["members"]:
+            print(f"  {doc_id}: {docs[doc_id].get('name', '')}")
+
+
+if __name__ == "__main__":
+    main()
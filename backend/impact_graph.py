@@ -0,0 +1,229 @@
+"""Dependency graph for failure impact analysis.
+
+Nodes are (kind, id) pairs for unified controls, framework controls,
+frameworks, policies, risks, KRIs and KCIs. Edges come from the ID links
+already stored on the documents (`mapped_framework_controls`,
+`linked_control_ids`, `kri_id`, ...). Each document owns the edges
+derived from its own fields. Re-applying a document diffs its old and new
+edge sets, and edge reference counts let a link stored on both ends (risk.kri_ids
+and kri.risk_id) survive the removal of either.
+
+`impact(control_id)` is a breadth-first walk that follows only the
+directions in which a failure propagates (`PROPAGATES_TO`). A failed control
+weakens the requirements and policies it implements, the risks it
+mitigates and the KCIs that measure it. A KCI feeds its KRI, a KRI signals
+its risk, and an elevated risk moves its other KRIs. It does not reach other
+controls of the same risk.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from live import ChangeConsumer
+
+logger = logging.getLogger(__name__)
+
+Node = Tuple[str, str]
+
+# Collection -> node kind
+NODE_KINDS = {
+    "unified_controls": "control",
+    "framework_controls": "framework_control",
+    "frameworks": "framework",
+    "policies": "policy",
+    "risks": "risk",
+    "kris": "kri",
+    "kcis": "kci",
+}
+
+# Collection -> (field, kind of the node(s) it references)
+LINK_FIELDS = {
+    "unified_controls": [("mapped_framework_controls", "framework_control"), ("mapped_policies", "policy")],
+    "framework_controls": [("framework_id", "framework")],
+    "risks": [("linked_control_ids", "control"), ("kri_ids", "kri")],
+    "kris": [("risk_id", "risk"), ("kci_ids", "kci")],
+    "kcis": [("kri_id", "kri"), ("unified_control_id", "control")],
+}
+
+# Collection -> fields used as the node's display label, first present wins
+LABEL_FIELDS = {
+    "unified_controls": ("ccf_id", "name"),
+    "framework_controls": ("control_id", "title"),
+    "frameworks": ("name",),
+    "policies": ("policy_id", "name"),
+    "risks": ("name",),
+    "kris": ("name",),
+    "kcis": ("name",),
+}
+
+# Kind -> kinds a failure spreads to
+PROPAGATES_TO = {
+    "control": {"framework_control", "policy", "risk", "kci"},
+    "framework_control": {"framework"},
+    "kci": {"kri"},
+    "kri": {"risk"},
+    "risk": {"kri"},
+}
+
+
+def graph_projection(collection: str) -> Dict:
+    fields = [f for f, _ in LINK_FIELDS.get(collection, [])] + list(LABEL_FIELDS[collection])
+    return {"_id": 0, "id": 1, **{f: 1 for f in fields}}
+
+
+def _links(collection: str, doc: Dict) -> Set[Node]:
+    targets = set()
+    for field, kind in LINK_FIELDS.get(collection, []):
+        value = doc.get(field)
+        for target in value if isinstance(value, list) else [value]:
+            if target:
+                targets.add((kind, target))
+    return targets
+
+
+class ImpactGraph:
+    """Undirected adjacency sets with reference-counted edges and per-document ownership"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._adj: Dict[Node, Dict[Node, int]] = {}
+        self._owned: Dict[Node, Set[Node]] = {}  # document node -> targets of its link fields
+        self._labels: Dict[Node, str] = {}
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(n) for n in self._adj.values()) // 2
+
+    def build(self, docs_by_collection: Dict[str, Iterable[Dict]]):
+        with self._lock:
+            self._reset()
+            for collection, docs in docs_by_collection.items():
+                for doc in docs:
+                    self._upsert(collection, doc)
+
+    def upsert(self, collection: str, doc: Dict):
+        with self._lock:
+            self._upsert(collection, doc)
+
+    def remove(self, collection: str, doc_id: str):
+        with self._lock:
+            node = (NODE_KINDS[collection], doc_id)
+            self._relink(node, set())
+            self._labels.pop(node, None)
+            if not self._adj.get(node):
+                self._adj.pop(node, None)
+
+    def _upsert(self, collection: str, doc: Dict):
+        node = (NODE_KINDS[collection], doc["id"])
+        self._labels[node] = " ".join(str(doc[f]) for f in LABEL_FIELDS[collection] if doc.get(f))
+        self._adj.setdefault(node, {})
+        self._relink(node, _links(collection, doc))
+
+    def _relink(self, node: Node, targets: Set[Node]):
+        old = self._owned.get(node, set())
+        for target in old - targets:
+            for a, b in ((node, target), (target, node)):
+                count = self._adj[a][b] - 1
+                if count:
+                    self._adj[a][b] = count
+                else:
+                    del self._adj[a][b]
+            if not self._adj[target] and target not in self._labels:
+                del self._adj[target]  # placeholder for a document we never saw
+        for target in targets - old:
+            for a, b in ((node, target), (target, node)):
+                neighbors = self._adj.setdefault(a, {})
+                neighbors[b] = neighbors.get(b, 0) + 1
+        if targets:
+            self._owned[node] = targets
+        else:
+            self._owned.pop(node, None)
+
+    def impact(self, control_id: str, max_depth: Optional[int] = None) -> Optional[Dict]:
+        """Everything a failure of `control_id` reaches, grouped by kind; None for unknown controls"""
+        start = ("control", control_id)
+        with self._lock:
+            if start not in self._adj:
+                return None
+            parent: Dict[Node, Optional[Node]] = {start: None}
+            depth = {start: 0}
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                if max_depth is not None and depth[node] >= max_depth:
+                    continue
+                spreads_to = PROPAGATES_TO.get(node[0], ())
+                for neighbor in self._adj[node]:
+                    if neighbor[0] in spreads_to and neighbor not in parent:
+                        parent[neighbor] = node
+                        depth[neighbor] = depth[node] + 1
+                        queue.append(neighbor)
+            affected: Dict[str, List[Dict]] = {}
+            for node, via in parent.items():
+                if node == start:
+                    continue
+                affected.setdefault(node[0], []).append({
+                    "id": node[1],
+                    "label": self._labels.get(node, ""),
+                    "depth": depth[node],
+                    "via": {"kind": via[0], "id": via[1]},
+                })
+            return {
+                "control": {"id": control_id, "label": self._labels.get(start, "")},
+                "affected": affected,
+                "counts": {kind: len(nodes) for kind, nodes in affected.items()},
+            }
+
+
+KIND_LABELS = {
+    "risk": ("risk", "risks"),
+    "kri": ("KRI", "KRIs"),
+    "kci": ("KCI", "KCIs"),
+    "framework_control": ("framework control", "framework controls"),
+    "framework": ("framework", "frameworks"),
+    "policy": ("policy", "policies"),
+}
+
+
+def summarize(impact: Dict) -> str:
+    """One line such as: 2 risks, 1 KRI, 4 framework controls, 2 frameworks (ISO 27001, SOC 2)"""
+    parts = []
+    for kind, (singular, plural) in KIND_LABELS.items():
+        nodes = impact["affected"].get(kind, [])
+        if not nodes:
+            continue
+        text = f"{len(nodes)} {singular if len(nodes) == 1 else plural}"
+        if kind == "framework":
+            text += f" ({', '.join(sorted(n['label'] or n['id'] for n in nodes))})"
+        parts.append(text)
+    return ", ".join(parts) or "nothing linked"
+
+
+class ImpactGraphUpdater(ChangeConsumer):
+    """Builds the graph from the database and applies every change published on the hub"""
+
+    collections = tuple(NODE_KINDS)
+    name = "Impact graph"
+
+    def __init__(self, db, hub, graph: ImpactGraph):
+        super().__init__(db, hub)
+        self._graph = graph
+
+    def projection(self, collection: str) -> Dict:
+        return graph_projection(collection)
+
+    async def rebuild(self):
+        docs = {name: await self._db[name].find({}, graph_projection(name)).to_list(None) for name in NODE_KINDS}
+        await asyncio.get_running_loop().run_in_executor(None, self._graph.build, docs)
+        logger.info("Impact graph built: %d edges", self._graph.edge_count)
+
+    def apply(self, collection: str, op: str, doc_id: str, document: Optional[Dict]):
+        if document is None:
+            self._graph.remove(collection, doc_id)
+        else:
+            self._graph.upsert(collection, document)
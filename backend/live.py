@@ -0,0 +1,278 @@
+"""Live fan-out of data changes to connected clients.
+
+`ChangeStreamWatcher` tails a Mongo change stream for the synced collections
+and publishes each change to `ChangeHub`, which hands it to every matching
+subscriber (WebSocket / SSE connection). Change streams need a replica set.
+On a standalone mongod the watcher switches the hub to local mode, and the
+API's own writes are published in-process through `publish_local` instead.
+That covers every writer in this process, but not writes from elsewhere.
+
+Change-stream delete events only carry the Mongo `_id`, so deletes are
+read from the `sync_tombstones` inserts instead, which carry our `id`.
+
+Events look like:
+    {"collection": "issues", "op": "insert" | "update" | "delete",
+     "id": "...", "department": "..." | None, "document": {...} | None}
+`document` is None for deletes and for local-mode updates; clients that need
+the full row fetch it through `/sync`. A subscriber that falls too far behind
+is sent a single {"op": "resync"} and should re-sync from its last token.
+"""
+import abc
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Mongo error codes meaning change streams are not supported on this deployment
+CHANGE_STREAMS_UNSUPPORTED = {40573, 40415}
+TOMBSTONES = "sync_tombstones"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_event(event: Dict) -> str:
+    return json.dumps(event, default=_json_default, separators=(",", ":"))
+
+
+class Subscription:
+    """One client's filtered view of the change feed"""
+
+    def __init__(self, collections: Optional[Set[str]], department: Optional[str]):
+        self.collections = collections
+        self.department = department
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._overflowed = False
+
+    def matches(self, event: Dict) -> bool:
+        if self.collections is not None and event["collection"] not in self.collections:
+            return False
+        # Documents without a department (catalog data) are visible in every workspace
+        event_dept = event.get("department")
+        return self.department is None or event_dept is None or event_dept == self.department
+
+    def offer(self, event: Dict):
+        if self._overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._overflowed = True
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Next event, or None when `timeout` passes without one"""
+        if self._overflowed and self._queue.empty():
+            self._overflowed = False
+            return {"op": "resync"}
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ChangeHub:
+    """In-process pub/sub for change events"""
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        # True while a change stream is feeding the hub; local publishes are then redundant
+        self.change_streams_active = False
+
+    def subscribe(self, collections: Optional[Iterable[str]] = None, department: Optional[str] = None) -> Subscription:
+        sub = Subscription(set(collections) if collections else None, department)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self._subscribers.discard(sub)
+
+    def publish(self, event: Dict):
+        for sub in list(self._subscribers):
+            if sub.matches(event):
+                sub.offer(event)
+
+    def publish_local(self, collection: str, op: str, doc_id: str, document: Optional[Dict] = None):
+        """Publish a write made by this process; no-op while change streams deliver it instead"""
+        if self.change_streams_active or not self._subscribers:
+            return
+        if document is not None:
+            document = {k: v for k, v in document.items() if k != "_id"}
+        self.publish({
+            "collection": collection,
+            "op": op,
+            "id": doc_id,
+            "department": document.get("department") if document else None,
+            "document": document,
+        })
+
+
+class ChangeStreamWatcher:
+    """Tails a database change stream and feeds `hub`; resumes after transient errors"""
+
+    def __init__(self, db, hub: ChangeHub, collections: Iterable[str], max_backoff: float = 30.0):
+        self._db = db
+        self._hub = hub
+        self._collections = list(collections)
+        self._max_backoff = max_backoff
+        self._resume_token = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._hub.change_streams_active = False
+
+    async def _run(self):
+        pipeline = [
+            {"$match": {"$or": [
+                {"ns.coll": {"$in": self._collections}, "operationType": {"$in": ["insert", "update", "replace"]}},
+                {"ns.coll": TOMBSTONES, "operationType": "insert"},
+            ]}},
+        ]
+        backoff = 1.0
+        while True:
+            try:
+                async with self._db.watch(pipeline, full_document="updateLookup",
+                                          resume_after=self._resume_token) as stream:
+                    self._hub.change_streams_active = True
+                    backoff = 1.0
+                    async for change in stream:
+                        self._resume_token = change["_id"]
+                        self._hub.publish(self._to_event(change))
+            except OperationFailure as e:
+                self._hub.change_streams_active = False
+                if e.code in CHANGE_STREAMS_UNSUPPORTED or "replica set" in str(e):
+                    logger.info("Change streams unavailable (%s); using in-process change feed", e)
+                    return
+                if e.code == 286:  # ChangeStreamHistoryLost: resume point aged out of the oplog
+                    self._resume_token = None
+                logger.warning("Change stream failed: %s; retrying in %.0fs", e, backoff)
+            except PyMongoError as e:
+                self._hub.change_streams_active = False
+                logger.warning("Change stream interrupted: %s; retrying in %.0fs", e, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self._max_backoff)
+
+    @staticmethod
+    def _to_event(change: Dict) -> Dict:
+        if change["ns"]["coll"] == TOMBSTONES:
+            tombstone = change["fullDocument"]
+            return {"collection": tombstone["collection"], "op": "delete", "id": tombstone["id"],
+                    "department": None, "document": None}
+        op = "update" if change["operationType"] == "replace" else change["operationType"]
+        document = change.get("fullDocument")
+        if document is not None:
+            document = {k: v for k, v in document.items() if k != "_id"}
+        return {
+            "collection": change["ns"]["coll"],
+            "op": op,
+            "id": document.get("id") if document else None,
+            "department": document.get("department") if document else None,
+            "document": document,
+        }
+
+
+class ChangeConsumer(abc.ABC):
+    """Base for in-memory derived data kept current from a `ChangeHub`.
+
+    Subclasses set `collections` and implement `rebuild` (load everything),
+    `apply` (one insert/update/delete) and `projection`. The consumer
+    subscribes before its initial build, so no write in between is missed.
+    It rebuilds after a resync or a failed update. `ready` is clear while a
+    rebuild is in progress, and a failed rebuild is retried with backoff.
+    """
+
+    collections: Iterable[str] = ()
+    name = "consumer"
+
+    def __init__(self, db, hub: ChangeHub, max_backoff: float = 30.0):
+        self._db = db
+        self._hub = hub
+        self._max_backoff = max_backoff
+        self._task: Optional[asyncio.Task] = None
+        self.ready = asyncio.Event()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @abc.abstractmethod
+    async def rebuild(self):
+        """Load everything from the database"""
+
+    @abc.abstractmethod
+    def apply(self, collection: str, op: str, doc_id: str, document: Optional[Dict]):
+        """Apply one change; `document` is None for deletes"""
+
+    def projection(self, collection: str) -> Dict:
+        return {"_id": 0}
+
+    async def _run(self):
+        sub = self._hub.subscribe(self.collections)
+        try:
+            await self._rebuild()
+            while True:
+                event = await sub.get()
+                try:
+                    await self._handle(event)
+                except Exception as e:
+                    logger.warning("%s update failed (%s); rebuilding", self.name, e)
+                    await self._rebuild()
+        finally:
+            self._hub.unsubscribe(sub)
+
+    async def _rebuild(self):
+        """Rebuild until it succeeds; readers see `ready` clear meanwhile"""
+        self.ready.clear()
+        backoff = 1.0
+        while True:
+            try:
+                await self.rebuild()
+                break
+            except Exception as e:
+                logger.error("%s rebuild failed (%s); retrying in %.0fs", self.name, e, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self._max_backoff)
+        self.ready.set()
+
+    async def _handle(self, event: Dict):
+        if event["op"] == "resync":
+            await self._rebuild()
+            return
+        collection, doc_id = event["collection"], event.get("id")
+        if doc_id is None:
+            return
+        document = None
+        if event["op"] != "delete":
+            # Local-mode updates carry no document; read the current one
+            document = event.get("document") or await self._db[collection].find_one(
+                {"id": doc_id}, self.projection(collection)
+            )
+        self.apply(collection, "delete" if document is None else event["op"], doc_id, document)
@@ -0,0 +1,105 @@
+"""One-shot migration: convert ISO-string timestamps to native BSON datetimes.
+
+Older documents stored `created_at`, `test_date`, `collected_at`, ... as
+ISO strings. The conversion runs server-side with `$dateFromString`, so no
+documents are pulled into Python, and it only touches values that are still
+strings, so re-running it is a no-op.
+
+Usage:
+    python migrate_datetimes.py                 # backend API database (DB_NAME from backend/.env)
+    python migrate_datetimes.py --target reflex # Reflex app database
+"""
+import argparse
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+ROOT_DIR = Path(__file__).parent
+
+# Timestamp fields per collection for the backend API database
+BACKEND_FIELDS = {
+    "frameworks": ["created_at"],
+    "framework_controls": ["created_at"],
+    "unified_controls": ["created_at"],
+    "policies": ["created_at"],
+    "control_tests": ["test_date", "created_at"],
+    "evidence": ["collected_at"],
+    "issues": ["created_at", "updated_at"],
+    "risks": ["created_at"],
+    "kris": ["created_at"],
+    "kcis": ["created_at"],
+}
+
+# Reflex app database. Calendar fields typed by users (test_date, due_date,
+# start_date, ...) stay "YYYY-MM-DD"/"TBD" strings; only event timestamps move.
+REFLEX_FIELDS = {
+    "frameworks": ["created_at"],
+    "unified_controls": ["created_at"],
+    "policies": ["created_at"],
+    "control_tests": ["created_at"],
+    "issues": ["created_at"],
+    "risks": ["created_at"],
+    "kris": ["created_at"],
+    "kcis": ["created_at"],
+    "ai_models": ["created_at"],
+    "ai_assessments": ["created_at"],
+    "audits": ["created_at"],
+    "audit_findings": ["created_at"],
+    "connectors": ["created_at", "last_sync"],
+}
+
+
+def convert_field(collection, field: str) -> int:
+    """Rewrite string values of `field` as UTC datetimes; unparsable values are left untouched"""
+    result = collection.update_many(
+        {field: {"$type": "string"}},
+        [{"$set": {field: {"$dateFromString": {
+            "dateString": f"${field}",
+            "timezone": "UTC",
+            "onError": f"${field}",
+        }}}}],
+    )
+    return result.modified_count
+
+
+def migrate(db, fields_by_collection: dict, partitioned_audit_logs: bool = False):
+    existing = set(db.list_collection_names())
+    for name, fields in fields_by_collection.items():
+        if name not in existing:
+            continue
+        for field in fields:
+            print(f"  {name}.{field}: {convert_field(db[name], field)} converted")
+
+    if partitioned_audit_logs:
+        for name in sorted(existing):
+            if name.startswith("audit_logs"):
+                print(f"  {name}.timestamp: {convert_field(db[name], 'timestamp')} converted")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["backend", "reflex"], default="backend")
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--db", default=None, help="Override the database name")
+    args = parser.parse_args()
+
+    if args.target == "backend":
+        load_dotenv(ROOT_DIR / ".env")
+        db_name = args.db or os.environ["DB_NAME"]
+        fields = BACKEND_FIELDS
+    else:
+        load_dotenv(ROOT_DIR.parent / "reflex-grc" / ".env")
+        db_name = args.db or os.getenv("DB_NAME", "grc_reflex_db")
+        fields = REFLEX_FIELDS
+    mongo_url = args.mongo_url or os.getenv("MONGO_URL", "mongodb://localhost:27017")
+
+    client = MongoClient(mongo_url, tz_aware=True)
+    print(f"Migrating {args.target} database '{db_name}' to native datetimes...")
+    migrate(client[db_name], fields, partitioned_audit_logs=args.target == "reflex")
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
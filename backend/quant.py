@@ -0,0 +1,233 @@
+"""Monte Carlo quantification of the risk register.
+
+A risk can carry an optional quantitative model next to its point scores:
+
+    annual_frequency   expected loss events per year (Poisson rate)
+    loss_low/high      90% confidence interval of the loss per event; the
+                       magnitude is lognormal with those 5th/95th percentiles
+    max_loss           optional cap on a single event's loss
+
+One iteration simulates a year. Every risk draws its event count, then a
+loss per event. Annual losses are summed per risk and across the
+portfolio. A chunk of iterations is fully vectorized. Each risk draws its
+total events for the whole chunk from Poisson(frequency * iterations). Those
+events are scattered uniformly over the chunk's years, which gives every
+year an independent Poisson(frequency) count without an
+(iterations x risks) Poisson draw. Every event's loss is drawn in one call,
+and `bincount` sums the losses per year and per risk. Chunks hold about
+`CHUNK_CELLS` iteration-risk cells or expected events, whichever is larger,
+which bounds memory whatever the iteration count.
+
+Chunk k always draws from child k of `SeedSequence(seed)`, and chunk
+boundaries depend only on the iteration count and the models.
+A seeded run therefore gives identical results in-process or spread over
+any number of worker processes.
+
+From the simulated annual losses:
+    loss exceedance curve   P(annual loss > x) over log-spaced x
+    VaR / TVaR              loss quantile at each confidence level, and the
+                            mean loss beyond it
+    per risk                annualized loss expectancy and P(any loss)
+
+Run as a batch job:
+    python quant.py --iterations 1000000 --workers 8 --seed 42
+"""
+import argparse
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+Z_95 = 1.6448536269514722  # standard normal 95th percentile: the 90% interval is mu +/- Z_95 * sigma
+CHUNK_CELLS = 2_000_000
+CONFIDENCE_LEVELS = (0.9, 0.95, 0.99, 0.999)
+LEC_POINTS = 50
+DEFAULT_ITERATIONS = 100_000
+
+
+class RiskModels:
+    """Per-risk distribution parameters as aligned arrays"""
+
+    def __init__(self, risk_ids: List[str], frequency: np.ndarray, mu: np.ndarray, sigma: np.ndarray, cap: np.ndarray):
+        self.risk_ids = risk_ids
+        self.frequency = frequency
+        self.mu = mu
+        self.sigma = sigma
+        self.cap = cap
+
+    def __len__(self):
+        return len(self.risk_ids)
+
+    @classmethod
+    def from_risks(cls, risks: Iterable[Dict]) -> "RiskModels":
+        """Parameters of every risk with a `quantification`; raises ValueError on an invalid model"""
+        ids, frequency, mu, sigma, cap = [], [], [], [], []
+        for risk in risks:
+            model = risk.get("quantification")
+            if not model:
+                continue
+            rate, low, high = model.get("annual_frequency"), model.get("loss_low"), model.get("loss_high")
+            max_loss = model.get("max_loss")
+            if rate is None or rate < 0:
+                raise ValueError(f"Risk {risk['id']}: annual_frequency must be zero or more")
+            if low is None or high is None or not 0 < low < high:
+                raise ValueError(f"Risk {risk['id']}: need 0 < loss_low < loss_high")
+            if max_loss is not None and max_loss < low:
+                raise ValueError(f"Risk {risk['id']}: max_loss must be at least loss_low")
+            ids.append(risk["id"])
+            frequency.append(rate)
+            mu.append((math.log(low) + math.log(high)) / 2)
+            sigma.append((math.log(high) - math.log(low)) / (2 * Z_95))
+            cap.append(math.inf if max_loss is None else max_loss)
+        return cls(ids, np.array(frequency, dtype=np.float64), np.array(mu), np.array(sigma), np.array(cap))
+
+
+def chunk_sizes(iterations: int, models: RiskModels) -> List[int]:
+    per_year = max(len(models), float(models.frequency.sum()), 1.0)
+    per_chunk = max(1, int(CHUNK_CELLS // per_year))
+    full, rest = divmod(iterations, per_chunk)
+    return [per_chunk] * full + ([rest] if rest else [])
+
+
+def simulate_chunk(models: RiskModels, iterations: int, seed: np.random.SeedSequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Annual portfolio losses (iterations,), loss totals per risk and years with a loss per risk"""
+    rng = np.random.default_rng(seed)
+    n = len(models)
+    events = rng.poisson(models.frequency * iterations)  # per risk, over the whole chunk
+    years = rng.integers(0, iterations, size=int(events.sum()))
+    # Events stay grouped by risk, so parameters expand with repeat instead of a gather
+    z = rng.standard_normal(years.size)
+    losses = np.minimum(np.exp(np.repeat(models.mu, events) + np.repeat(models.sigma, events) * z), np.repeat(models.cap, events))
+    risks = np.repeat(np.arange(n), events)
+    portfolio = np.bincount(years, weights=losses, minlength=iterations)
+    risk_totals = np.bincount(risks, weights=losses, minlength=n)
+    years_with_loss = np.count_nonzero(np.bincount(years * n + risks, minlength=iterations * n).reshape(iterations, n), axis=0)
+    return portfolio, risk_totals, years_with_loss
+
+
+def _simulate_chunk(args):
+    return simulate_chunk(*args)
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn, not fork: the API server starts workers from a thread while others hold locks
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _map_bounded(pool: Executor, jobs: List[Tuple], workers: int) -> List:
+    """`pool.map` keeping at most `workers` of our jobs in flight, so one run cannot queue ahead of all others"""
+    results = [None] * len(jobs)
+    pending = {}
+    for i, job in enumerate(jobs):
+        if len(pending) >= workers:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+        pending[pool.submit(_simulate_chunk, job)] = i
+    for future, i in pending.items():
+        results[i] = future.result()
+    return results
+
+
+def simulate(models: RiskModels, iterations: int = DEFAULT_ITERATIONS, seed: Optional[int] = None, workers: int = 1,
+             pool: Optional[Executor] = None) -> Dict:
+    """Run the simulation and summarize it; `workers` > 1 spreads chunks over processes.
+
+    With `pool`, chunks run on that shared executor, at most `workers` at a
+    time; otherwise a pool is started for this run.
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])  # returned so the run can be repeated
+    sizes = chunk_sizes(iterations, models)
+    jobs = [(models, size, child) for size, child in zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes)))]
+    if workers > 1 and len(jobs) > 1:
+        if pool is not None:
+            chunks = _map_bounded(pool, jobs, workers)
+        else:
+            with process_pool(min(workers, len(jobs))) as own_pool:
+                chunks = list(own_pool.map(_simulate_chunk, jobs))
+    else:
+        chunks = [simulate_chunk(*job) for job in jobs]
+
+    portfolio = np.concatenate([c[0] for c in chunks])
+    risk_totals = np.sum([c[1] for c in chunks], axis=0)
+    risk_years = np.sum([c[2] for c in chunks], axis=0)
+    return {
+        "iterations": iterations,
+        "seed": seed,
+        "portfolio": portfolio_summary(portfolio),
+        "risks": [
+            {"id": risk_id, "annualized_loss": round(total / iterations, 2), "probability_of_loss": round(years / iterations, 4)}
+            for risk_id, total, years in zip(models.risk_ids, risk_totals.tolist(), risk_years.tolist())
+        ],
+    }
+
+
+def portfolio_summary(losses: np.ndarray) -> Dict:
+    losses = np.sort(losses)
+    n = losses.size
+    var = {}
+    for level in CONFIDENCE_LEVELS:
+        value = float(np.quantile(losses, level))
+        tail = losses[losses >= value]
+        var[str(level)] = {"var": round(value, 2), "tvar": round(float(tail.mean()) if tail.size else value, 2)}
+    return {
+        "mean": round(float(losses.mean()), 2),
+        "median": round(float(np.median(losses)), 2),
+        "max": round(float(losses[-1]), 2),
+        "probability_of_loss": round(float(np.count_nonzero(losses)) / n, 4),
+        "value_at_risk": var,
+        "loss_exceedance": loss_exceedance(losses),
+    }
+
+
+def loss_exceedance(sorted_losses: np.ndarray, points: int = LEC_POINTS) -> List[Dict]:
+    """P(annual loss > x) at log-spaced x between the smallest and largest positive loss"""
+    positive = sorted_losses[sorted_losses > 0]
+    if positive.size == 0:
+        return []
+    thresholds = np.unique(np.geomspace(positive[0], positive[-1], points))
+    exceed = 1 - np.searchsorted(sorted_losses, thresholds, side="right") / sorted_losses.size
+    return [{"loss": round(x, 2), "probability": round(p, 6)} for x, p in zip(thresholds.tolist(), exceed.tolist())]
+
+
+def main():
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--db", default=None, help="Override the database name")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / ".env")
+    client = MongoClient(args.mongo_url or os.getenv("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[args.db or os.environ["DB_NAME"]]
+
+    risks = list(db.risks.find({"quantification": {"$ne": None}}, {"_id": 0, "id": 1, "name": 1, "quantification": 1}))
+    names = {r["id"]: r.get("name", "") for r in risks}
+    models = RiskModels.from_risks(risks)
+    if not len(models):
+        print("No risks have a quantification model")
+        return
+    result = simulate(models, args.iterations, args.seed, args.workers)
+
+    portfolio = result["portfolio"]
+    print(f"{len(models)} risks, {args.iterations} simulated years, seed {result['seed']}")
+    print(f"Expected annual loss {portfolio['mean']:,.0f}, P(any loss) {portfolio['probability_of_loss']:.1%}")
+    for level, values in portfolio["value_at_risk"].items():
+        print(f"  VaR {float(level):.1%}: {values['var']:,.0f}  (TVaR {values['tvar']:,.0f})")
+    print("\nLargest annualized losses:")
+    for risk in sorted(result["risks"], key=lambda r: -r["annualized_loss"])[:10]:
+        print(f"  {risk['annualized_loss']:>14,.0f}  {names[risk['id']]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""Residual risk scoring from live control effectiveness.
+
+Each unified control gets an effectiveness in [0, 1]. It comes from its
+latest test result (Pass 1, Partial 0.5, Fail or untested 0), blended with
+the average status of its KCIs when it has any. Linked controls act as
+independent layers:
+
+    mitigation = 1 - prod(1 - CONTROL_STRENGTH * effectiveness_c)
+    residual   = inherent * (1 - MAX_MITIGATION * mitigation)
+
+so more effective controls lower the residual with diminishing returns,
+and it never drops below (1 - MAX_MITIGATION) of inherent.
+
+A full recompute is one sparse (risks x controls) product over the log
+terms. A new test result only recomputes the risks linked to that control,
+found through the control -> risks index. A result dated before the
+control's latest one is ignored.
+
+`RiskScorerUpdater` keeps the scorer current from the change hub, so risks,
+tests and KCIs written by other processes are scored too.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from scipy import sparse
+
+from live import ChangeConsumer
+
+logger = logging.getLogger(__name__)
+
+CONTROL_STRENGTH = 0.6
+MAX_MITIGATION = 0.9
+KCI_WEIGHT = 0.3
+
+TEST_RESULT_SCORES = {"pass": 1.0, "partial": 0.5, "fail": 0.0}
+KCI_STATUS_SCORES = {
+    "green": 1.0, "on track": 1.0, "met": 1.0,
+    "amber": 0.5, "yellow": 0.5, "at risk": 0.5,
+    "red": 0.0, "off track": 0.0, "breached": 0.0,
+}
+
+
+def test_score(result: Optional[str]) -> float:
+    return TEST_RESULT_SCORES.get((result or "").strip().lower(), 0.0)
+
+
+def kci_score(status: Optional[str]) -> Optional[float]:
+    """KCI status on the 0-1 scale; None for statuses that say nothing about effectiveness"""
+    return KCI_STATUS_SCORES.get((status or "").strip().lower())
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Request bodies may carry naive datetimes; stored ones are UTC
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value if isinstance(value, datetime) else None
+
+
+def residual_scores(inherent: np.ndarray, links: sparse.csr_matrix, effectiveness: np.ndarray) -> np.ndarray:
+    """Residual scores for a (risks x controls) link matrix.
+
+    `effectiveness` is one value per control, or a (controls x scenarios)
+    matrix to score many control states in one product.
+    """
+    # log(prod(1 - s*e)) = sum(log(1 - s*e)); CONTROL_STRENGTH < 1 keeps the log finite
+    log_remaining = links @ np.log1p(-CONTROL_STRENGTH * effectiveness)
+    if log_remaining.ndim == 2:
+        inherent = inherent[:, None]
+    return np.round(inherent * (1 - MAX_MITIGATION * (1 - np.exp(log_remaining))), 2)
+
+
+class RiskScorer:
+    """Control effectiveness, the control -> risks index and residual scores"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.loaded = False
+
+    def _reset(self):
+        self._control_index: Dict[str, int] = {}
+        self._control_ids: List[str] = []
+        self._test = np.zeros(64)  # latest test score per control column
+        self._test_date: Dict[str, datetime] = {}  # control id -> date of the scored test
+        self._test_id: Dict[str, str] = {}  # control id -> id of the scored test
+        self._kci_sum = np.zeros(64)
+        self._kci_count = np.zeros(64)
+        self._kci: Dict[str, tuple] = {}  # kci id -> (control column, score)
+        self._inherent: Dict[str, float] = {}
+        self._risk_controls: Dict[str, List[int]] = {}
+        self._control_risks: Dict[str, Set[str]] = {}
+
+    # ---------- loading ----------
+
+    def load(self, risks: Iterable[Dict], tests: Iterable[Dict], kcis: Iterable[Dict]):
+        """Reset from risks, control tests ({unified_control_id, result, test_date}) and KCIs"""
+        with self._lock:
+            self._reset()
+            for risk in risks:
+                self._upsert_risk(risk)
+            for test in tests:
+                self._record_test(test["unified_control_id"], test.get("result"), test.get("test_date"), test.get("id"))
+            for kci in kcis:
+                self._set_kci(kci)
+            self.loaded = True
+
+    def _column(self, control_id: str) -> int:
+        col = self._control_index.get(control_id)
+        if col is None:
+            col = self._control_index[control_id] = len(self._control_ids)
+            self._control_ids.append(control_id)
+            if col == len(self._test):
+                self._test = np.concatenate([self._test, np.zeros_like(self._test)])
+                self._kci_sum = np.concatenate([self._kci_sum, np.zeros_like(self._kci_sum)])
+                self._kci_count = np.concatenate([self._kci_count, np.zeros_like(self._kci_count)])
+        return col
+
+    def _upsert_risk(self, risk: Dict):
+        risk_id = risk["id"]
+        for col in self._risk_controls.get(risk_id, []):
+            self._control_risks.get(self._control_ids[col], set()).discard(risk_id)
+        control_ids = list(dict.fromkeys(risk.get("linked_control_ids") or []))
+        self._inherent[risk_id] = float(risk.get("inherent_risk_score") or 0.0)
+        self._risk_controls[risk_id] = [self._column(c) for c in control_ids]
+        for control_id in control_ids:
+            self._control_risks.setdefault(control_id, set()).add(risk_id)
+
+    def _remove_risk(self, risk_id: str):
+        for col in self._risk_controls.pop(risk_id, []):
+            self._control_risks.get(self._control_ids[col], set()).discard(risk_id)
+        self._inherent.pop(risk_id, None)
+
+    def _record_test(self, control_id: str, result: Optional[str], test_date: Optional[datetime],
+                     test_id: Optional[str] = None) -> bool:
+        """Score a test unless the control already has a later one; True when applied"""
+        test_date = _as_utc(test_date)
+        latest = self._test_date.get(control_id)
+        if latest is not None and test_date is not None and test_date < latest:
+            return False
+        self._test[self._column(control_id)] = test_score(result)
+        if test_date is not None:
+            self._test_date[control_id] = test_date
+        if test_id is not None:
+            self._test_id[control_id] = test_id
+        return True
+
+    def _set_kci(self, kci: Dict) -> Set[str]:
+        """Apply a KCI's status; returns the controls whose effectiveness may have changed"""
+        changed = set()
+        previous = self._kci.pop(kci["id"], None)
+        if previous is not None:
+            self._kci_sum[previous[0]] -= previous[1]
+            self._kci_count[previous[0]] -= 1
+            changed.add(self._control_ids[previous[0]])  # the KCI may have moved to another control
+        score = kci_score(kci.get("status"))
+        control_id = kci.get("unified_control_id")
+        if score is None or not control_id:
+            return changed
+        col = self._column(control_id)
+        self._kci[kci["id"]] = (col, score)
+        self._kci_sum[col] += score
+        self._kci_count[col] += 1
+        changed.add(control_id)
+        return changed
+
+    # ---------- incremental updates ----------
+
+    def upsert_risk(self, risk: Dict) -> float:
+        """Index a new or relinked risk and return its residual score"""
+        with self._lock:
+            self._upsert_risk(risk)
+            return self._scores([risk["id"]])[risk["id"]]
+
+    def remove_risk(self, risk_id: str):
+        with self._lock:
+            self._remove_risk(risk_id)
+
+    def record_test(self, control_id: str, result: str, test_date: Optional[datetime] = None,
+                    test_id: Optional[str] = None) -> Dict[str, float]:
+        """Apply a control's test result; residual scores of the risks it touches.
+
+        A test dated before the control's latest one changes nothing and returns {}.
+        """
+        with self._lock:
+            if not self._record_test(control_id, result, test_date, test_id):
+                return {}
+            return self._scores(self._control_risks.get(control_id, ()))
+
+    def scored_test_control(self, test_id: str) -> Optional[str]:
+        """Control whose score comes from test `test_id`, if any"""
+        with self._lock:
+            return next((c for c, t in self._test_id.items() if t == test_id), None)
+
+    def replace_test(self, control_id: str, test: Optional[Dict]) -> Dict[str, float]:
+        """Score the control from `test` (None: untested) even if it is older than the current one"""
+        with self._lock:
+            self._test_date.pop(control_id, None)
+            self._test_id.pop(control_id, None)
+            if test is None:
+                self._test[self._column(control_id)] = 0.0
+            else:
+                self._record_test(control_id, test.get("result"), test.get("test_date"), test.get("id"))
+            return self._scores(self._control_risks.get(control_id, ()))
+
+    def record_kci(self, kci: Dict) -> Dict[str, float]:
+        """Apply a KCI status; residual scores of the risks linked to its control, before and after a move"""
+        with self._lock:
+            risk_ids = set()
+            for control_id in self._set_kci(kci):
+                risk_ids.update(self._control_risks.get(control_id, ()))
+            return self._scores(risk_ids)
+
+    def remove_kci(self, kci_id: str):
+        with self._lock:
+            self._set_kci({"id": kci_id})
+
+    # ---------- scoring ----------
+
+    def _effectiveness(self, cols=slice(None)) -> np.ndarray:
+        n = len(self._control_index)
+        test, kci_sum, kci_count = self._test[:n][cols], self._kci_sum[:n][cols], self._kci_count[:n][cols]
+        kci_mean = np.divide(kci_sum, kci_count, out=np.zeros_like(kci_sum), where=kci_count > 0)
+        return np.where(kci_count > 0, (1 - KCI_WEIGHT) * test + KCI_WEIGHT * kci_mean, test)
+
+    def _scores(self, risk_ids: Iterable[str]) -> Dict[str, float]:
+        scores = {}
+        for risk_id in risk_ids:
+            cols = self._risk_controls.get(risk_id, [])
+            remaining = np.prod(1 - CONTROL_STRENGTH * self._effectiveness(cols)) if cols else 1.0
+            scores[risk_id] = round(float(self._inherent[risk_id] * (1 - MAX_MITIGATION * (1 - remaining))), 2)
+        return scores
+
+    def _link_matrix(self, risk_ids: List[str]) -> sparse.csr_matrix:
+        lengths = [len(self._risk_controls[r]) for r in risk_ids]
+        indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        indices = np.fromiter((c for r in risk_ids for c in self._risk_controls[r]), dtype=np.int64, count=indptr[-1])
+        return sparse.csr_matrix(
+            (np.ones(indptr[-1]), indices, indptr), shape=(len(risk_ids), len(self._control_ids))
+        )
+
+    def recompute_all(self) -> Dict[str, float]:
+        """Residual score of every risk, as one sparse matrix-vector product"""
+        with self._lock:
+            risk_ids = list(self._risk_controls)
+            if not risk_ids:
+                return {}
+            inherent = np.fromiter((self._inherent[r] for r in risk_ids), dtype=np.float64, count=len(risk_ids))
+            residual = residual_scores(inherent, self._link_matrix(risk_ids), self._effectiveness())
+            return dict(zip(risk_ids, residual.tolist()))
+
+    def snapshot(self) -> Dict:
+        """Consistent copy of the scoring inputs, for read-only what-if analysis"""
+        with self._lock:
+            risk_ids = list(self._risk_controls)
+            return {
+                "control_ids": list(self._control_ids),
+                "effectiveness": self._effectiveness().copy(),
+                "risk_ids": risk_ids,
+                "inherent": np.fromiter((self._inherent[r] for r in risk_ids), dtype=np.float64, count=len(risk_ids)),
+                "links": self._link_matrix(risk_ids),
+            }
+
+
+RISK_PROJECTION = {"_id": 0, "id": 1, "inherent_risk_score": 1, "linked_control_ids": 1}
+TEST_PROJECTION = {"_id": 0, "id": 1, "unified_control_id": 1, "result": 1, "test_date": 1}
+KCI_PROJECTION = {"_id": 0, "id": 1, "unified_control_id": 1, "status": 1}
+
+
+class RiskScorerUpdater(ChangeConsumer):
+    """Loads the scorer from the database and applies every risk, test and KCI change published on the hub"""
+
+    collections = ("risks", "control_tests", "kcis")
+    name = "Risk scorer"
+
+    def __init__(self, db, hub, scorer: RiskScorer):
+        super().__init__(db, hub)
+        self._scorer = scorer
+
+    def projection(self, collection: str) -> Dict:
+        return {"risks": RISK_PROJECTION, "control_tests": TEST_PROJECTION, "kcis": KCI_PROJECTION}[collection]
+
+    async def rebuild(self):
+        risks = await self._db.risks.find({}, RISK_PROJECTION).to_list(None)
+        tests = await self._db.control_tests.aggregate([
+            {"$sort": {"test_date": -1}},
+            {"$group": {"_id": "$unified_control_id", "id": {"$first": "$id"},
+                        "result": {"$first": "$result"}, "test_date": {"$first": "$test_date"}}},
+            {"$project": {"_id": 0, "unified_control_id": "$_id", "id": 1, "result": 1, "test_date": 1}},
+        ]).to_list(None)
+        kcis = await self._db.kcis.find({}, KCI_PROJECTION).to_list(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._scorer.load, risks, tests, kcis)
+        logger.info("Risk scorer loaded: %d risks", len(risks))
+
+    async def _handle(self, event: Dict):
+        if event.get("collection") == "control_tests" and event["op"] == "delete":
+            # If the deleted test was a control's latest, only the database knows the one before it
+            control_id = self._scorer.scored_test_control(event.get("id"))
+            if control_id is not None:
+                previous = await self._db.control_tests.find_one(
+                    {"unified_control_id": control_id}, TEST_PROJECTION, sort=[("test_date", -1)]
+                )
+                self._scorer.replace_test(control_id, previous)
+            return
+        await super()._handle(event)
+
+    def apply(self, collection: str, op: str, doc_id: str, document: Optional[Dict]):
+        if collection == "risks":
+            if document is None:
+                self._scorer.remove_risk(doc_id)
+            else:
+                self._scorer.upsert_risk(document)
+        elif collection == "control_tests":
+            if document is not None and document.get("unified_control_id"):
+                self._scorer.record_test(
+                    document["unified_control_id"], document.get("result"), document.get("test_date"), doc_id
+                )
+        elif document is None:
+            self._scorer.remove_kci(doc_id)
+        else:
+            self._scorer.record_kci(document)
@@ -0,0 +1,261 @@
+"""What-if analysis over hypothetical control states.
+
+A scenario overrides the effectiveness of some unified controls with a test
+result ("Pass", "Partial", "Fail") or a number in [0, 1]. A batch of
+scenarios becomes one (controls x scenarios) effectiveness matrix: the live
+baseline in every column, with each scenario's overrides written into its
+own column. Three sparse products then score every scenario at once:
+
+    residual risk   risks x controls links, through `risk_scoring.residual_scores`
+    KRI health      KRIs x controls (via their KCIs), row-normalised: the mean
+                    effectiveness of the controls a KRI's KCIs measure
+    coverage        framework controls x controls mappings against
+                    effectiveness >= COVERED_AT; a requirement is covered when
+                    any mapped control is, and counts roll up per framework
+
+Every result is diffed against the baseline column and only what moved is
+returned. Nothing is written back: the model is a copy of the scorer's state
+plus read-only link data. Scenarios are evaluated `SCENARIO_CHUNK` columns
+at a time to bound memory on large registers.
+"""
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from risk_scoring import TEST_RESULT_SCORES, residual_scores
+
+COVERED_AT = 0.5  # Partial or better counts as covering a requirement
+SCENARIO_CHUNK = 128
+
+ControlState = Union[str, float, int]
+
+
+def control_state(value: ControlState) -> float:
+    """Effectiveness for a scenario value: a test result or a number in [0, 1]"""
+    if isinstance(value, str):
+        score = TEST_RESULT_SCORES.get(value.strip().lower())
+        if score is None:
+            raise ValueError(f"Unknown control state {value!r}; use Pass, Partial, Fail or a number in [0, 1]")
+        return score
+    if isinstance(value, bool) or not 0.0 <= float(value) <= 1.0:
+        raise ValueError(f"Control effectiveness must be between 0 and 1, got {value!r}")
+    return float(value)
+
+
+def _incidence(rows: int, cols: int, pairs: Iterable[Tuple[int, int]]) -> sparse.csr_matrix:
+    """0/1 matrix with a one at every (row, col) pair, duplicates collapsed"""
+    pairs = set(pairs)
+    r = np.fromiter((p[0] for p in pairs), dtype=np.int64, count=len(pairs))
+    c = np.fromiter((p[1] for p in pairs), dtype=np.int64, count=len(pairs))
+    return sparse.csr_matrix((np.ones(len(pairs)), (r, c)), shape=(rows, cols))
+
+
+class ScenarioModel:
+    """Read-only copy of the control, risk, KRI and coverage links for batch what-if evaluation"""
+
+    def __init__(
+        self,
+        snapshot: Dict,
+        unified_controls: List[Dict],
+        framework_controls: List[Dict],
+        kcis: List[Dict],
+        names: Dict[str, Dict[str, str]],
+    ):
+        """`snapshot` comes from RiskScorer.snapshot(); `names` maps kind ("risk", "kri", "framework") -> {id: name}"""
+        self.control_ids = list(snapshot["control_ids"])
+        self.control_index = {c: i for i, c in enumerate(self.control_ids)}
+        # Controls the scorer never saw (no risk link, test or KCI) are untested: effectiveness 0
+        for doc in unified_controls:
+            self._column(doc["id"])
+        for kci in kcis:
+            if kci.get("unified_control_id"):
+                self._column(kci["unified_control_id"])
+        n_controls = len(self.control_ids)
+        self.baseline = np.zeros(n_controls)
+        self.baseline[:len(snapshot["effectiveness"])] = snapshot["effectiveness"]
+
+        self.risk_ids = snapshot["risk_ids"]
+        self.inherent = snapshot["inherent"]
+        links = snapshot["links"]
+        self.risk_links = sparse.csr_matrix((links.data, links.indices, links.indptr), shape=(len(self.risk_ids), n_controls))
+
+        # KRIs measured through at least one KCI with a control
+        kri_controls: Dict[str, set] = {}
+        for kci in kcis:
+            if kci.get("kri_id") and kci.get("unified_control_id"):
+                kri_controls.setdefault(kci["kri_id"], set()).add(self.control_index[kci["unified_control_id"]])
+        self.kri_ids = list(kri_controls)
+        kri_links = _incidence(len(self.kri_ids), n_controls, ((k, c) for k, kri in enumerate(self.kri_ids) for c in kri_controls[kri]))
+        self.kri_health = sparse.diags(1.0 / np.maximum(kri_links.sum(axis=1).A1, 1)) @ kri_links
+
+        self.requirement_ids = [fc["id"] for fc in framework_controls]
+        requirement_index = {r: i for i, r in enumerate(self.requirement_ids)}
+        self.mappings = _incidence(len(self.requirement_ids), n_controls, (
+            (requirement_index[fc_id], self.control_index[doc["id"]])
+            for doc in unified_controls
+            for fc_id in doc.get("mapped_framework_controls") or []
+            if fc_id in requirement_index
+        ))
+        self.framework_ids = list(dict.fromkeys(fc.get("framework_id") for fc in framework_controls if fc.get("framework_id")))
+        framework_index = {f: i for i, f in enumerate(self.framework_ids)}
+        self.framework_requirements = _incidence(len(self.framework_ids), len(self.requirement_ids), (
+            (framework_index[fc["framework_id"]], i) for i, fc in enumerate(framework_controls) if fc.get("framework_id")
+        ))
+        self.requirement_frameworks = self.framework_requirements.T.tocsr()
+        # Column-major copies: which rows a set of overridden controls can move
+        self._risks_by_control = self.risk_links.tocsc()
+        self._kris_by_control = self.kri_health.tocsc()
+        self._requirements_by_control = self.mappings.tocsc()
+        self.requirement_counts = self.framework_requirements.sum(axis=1).A1.astype(int)
+        self.names = names
+
+    def _column(self, control_id: str) -> int:
+        col = self.control_index.get(control_id)
+        if col is None:
+            col = self.control_index[control_id] = len(self.control_ids)
+            self.control_ids.append(control_id)
+        return col
+
+    def _evaluate(self, effectiveness: np.ndarray, risks=slice(None), kris=slice(None), requirements=slice(None)):
+        """Residual scores, KRI health and requirement coverage of the given rows for a (controls x scenarios) matrix"""
+        residual = residual_scores(self.inherent[risks], self.risk_links[risks], effectiveness)
+        health = np.round(self.kri_health[kris] @ effectiveness, 3)
+        covered = (self.mappings[requirements] @ (effectiveness >= COVERED_AT).astype(np.float64)) > 0
+        return residual, health, covered
+
+    @staticmethod
+    def _affected(by_control: sparse.csc_matrix, controls: np.ndarray) -> np.ndarray:
+        """Rows linked to any of `controls`"""
+        return np.unique(by_control[:, controls].indices)
+
+    def _overrides(self, scenarios: List[Dict]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Validate every scenario up front: (control columns, effectiveness) per scenario"""
+        parsed, unknown = [], set()
+        for scenario in scenarios:
+            states = scenario.get("control_states") or {}
+            unknown.update(c for c in states if c not in self.control_index)
+            cols = np.fromiter((self.control_index.get(c, 0) for c in states), dtype=np.int64, count=len(states))
+            values = np.fromiter((control_state(v) for v in states.values()), dtype=np.float64, count=len(states))
+            parsed.append((cols, values))
+        if unknown:
+            raise ValueError(f"Unknown unified controls: {', '.join(sorted(unknown))}")
+        return parsed
+
+    def baseline_summary(self) -> Dict:
+        residual, _, covered = self._evaluate(self.baseline[:, None])
+        covered_counts = (self.framework_requirements @ covered[:, 0].astype(np.float64)).astype(int)
+        return {
+            "total_residual": round(float(residual.sum()), 2),
+            "frameworks": [self._coverage(f, covered_counts[f]) for f in range(len(self.framework_ids))],
+        }
+
+    def run(self, scenarios: List[Dict]) -> List[Dict]:
+        """Each scenario's changes against the baseline, in request order"""
+        if not scenarios:
+            return []
+        overrides = self._overrides(scenarios)
+        base_residual, base_health, base_covered = (a[:, 0] for a in self._evaluate(self.baseline[:, None]))
+        base_total = float(base_residual.sum())
+        base_counts = (self.framework_requirements @ base_covered.astype(np.float64)).astype(int)
+        results = []
+        for start in range(0, len(scenarios), SCENARIO_CHUNK):
+            chunk = overrides[start:start + SCENARIO_CHUNK]
+            effectiveness = np.repeat(self.baseline[:, None], len(chunk), axis=1)
+            rows = np.concatenate([cols for cols, _ in chunk])
+            columns = np.repeat(np.arange(len(chunk)), [len(cols) for cols, _ in chunk])
+            effectiveness[rows, columns] = np.concatenate([values for _, values in chunk])
+
+            # Only rows linked to an overridden control can differ from the baseline
+            touched = np.unique(rows)
+            risks = self._affected(self._risks_by_control, touched)
+            kris = self._affected(self._kris_by_control, touched)
+            requirements = self._affected(self._requirements_by_control, touched)
+            residual, health, covered = self._evaluate(effectiveness, risks, kris, requirements)
+            residual_delta = residual - base_residual[risks, None]
+            health_delta = health - base_health[kris, None]
+            flipped = covered != base_covered[requirements, None]
+            for j, scenario in enumerate(scenarios[start:start + len(chunk)]):
+                results.append({
+                    "name": scenario.get("name", ""),
+                    "controls_changed": len(chunk[j][0]),
+                    "risks": self._risk_changes(risks, base_residual, residual_delta[:, j], base_total),
+                    "kris": self._kri_changes(kris, base_health, health_delta[:, j]),
+                    "frameworks": self._coverage_changes(requirements[flipped[:, j]], base_covered, base_counts),
+                })
+        return results
+
+    def _risk_changes(self, rows: np.ndarray, baseline: np.ndarray, delta: np.ndarray, base_total: float) -> Dict:
+        moved = np.flatnonzero(np.abs(delta) > 1e-9)
+        moved = moved[np.argsort(-delta[moved], kind="stable")]
+        total_delta = float(delta.sum())
+        names = self.names.get("risk", {})
+        before = baseline[rows[moved]]
+        changed = [
+            {"id": self.risk_ids[r], "name": names.get(self.risk_ids[r], ""), "baseline": b, "scenario": a, "delta": d}
+            for r, b, a, d in zip(
+                rows[moved].tolist(), before.tolist(),
+                np.round(before + delta[moved], 2).tolist(), np.round(delta[moved], 2).tolist(),
+            )
+        ]
+        return {
+            "total_residual": {
+                "baseline": round(base_total, 2),
+                "scenario": round(base_total + total_delta, 2),
+                "delta": round(total_delta, 2),
+            },
+            "changed": changed,
+        }
+
+    def _kri_changes(self, rows: np.ndarray, baseline: np.ndarray, delta: np.ndarray) -> List[Dict]:
+        moved = np.flatnonzero(np.abs(delta) > 1e-9)
+        moved = moved[np.argsort(delta[moved], kind="stable")]
+        names = self.names.get("kri", {})
+        before = baseline[rows[moved]]
+        return [
+            {
+                "id": self.kri_ids[k],
+                "name": names.get(self.kri_ids[k], ""),
+                "baseline_control_health": b,
+                "scenario_control_health": a,
+                "delta": d,
+            }
+            for k, b, a, d in zip(
+                rows[moved].tolist(), before.tolist(),
+                np.round(before + delta[moved], 3).tolist(), np.round(delta[moved], 3).tolist(),
+            )
+        ]
+
+    def _coverage(self, f: int, covered: int) -> Dict:
+        total, covered = int(self.requirement_counts[f]), int(covered)
+        return {
+            "id": self.framework_ids[f],
+            "name": self.names.get("framework", {}).get(self.framework_ids[f], ""),
+            "requirements": total,
+            "covered": covered,
+            "percent": round(100.0 * covered / total, 1) if total else 0.0,
+        }
+
+    def _coverage_changes(self, flipped: np.ndarray, base_covered: np.ndarray, base_counts: np.ndarray) -> List[Dict]:
+        """Per framework, the requirements that lost or gained coverage"""
+        lost: Dict[int, List[str]] = {}
+        gained: Dict[int, List[str]] = {}
+        frameworks = self.requirement_frameworks
+        for r in flipped:
+            target = lost if base_covered[r] else gained
+            for f in frameworks.indices[frameworks.indptr[r]:frameworks.indptr[r + 1]]:
+                target.setdefault(int(f), []).append(self.requirement_ids[r])
+        changed = []
+        for f in sorted(set(lost) | set(gained)):
+            after = base_counts[f] - len(lost.get(f, ())) + len(gained.get(f, ()))
+            before, after = self._coverage(f, base_counts[f]), self._coverage(f, after)
+            changed.append({
+                "id": before["id"],
+                "name": before["name"],
+                "requirements": before["requirements"],
+                "baseline_percent": before["percent"],
+                "scenario_percent": after["percent"],
+                "lost": lost.get(f, []),
+                "gained": gained.get(f, []),
+            })
+        return changed
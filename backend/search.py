@@ -0,0 +1,246 @@
+"""Full-text search across controls, framework requirements, policies, issues and risks.
+
+An in-memory inverted index ranked with BM25. Each term's postings are two
+packed arrays, document slots and term frequencies. A query scores every
+posting of its terms in one vectorized pass, reading lengths and flags
+only for those slots, sums them per slot with `bincount` and takes the top
+hits with `argpartition`, so latency follows the postings touched, not the
+corpus size.
+Title fields count `TITLE_WEIGHT` times towards term frequency.
+
+Updates are incremental. Re-indexing a document retires its slot and
+appends a new one. Retired slots are masked out at query time, and the
+postings are compacted once a quarter of the slots are dead.
+`SearchIndexer` keeps the index current by following the API's change hub.
+"""
+import asyncio
+import html
+import logging
+import math
+import re
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from live import ChangeConsumer
+
+logger = logging.getLogger(__name__)
+
+# Per collection: (title fields, body fields)
+SEARCH_FIELDS = {
+    "unified_controls": (("ccf_id", "name"), ("description", "control_type", "owner")),
+    "framework_controls": (("control_id", "title"), ("description", "category", "testing_procedure")),
+    "policies": (("policy_id", "name"), ("description", "category", "owner")),
+    "issues": (("title",), ("description", "severity", "status", "assigned_to")),
+    "risks": (("name",), ("description", "category", "owner")),
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("a an and are as at be by for from has have in is it of on or that the this to with".split())
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 2.0
+SNIPPET_CHARS = 160
+COMPACT_MIN_DEAD = 1000
+
+_COLLECTION_CODES = {name: code for code, name in enumerate(SEARCH_FIELDS)}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def search_projection(collection: str) -> Dict:
+    title_fields, body_fields = SEARCH_FIELDS[collection]
+    return {"_id": 0, "id": 1, **{f: 1 for f in title_fields + body_fields}}
+
+
+def _join(doc: Dict, fields: Sequence[str]) -> str:
+    return " ".join(str(doc[f]) for f in fields if doc.get(f))
+
+
+def highlight(text: str, terms: Iterable[str], max_chars: Optional[int] = None) -> str:
+    """HTML-escaped `text` with query terms wrapped in <mark>, optionally cut to a window around the first hit"""
+    terms = set(terms)
+    matches = [m for m in TOKEN_RE.finditer(text.lower()) if m.group() in terms]
+    if max_chars is not None and len(text) > max_chars:
+        start = max(0, matches[0].start() - max_chars // 4) if matches else 0
+        end = min(len(text), start + max_chars)
+        # Don't cut words in half
+        if start:
+            start = text.find(" ", start, matches[0].start() if matches else end) + 1 or start
+        if end < len(text) and text.rfind(" ", start, end) > start:
+            end = text.rfind(" ", start, end)
+        prefix, suffix = ("…" if start else ""), ("…" if end < len(text) else "")
+        matches = [m for m in matches if m.start() >= start and m.end() <= end]
+    else:
+        start, end, prefix, suffix = 0, len(text), "", ""
+    parts, pos = [], start
+    for m in matches:
+        parts.append(html.escape(text[pos:m.start()]))
+        parts.append(f"<mark>{html.escape(text[m.start():m.end()])}</mark>")
+        pos = m.end()
+    parts.append(html.escape(text[pos:end]))
+    return prefix + "".join(parts) + suffix
+
+
+class SearchIndex:
+    """BM25 inverted index with incremental upsert/remove"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._postings: Dict[str, Tuple[array, array]] = {}  # term -> (slots, term frequencies)
+        self._df: Dict[str, int] = {}  # live documents per term
+        self._slots: Dict[Tuple[str, str], int] = {}  # (collection, id) -> slot
+        self._docs: List[Optional[Tuple[str, str, str, str]]] = []  # slot -> (collection, id, title, body)
+        self._lengths = array("f")
+        self._collections = array("b")
+        self._alive = array("b")
+        self._total_length = 0.0
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def build(self, docs_by_collection: Dict[str, Iterable[Dict]]):
+        with self._lock:
+            self._reset()
+            for collection, docs in docs_by_collection.items():
+                for doc in docs:
+                    self.upsert(collection, doc)
+
+    @staticmethod
+    def _term_weights(title: str, body: str) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for term in tokenize(title):
+            weights[term] = weights.get(term, 0.0) + TITLE_WEIGHT
+        for term in tokenize(body):
+            weights[term] = weights.get(term, 0.0) + 1.0
+        return weights
+
+    def upsert(self, collection: str, doc: Dict):
+        """Index or re-index one document"""
+        title_fields, body_fields = SEARCH_FIELDS[collection]
+        title, body = _join(doc, title_fields), _join(doc, body_fields)
+        weights = self._term_weights(title, body)
+        with self._lock:
+            self.remove(collection, doc["id"])
+            slot = len(self._docs)
+            self._docs.append((collection, doc["id"], title, body))
+            self._slots[(collection, doc["id"])] = slot
+            length = sum(weights.values())
+            self._lengths.append(length)
+            self._collections.append(_COLLECTION_CODES[collection])
+            self._alive.append(1)
+            self._total_length += length
+            for term, tf in weights.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array("i"), array("f"))
+                postings[0].append(slot)
+                postings[1].append(tf)
+                self._df[term] = self._df.get(term, 0) + 1
+
+    def remove(self, collection: str, doc_id: str):
+        with self._lock:
+            slot = self._slots.pop((collection, doc_id), None)
+            if slot is None:
+                return
+            _, _, title, body = self._docs[slot]
+            for term in self._term_weights(title, body):
+                self._df[term] -= 1
+            self._docs[slot] = None
+            self._alive[slot] = 0
+            self._total_length -= self._lengths[slot]
+            self._dead += 1
+            if self._dead >= COMPACT_MIN_DEAD and self._dead * 4 >= len(self._docs):
+                self._compact()
+
+    def _compact(self):
+        live = [d for d in self._docs if d is not None]
+        self._reset()
+        for collection, doc_id, title, body in live:
+            title_fields, body_fields = SEARCH_FIELDS[collection]
+            # Stored text re-indexes identically when placed in the first field of each group
+            self.upsert(collection, {"id": doc_id, title_fields[0]: title, body_fields[0]: body})
+
+    def search(self, query: str, collections: Optional[Iterable[str]] = None, limit: int = 20) -> List[Dict]:
+        """Top `limit` documents for `query`, best first, with highlighted title and snippet"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            n_live = len(self._slots)
+            if n_live == 0:
+                return []
+            term_slots, term_tf, term_idf = [], [], []
+            for term in terms:
+                postings = self._postings.get(term)
+                df = self._df.get(term, 0)
+                if postings is None or df == 0:
+                    continue
+                # Copies, so no numpy view keeps the arrays from growing after the lock is released
+                term_slots.append(np.frombuffer(postings[0], dtype=np.int32).copy())
+                term_tf.append(np.frombuffer(postings[1], dtype=np.float32).copy())
+                term_idf.append(np.full(len(postings[0]), math.log(1 + (n_live - df + 0.5) / (df + 0.5)), dtype=np.float32))
+            if not term_slots:
+                return []
+            slots, tf, idf = np.concatenate(term_slots), np.concatenate(term_tf), np.concatenate(term_idf)
+            lengths = np.frombuffer(self._lengths, dtype=np.float32)[slots]
+            alive = np.frombuffer(self._alive, dtype=np.int8)[slots] != 0
+            codes = np.frombuffer(self._collections, dtype=np.int8)[slots]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (self._total_length / n_live))
+            contributions = idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            if collections is not None:
+                alive &= np.isin(codes, [_COLLECTION_CODES[c] for c in collections])
+            # Sum each document's terms; unique slots come back sorted, keeping ties in slot order
+            docs_hit, inverse = np.unique(slots[alive], return_inverse=True)
+            scores = np.bincount(inverse, weights=contributions[alive], minlength=docs_hit.size).astype(np.float32)
+            hits = np.flatnonzero(scores > 0)
+            if hits.size > limit:
+                hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+            hits = hits[np.argsort(-scores[hits], kind="stable")]
+            docs = [(self._docs[docs_hit[h]], float(scores[h])) for h in hits]
+
+        return [
+            {
+                "collection": collection,
+                "id": doc_id,
+                "score": round(score, 4),
+                "title": highlight(title, terms),
+                "snippet": highlight(body, terms, SNIPPET_CHARS),
+            }
+            for (collection, doc_id, title, body), score in docs
+        ]
+
+
+class SearchIndexer(ChangeConsumer):
+    """Builds `index` from the database and applies every change published on the hub"""
+
+    collections = tuple(SEARCH_FIELDS)
+    name = "Search index"
+
+    def __init__(self, db, hub, index: SearchIndex):
+        super().__init__(db, hub)
+        self._index = index
+
+    def projection(self, collection: str) -> Dict:
+        return search_projection(collection)
+
+    async def rebuild(self):
+        docs = {name: await self._db[name].find({}, search_projection(name)).to_list(None) for name in SEARCH_FIELDS}
+        await asyncio.get_running_loop().run_in_executor(None, self._index.build, docs)
+        logger.info("Search index built: %d documents", len(self._index))
+
+    def apply(self, collection: str, op: str, doc_id: str, document: Optional[Dict]):
+        if document is None:
+            self._index.remove(collection, doc_id)
+        else:
+            self._index.upsert(collection, document)
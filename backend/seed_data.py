@@ -11,7 +11,7 @@ def get_frameworks_data():
             "version": "2022",
             "enabled": False,
             "total_controls": 93,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "fw-pci-dss",
@@ -20,7 +20,7 @@ def get_frameworks_data():
             "version": "4.0",
             "enabled": False,
             "total_controls": 63,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "fw-soc2",
@@ -29,7 +29,7 @@ def get_frameworks_data():
             "version": "2017",
             "enabled": False,
             "total_controls": 64,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "fw-nist-csf",
@@ -38,7 +38,7 @@ def get_frameworks_data():
             "version": "2.0",
             "enabled": False,
             "total_controls": 108,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "fw-gdpr",
@@ -47,7 +47,7 @@ def get_frameworks_data():
             "version": "2018",
             "enabled": False,
             "total_controls": 45,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     
@@ -124,7 +124,7 @@ def get_frameworks_data():
     
     # Add timestamps to all controls
     for ctrl in all_framework_controls:
-        ctrl["created_at"] = datetime.now(timezone.utc).isoformat()
+        ctrl["created_at"] = datetime.now(timezone.utc)
     
     return {
         "frameworks": frameworks,
@@ -148,7 +148,7 @@ def get_sample_data():
             "mapped_policies": ["pol-sec-100"],
             "automation_possible": True,
             "automation_config": {"type": "api_check", "endpoint": "/api/mfa-status"},
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "uc-002",
@@ -162,7 +162,7 @@ def get_sample_data():
             "mapped_policies": ["pol-data-200"],
             "automation_possible": True,
             "automation_config": {"type": "scan", "tool": "encryption_scanner"},
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "uc-003",
@@ -176,7 +176,7 @@ def get_sample_data():
             "mapped_policies": ["pol-iam-150"],
             "automation_possible": False,
             "automation_config": None,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "uc-004",
@@ -190,7 +190,7 @@ def get_sample_data():
             "mapped_policies": ["pol-log-300"],
             "automation_possible": True,
             "automation_config": {"type": "log_check", "tool": "siem"},
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "uc-005",
@@ -204,7 +204,7 @@ def get_sample_data():
             "mapped_policies": ["pol-bc-400"],
             "automation_possible": True,
             "automation_config": {"type": "backup_verify", "tool": "backup_system"},
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "uc-006",
@@ -218,7 +218,7 @@ def get_sample_data():
             "mapped_policies": ["pol-net-500"],
             "automation_possible": True,
             "automation_config": {"type": "network_scan", "tool": "network_mapper"},
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "uc-007",
@@ -232,7 +232,7 @@ def get_sample_data():
             "mapped_policies": ["pol-priv-600"],
             "automation_possible": False,
             "automation_config": None,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "uc-008",
@@ -246,7 +246,7 @@ def get_sample_data():
             "mapped_policies": ["pol-chg-700"],
             "automation_possible": False,
             "automation_config": None,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "uc-009",
@@ -260,7 +260,7 @@ def get_sample_data():
             "mapped_policies": ["pol-vul-800"],
             "automation_possible": True,
             "automation_config": {"type": "vuln_scan", "tool": "vulnerability_scanner"},
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "uc-010",
@@ -274,7 +274,7 @@ def get_sample_data():
             "mapped_policies": ["pol-inc-900"],
             "automation_possible": False,
             "automation_config": None,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
     ]
     
@@ -287,7 +287,7 @@ def get_sample_data():
             "category": "Security",
             "owner": "CISO",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "pol-002",
@@ -297,7 +297,7 @@ def get_sample_data():
             "category": "Data Protection",
             "owner": "DPO",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "pol-003",
@@ -307,7 +307,7 @@ def get_sample_data():
             "category": "Access Control",
             "owner": "IT Security",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "pol-004",
@@ -317,7 +317,7 @@ def get_sample_data():
             "category": "Monitoring",
             "owner": "IT Operations",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "pol-005",
@@ -327,7 +327,7 @@ def get_sample_data():
             "category": "Business Continuity",
             "owner": "IT Operations",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "pol-006",
@@ -337,7 +337,7 @@ def get_sample_data():
             "category": "Network Security",
             "owner": "Network Team",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "pol-007",
@@ -347,7 +347,7 @@ def get_sample_data():
             "category": "Privacy",
             "owner": "Privacy Officer",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "pol-008",
@@ -357,7 +357,7 @@ def get_sample_data():
             "category": "Change Management",
             "owner": "IT Operations",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "pol-009",
@@ -367,7 +367,7 @@ def get_sample_data():
             "category": "Vulnerability Management",
             "owner": "IT Security",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "pol-010",
@@ -377,7 +377,7 @@ def get_sample_data():
             "category": "Incident Management",
             "owner": "Security Team",
             "status": "Active",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
     ]
     
@@ -1,24 +1,45 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from compression import CompressionMiddleware
+from live import ChangeHub, ChangeStreamWatcher, encode_event
+from automap import AutoMapper
+from search import SEARCH_FIELDS, SearchIndex, SearchIndexer
+from risk_scoring import RiskScorer, RiskScorerUpdater
+from scenarios import ScenarioModel
+from quant import DEFAULT_ITERATIONS, RiskModels, process_pool, simulate as simulate_losses
+from impact_graph import ImpactGraph, ImpactGraphUpdater, summarize as summarize_impact
+from dedup import DEDUP_FIELDS, DEFAULT_THRESHOLD, MinHashLSH, build_index, document_text, minhash, shingles
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+import asyncio
+import copy
+import functools
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+import hashlib
 import json
 import shutil
 
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# tz_aware: datetimes come back as aware UTC values, matching what the models write
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 app = FastAPI()
@@ -26,6 +47,9 @@ api_router = APIRouter(prefix="/api")
 
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
 
+# Re-validate list responses through their Pydantic models (debugging aid; slow)
+STRICT_RESPONSE_VALIDATION = os.environ.get('STRICT_RESPONSE_VALIDATION', '').lower() in ('1', 'true', 'yes')
+
 # Ensure uploads directory exists
 UPLOADS_DIR = Path("/app/backend/uploads")
 UPLOADS_DIR.mkdir(exist_ok=True)
@@ -41,6 +65,7 @@ class Framework(BaseModel):
     enabled: bool = False
     total_controls: int = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class FrameworkControl(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -52,6 +77,7 @@ class FrameworkControl(BaseModel):
     category: str
     testing_procedure: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class UnifiedControl(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -67,6 +93,7 @@ class UnifiedControl(BaseModel):
     automation_possible: bool = False
     automation_config: Optional[Dict] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class InternalPolicy(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -78,6 +105,7 @@ class InternalPolicy(BaseModel):
     owner: str
     status: str = "Active"
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ControlTest(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -90,6 +118,7 @@ class ControlTest(BaseModel):
     evidence_ids: List[str] = []
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class Evidence(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -102,6 +131,7 @@ class Evidence(BaseModel):
     file_path: Optional[str] = None
     file_name: Optional[str] = None
     collected_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class Issue(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -119,6 +149,12 @@ class Issue(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class RiskQuantification(BaseModel):
+    annual_frequency: float  # expected loss events per year
+    loss_low: float  # 90% confidence interval of the loss per event
+    loss_high: float
+    max_loss: Optional[float] = None
+
 class Risk(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -126,12 +162,14 @@ class Risk(BaseModel):
     description: str
     category: str
     inherent_risk_score: float
-    residual_risk_score: float
+    residual_risk_score: Optional[float] = None  # derived from linked controls; ignored on create
     status: str = "Active"
     owner: str
     kri_ids: List[str] = []
     linked_control_ids: List[str] = []
+    quantification: Optional[RiskQuantification] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class KRI(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -146,6 +184,7 @@ class KRI(BaseModel):
     trend: str
     kci_ids: List[str] = []
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class KCI(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -159,6 +198,22 @@ class KCI(BaseModel):
     unit: str
     status: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class Scenario(BaseModel):
+    name: str
+    # unified control id -> "Pass" / "Partial" / "Fail" or an effectiveness in [0, 1]
+    control_states: Dict[str, Union[str, float]]
+
+class ScenarioBatch(BaseModel):
+    scenarios: List[Scenario]
+    include_baseline: bool = False
+
+class QuantSimulationRequest(BaseModel):
+    iterations: int = DEFAULT_ITERATIONS
+    seed: Optional[int] = None
+    workers: int = 1
+    risk_ids: Optional[List[str]] = None
 
 class AIAnalysisRequest(BaseModel):
     analysis_type: str
@@ -168,6 +223,346 @@ class AIAnalysisResponse(BaseModel):
     analysis: str
     recommendations: List[str]
 
+# ============ FAST READ PATH ============
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONResponse(JSONResponse):
+    """Serializes rows read from our own DB directly, without model re-validation"""
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_json_default)
+        return json.dumps(content, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+def parse_fields(model, fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a `fields=a,b,c` sparse fieldset; unknown names are a 400"""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields for {model.__name__}: {', '.join(unknown)}")
+    return requested
+
+def projection(model, fields: Optional[List[str]] = None) -> Dict[str, int]:
+    """Mongo projection limited to the model's fields (or the requested subset of them)"""
+    return {"_id": 0, **{name: 1 for name in (fields or model.model_fields)}}
+
+@functools.lru_cache(maxsize=None)
+def model_defaults(model) -> Tuple[Tuple[str, Any, Any], ...]:
+    """(field, default, default factory) for every optional field of `model`"""
+    return tuple(
+        (name, field.default, field.default_factory)
+        for name, field in model.model_fields.items()
+        if not field.is_required()
+    )
+
+def fill_defaults(model, rows: List[Dict], fields: Optional[List[str]] = None) -> List[Dict]:
+    """Add model defaults for fields older documents lack, as response_model validation would"""
+    selected = set(fields) if fields else None
+    defaults = [d for d in model_defaults(model) if selected is None or d[0] in selected]
+    for row in rows:
+        for name, default, factory in defaults:
+            if name not in row:
+                row[name] = factory() if factory is not None else copy.copy(default)
+    return rows
+
+def list_response(model, rows: List[Dict], fields: Optional[List[str]] = None, etag: Optional[str] = None) -> FastJSONResponse:
+    """Return DB rows with missing fields defaulted; in strict mode validate full rows through `model` first"""
+    if STRICT_RESPONSE_VALIDATION and not fields:
+        rows = [model.model_validate(row).model_dump(mode="json") for row in rows]
+    else:
+        rows = fill_defaults(model, rows, fields)
+    return FastJSONResponse(rows, headers=etag_headers(etag) if etag else None)
+
+# ============ CATALOG VERSIONS ============
+# Catalog collections change rarely but are fetched on every page. Each has a
+# counter in `catalog_versions` that is bumped after every write, so a
+# conditional GET costs one counter lookup and no body when nothing changed.
+
+CATALOG_COLLECTIONS = ("frameworks", "framework_controls", "unified_controls", "policies")
+
+async def bump_catalog_version(*collections: str):
+    """Invalidate cached catalog responses; call after the write has completed"""
+    for name in collections:
+        await db.catalog_versions.update_one({"_id": name}, {"$inc": {"version": 1}}, upsert=True)
+
+async def catalog_version(collection: str) -> int:
+    doc = await db.catalog_versions.find_one({"_id": collection})
+    return doc["version"] if doc else 0
+
+async def catalog_etag(collection: str, *variant) -> str:
+    """Strong ETag from the collection version plus the query variant (path params, fields)"""
+    version = await catalog_version(collection)
+    key = hashlib.sha1(repr(variant).encode("utf-8")).hexdigest()[:12]
+    return f'"{collection}-{version}-{key}"'
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    # no-cache: browsers keep the body but revalidate with If-None-Match every time
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+def not_modified(if_none_match: Optional[str], etag: str) -> Optional[Response]:
+    """304 response when the client's cached copy is current, else None"""
+    if not if_none_match:
+        return None
+    tags = [t.strip() for t in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches
+    if "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags):
+        return Response(status_code=304, headers=etag_headers(etag))
+    return None
+
+# ============ DELTA SYNC ============
+# Every document carries `updated_at` and deletes leave a tombstone, so
+# clients can fetch just what changed since their last sync.
+
+SYNC_COLLECTIONS = {
+    "frameworks": Framework,
+    "framework_controls": FrameworkControl,
+    "unified_controls": UnifiedControl,
+    "policies": InternalPolicy,
+    "control_tests": ControlTest,
+    "evidence": Evidence,
+    "issues": Issue,
+    "risks": Risk,
+    "kris": KRI,
+    "kcis": KCI,
+}
+
+# Writes stamped just before a sync ran may commit just after it; each token
+# is backdated by this much so those writes are picked up on the next sync.
+SYNC_OVERLAP = timedelta(seconds=5)
+SYNC_TOMBSTONE_TTL_DAYS = int(os.environ.get('SYNC_TOMBSTONE_TTL_DAYS', '30'))
+
+# Live change feed: a change stream when the deployment supports it, else
+# this process's own writes published in-process (see live.py)
+change_hub = ChangeHub()
+change_watcher = ChangeStreamWatcher(db, change_hub, SYNC_COLLECTIONS)
+LIVE_HEARTBEAT_SECONDS = 25
+
+def stamp(doc: Dict) -> Dict:
+    """Set `updated_at` on a document about to be written"""
+    doc["updated_at"] = datetime.now(timezone.utc)
+    return doc
+
+async def delete_with_tombstones(collection: str, query: Dict) -> int:
+    """Delete matching documents and record a tombstone for each"""
+    ids = await db[collection].distinct("id", query)
+    if ids:
+        now = datetime.now(timezone.utc)
+        await db.sync_tombstones.insert_many(
+            [{"collection": collection, "id": doc_id, "deleted_at": now} for doc_id in ids]
+        )
+    result = await db[collection].delete_many(query)
+    for doc_id in ids:
+        change_hub.publish_local(collection, "delete", doc_id)
+    return result.deleted_count
+
+def encode_sync_token(ts: datetime) -> str:
+    return str(int(ts.timestamp() * 1000))
+
+def decode_sync_token(token: str) -> datetime:
+    try:
+        return datetime.fromtimestamp(int(token) / 1000, tz=timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+def parse_collections(collections: Optional[str]) -> Optional[List[str]]:
+    """Parse a `collections=a,b` filter; None means every synced collection"""
+    if not collections:
+        return None
+    names = [c.strip() for c in collections.split(",") if c.strip()]
+    unknown = [c for c in names if c not in SYNC_COLLECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(unknown)}")
+    return names
+
+async def ensure_sync_indexes():
+    """Index `updated_at` everywhere and backfill it on documents written before it existed"""
+    for name in SYNC_COLLECTIONS:
+        # Backfilled rows show up once in the next delta; clients upsert by id
+        await db[name].update_many({"updated_at": {"$exists": False}}, [{"$set": {"updated_at": "$$NOW"}}])
+        await db[name].create_index("updated_at")
+    await db.sync_tombstones.create_index([("collection", 1), ("deleted_at", 1)])
+    await db.sync_tombstones.create_index("deleted_at", expireAfterSeconds=SYNC_TOMBSTONE_TTL_DAYS * 86400)
+
+# ============ REVERSE MAPPING INDEX ============
+# Mappings are stored on the unified control. `satisfied_by` keeps the inverse,
+# one document per framework control: {_id: framework_control_id,
+# unified_control_ids: [...]}. "What satisfies X" is then a primary-key
+# lookup. Every mapping write goes through `reindex_mappings`, and
+# `rebuild_satisfied_by` regenerates the index from scratch.
+
+mapping_locks: Dict[str, asyncio.Lock] = {}  # unified control id -> lock serializing its reindex
+
+async def reindex_mappings(unified_control_id: str, old_ids: List[str], new_ids: List[str]):
+    """Move a unified control between framework-control entries after its mappings changed.
+
+    Concurrent remaps of one control can reach this in any order, so the
+    entries follow the mappings stored now rather than this caller's diff.
+    Passes repeat until a re-read matches what was applied, which also
+    repairs a stale pass from another process.
+    """
+    touched = set(old_ids) | set(new_ids)
+    async with mapping_locks.setdefault(unified_control_id, asyncio.Lock()):
+        applied = None
+        while True:
+            control = await db.unified_controls.find_one(
+                {"id": unified_control_id}, {"_id": 0, "mapped_framework_controls": 1}
+            )
+            stored = set((control or {}).get("mapped_framework_controls") or [])
+            if stored == applied:
+                break
+            touched |= stored
+            removed = touched - stored
+            if removed:
+                await db.satisfied_by.update_many(
+                    {"_id": {"$in": list(removed)}}, {"$pull": {"unified_control_ids": unified_control_id}}
+                )
+            if stored:
+                await db.satisfied_by.bulk_write([
+                    UpdateOne({"_id": fc_id}, {"$addToSet": {"unified_control_ids": unified_control_id}}, upsert=True)
+                    for fc_id in stored
+                ], ordered=False)
+            applied = stored
+
+async def rebuild_satisfied_by():
+    """Regenerate the reverse index from the unified controls, DB-side"""
+    await db.unified_controls.aggregate([
+        {"$unwind": "$mapped_framework_controls"},
+        {"$group": {"_id": "$mapped_framework_controls", "unified_control_ids": {"$addToSet": "$id"}}},
+        {"$out": "satisfied_by"},
+    ]).to_list(None)
+
+async def ensure_satisfied_by():
+    """Build the reverse index on first start against existing data"""
+    if await db.satisfied_by.estimated_document_count() == 0 and await db.unified_controls.estimated_document_count() > 0:
+        await rebuild_satisfied_by()
+
+# ============ AUTO-MAPPING ============
+
+# TF-IDF vectors of the unified controls, refit when the catalog version moves
+automapper = AutoMapper()
+
+# ============ NEAR-DUPLICATE DETECTION ============
+
+# MinHash LSH index per collection, rebuilt when the catalog version moves
+dedup_indexes: Dict[str, Tuple[int, MinHashLSH]] = {}
+
+async def get_dedup_index(collection: str) -> MinHashLSH:
+    version = await catalog_version(collection)
+    cached = dedup_indexes.get(collection)
+    if cached and cached[0] == version:
+        return cached[1]
+    fields = DEDUP_FIELDS[collection]
+    docs = await db[collection].find({}, {"_id": 0, "id": 1, **{f: 1 for f in fields}}).to_list(None)
+    index = await run_in_threadpool(build_index, docs, fields)
+    dedup_indexes[collection] = (version, index)
+    return index
+
+async def find_near_duplicates(collection: str, doc: Dict) -> Tuple[List[Dict], Any]:
+    """Indexed documents resembling `doc`, plus its signature for `remember_for_dedup`"""
+    index = await get_dedup_index(collection)
+    hashes = shingles(document_text(doc, DEDUP_FIELDS[collection]))
+    if not hashes.size:
+        return [], None
+    signature = minhash(hashes)
+    matches = index.query(signature, exclude=doc.get("id"))
+    return [{"id": key, "score": round(score, 3)} for key, score in matches], signature
+
+async def remember_for_dedup(collection: str, doc_id: str, signature):
+    """Add our own insert to the cached index and adopt the bumped version, avoiding a rebuild.
+
+    Call after `bump_catalog_version`. The version is adopted only when ours
+    is the single bump since the index was built; otherwise another write is
+    missing from the index, so it is dropped and rebuilt on next use.
+    """
+    cached = dedup_indexes.get(collection)
+    if not cached:
+        return
+    version = await catalog_version(collection)
+    if version != cached[0] + 1 or dedup_indexes.get(collection) is not cached:
+        dedup_indexes.pop(collection, None)
+        return
+    if signature is not None:
+        cached[1].add(doc_id, signature)
+    dedup_indexes[collection] = (version, cached[1])
+
+def duplicate_header(matches: List[Dict]) -> Dict[str, str]:
+    return {"X-Possible-Duplicates": json.dumps(matches)} if matches else {}
+
+# ============ FULL-TEXT SEARCH ============
+
+# BM25 index over the searchable collections, kept current from the change hub
+search_index = SearchIndex()
+search_indexer = SearchIndexer(db, change_hub, search_index)
+SEARCH_MAX_LIMIT = 100
+
+# ============ RISK SCORING ============
+# Residual risk is derived from the inherent score and the effectiveness of
+# linked controls (see risk_scoring.py). The scorer is loaded at startup and
+# follows the change hub, so writes from other processes reach it too. Each
+# test or KCI write rescores only the risks linked to its control.
+
+risk_scorer = RiskScorer()
+risk_scorer_updater = RiskScorerUpdater(db, change_hub, risk_scorer)
+RISK_SCORER_WAIT_SECONDS = 10
+
+async def get_risk_scorer(reload: bool = False) -> RiskScorer:
+    """The loaded scorer; `reload` first rebuilds it from the database"""
+    if reload:
+        await risk_scorer_updater.rebuild()
+    try:
+        await asyncio.wait_for(risk_scorer_updater.ready.wait(), RISK_SCORER_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Risk scores are still loading")
+    return risk_scorer
+
+async def save_residual_scores(scores: Dict[str, float]) -> int:
+    """Write residual scores that changed; returns how many did"""
+    if not scores:
+        return 0
+    current = {
+        r["id"]: r.get("residual_risk_score")
+        async for r in db.risks.find({"id": {"$in": list(scores)}}, {"_id": 0, "id": 1, "residual_risk_score": 1})
+    }
+    changed = {risk_id: score for risk_id, score in scores.items() if risk_id in current and current[risk_id] != score}
+    if changed:
+        now = datetime.now(timezone.utc)
+        await db.risks.bulk_write(
+            [UpdateOne({"id": risk_id}, {"$set": {"residual_risk_score": score, "updated_at": now}})
+             for risk_id, score in changed.items()],
+            ordered=False,
+        )
+        for risk_id in changed:
+            change_hub.publish_local("risks", "update", risk_id)
+    return len(changed)
+
+# ============ WHAT-IF SCENARIOS ============
+# Hypothetical control states are scored against a copy of the scorer's state
+# plus the KCI and mapping links (see scenarios.py); nothing is written.
+MAX_SCENARIOS = 500
+
+async def load_scenario_model() -> ScenarioModel:
+    scorer = await get_risk_scorer()
+    snapshot = await run_in_threadpool(scorer.snapshot)
+    unified_controls = await db.unified_controls.find({}, {"_id": 0, "id": 1, "mapped_framework_controls": 1}).to_list(None)
+    framework_controls = await db.framework_controls.find({}, {"_id": 0, "id": 1, "framework_id": 1}).to_list(None)
+    kcis = await db.kcis.find({}, {"_id": 0, "kri_id": 1, "unified_control_id": 1}).to_list(None)
+    names = {}
+    for kind, collection in (("risk", "risks"), ("kri", "kris"), ("framework", "frameworks")):
+        names[kind] = {d["id"]: d.get("name", "") async for d in db[collection].find({}, {"_id": 0, "id": 1, "name": 1})}
+    return await run_in_threadpool(ScenarioModel, snapshot, unified_controls, framework_controls, kcis, names)
+
+# ============ IMPACT GRAPH ============
+
+# Controls, requirements, policies, risks, KRIs and KCIs linked by their ID
+# fields, kept current from the change hub (see impact_graph.py)
+impact_graph = ImpactGraph()
+impact_graph_updater = ImpactGraphUpdater(db, change_hub, impact_graph)
+
 # ============ AI SERVICE ============
 
 async def get_ai_analysis(prompt: str) -> str:
@@ -188,111 +583,172 @@ async def get_ai_analysis(prompt: str) -> str:
 # ============ FRAMEWORK ENDPOINTS ============
 
 @api_router.get("/frameworks", response_model=List[Framework])
-async def get_frameworks():
-    frameworks = await db.frameworks.find({}, {"_id": 0}).to_list(1000)
-    for fw in frameworks:
-        if isinstance(fw.get('created_at'), str):
-            fw['created_at'] = datetime.fromisoformat(fw['created_at'])
-    return frameworks
+async def get_frameworks(fields: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    selected = parse_fields(Framework, fields)
+    etag = await catalog_etag("frameworks", selected)
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    frameworks = await db.frameworks.find({}, projection(Framework, selected)).to_list(1000)
+    return list_response(Framework, frameworks, selected, etag)
 
 @api_router.post("/frameworks", response_model=Framework)
 async def create_framework(framework: Framework):
     fw_dict = framework.model_dump()
-    fw_dict['created_at'] = fw_dict['created_at'].isoformat()
-    await db.frameworks.insert_one(fw_dict)
+    await db.frameworks.insert_one(stamp(fw_dict))
+    change_hub.publish_local("frameworks", "insert", fw_dict["id"], fw_dict)
+    await bump_catalog_version("frameworks")
     return framework
 
 @api_router.patch("/frameworks/{framework_id}/toggle")
 async def toggle_framework(framework_id: str, enabled: bool):
     await db.frameworks.update_one(
         {"id": framework_id},
-        {"$set": {"enabled": enabled}}
+        {"$set": {"enabled": enabled, "updated_at": datetime.now(timezone.utc)}}
     )
+    change_hub.publish_local("frameworks", "update", framework_id)
+    await bump_catalog_version("frameworks")
     return {"message": "Framework updated"}
 
 @api_router.get("/framework-controls/{framework_id}", response_model=List[FrameworkControl])
-async def get_framework_controls(framework_id: str):
-    controls = await db.framework_controls.find({"framework_id": framework_id}, {"_id": 0}).to_list(1000)
-    for ctrl in controls:
-        if isinstance(ctrl.get('created_at'), str):
-            ctrl['created_at'] = datetime.fromisoformat(ctrl['created_at'])
-    return controls
+async def get_framework_controls(framework_id: str, fields: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    selected = parse_fields(FrameworkControl, fields)
+    etag = await catalog_etag("framework_controls", framework_id, selected)
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    controls = await db.framework_controls.find({"framework_id": framework_id}, projection(FrameworkControl, selected)).to_list(1000)
+    return list_response(FrameworkControl, controls, selected, etag)
+
+@api_router.get("/framework-controls/{framework_control_id}/satisfied-by", response_model=List[UnifiedControl])
+async def get_satisfied_by(framework_control_id: str, fields: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    """Unified controls mapped to a framework control, via the reverse index"""
+    selected = parse_fields(UnifiedControl, fields)
+    etag = await catalog_etag("unified_controls", "satisfied-by", framework_control_id, selected)
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    entry = await db.satisfied_by.find_one({"_id": framework_control_id})
+    ids = entry["unified_control_ids"] if entry else []
+    controls = await db.unified_controls.find({"id": {"$in": ids}}, projection(UnifiedControl, selected)).to_list(None) if ids else []
+    return list_response(UnifiedControl, controls, selected, etag)
+
+@api_router.get("/frameworks/{framework_id}/suggest-mappings")
+async def suggest_mappings(framework_id: str, top_k: int = 5, min_score: float = 0.1):
+    """Offline TF-IDF suggestions of unified controls for each control of a framework"""
+    if not 1 <= top_k <= 50:
+        raise HTTPException(status_code=400, detail="top_k must be between 1 and 50")
+    version = await catalog_version("unified_controls")
+    if not automapper.is_current(version):
+        controls = await db.unified_controls.find(
+            {}, {"_id": 0, "id": 1, "ccf_id": 1, "name": 1, "description": 1}
+        ).to_list(None)
+        await run_in_threadpool(automapper.fit, controls, version)
+    framework_controls = await db.framework_controls.find(
+        {"framework_id": framework_id},
+        {"_id": 0, "id": 1, "control_id": 1, "title": 1, "description": 1, "testing_procedure": 1},
+    ).to_list(None)
+    # Controls already mapped, from the reverse index, are not suggested again
+    mapped = {
+        entry["_id"]: set(entry.get("unified_control_ids", []))
+        async for entry in db.satisfied_by.find({"_id": {"$in": [fc["id"] for fc in framework_controls]}})
+    }
+    suggestions = await run_in_threadpool(automapper.suggest, framework_controls, top_k, min_score, mapped)
+    return FastJSONResponse(suggestions)
 
 # ============ UNIFIED CONTROL ENDPOINTS ============
 
 @api_router.get("/unified-controls", response_model=List[UnifiedControl])
-async def get_unified_controls():
-    controls = await db.unified_controls.find({}, {"_id": 0}).to_list(1000)
-    for ctrl in controls:
-        if isinstance(ctrl.get('created_at'), str):
-            ctrl['created_at'] = datetime.fromisoformat(ctrl['created_at'])
-    return controls
+async def get_unified_controls(fields: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    selected = parse_fields(UnifiedControl, fields)
+    etag = await catalog_etag("unified_controls", selected)
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    controls = await db.unified_controls.find({}, projection(UnifiedControl, selected)).to_list(1000)
+    return list_response(UnifiedControl, controls, selected, etag)
 
 @api_router.post("/unified-controls", response_model=UnifiedControl)
-async def create_unified_control(control: UnifiedControl):
+async def create_unified_control(control: UnifiedControl, response: Response):
     ctrl_dict = control.model_dump()
-    ctrl_dict['created_at'] = ctrl_dict['created_at'].isoformat()
-    await db.unified_controls.insert_one(ctrl_dict)
+    duplicates, signature = await find_near_duplicates("unified_controls", ctrl_dict)
+    await db.unified_controls.insert_one(stamp(ctrl_dict))
+    await reindex_mappings(ctrl_dict["id"], [], ctrl_dict["mapped_framework_controls"])
+    change_hub.publish_local("unified_controls", "insert", ctrl_dict["id"], ctrl_dict)
+    await bump_catalog_version("unified_controls")
+    await remember_for_dedup("unified_controls", ctrl_dict["id"], signature)
+    response.headers.update(duplicate_header(duplicates))
     return control
 
 @api_router.patch("/unified-controls/{control_id}/map-framework")
 async def map_framework_to_unified(control_id: str, framework_control_ids: List[str]):
-    await db.unified_controls.update_one(
+    previous = await db.unified_controls.find_one_and_update(
         {"id": control_id},
-        {"$set": {"mapped_framework_controls": framework_control_ids}}
+        {"$set": {"mapped_framework_controls": framework_control_ids, "updated_at": datetime.now(timezone.utc)}},
+        projection={"_id": 0, "mapped_framework_controls": 1},
     )
+    if previous is None:
+        raise HTTPException(status_code=404, detail="Unified control not found")
+    await reindex_mappings(control_id, previous.get("mapped_framework_controls", []), framework_control_ids)
+    change_hub.publish_local("unified_controls", "update", control_id)
+    await bump_catalog_version("unified_controls")
     return {"message": "Mapping updated"}
 
 @api_router.patch("/unified-controls/{control_id}/map-policy")
 async def map_policy_to_unified(control_id: str, policy_ids: List[str]):
     await db.unified_controls.update_one(
         {"id": control_id},
-        {"$set": {"mapped_policies": policy_ids}}
+        {"$set": {"mapped_policies": policy_ids, "updated_at": datetime.now(timezone.utc)}}
     )
+    change_hub.publish_local("unified_controls", "update", control_id)
+    await bump_catalog_version("unified_controls")
     return {"message": "Policy mapping updated"}
 
 # ============ INTERNAL POLICY ENDPOINTS ============
 
 @api_router.get("/policies", response_model=List[InternalPolicy])
-async def get_policies():
-    policies = await db.policies.find({}, {"_id": 0}).to_list(1000)
-    for pol in policies:
-        if isinstance(pol.get('created_at'), str):
-            pol['created_at'] = datetime.fromisoformat(pol['created_at'])
-    return policies
+async def get_policies(fields: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    selected = parse_fields(InternalPolicy, fields)
+    etag = await catalog_etag("policies", selected)
+    cached = not_modified(if_none_match, etag)
+    if cached:
+        return cached
+    policies = await db.policies.find({}, projection(InternalPolicy, selected)).to_list(1000)
+    return list_response(InternalPolicy, policies, selected, etag)
 
 @api_router.post("/policies", response_model=InternalPolicy)
-async def create_policy(policy: InternalPolicy):
+async def create_policy(policy: InternalPolicy, response: Response):
     pol_dict = policy.model_dump()
-    pol_dict['created_at'] = pol_dict['created_at'].isoformat()
-    await db.policies.insert_one(pol_dict)
+    duplicates, signature = await find_near_duplicates("policies", pol_dict)
+    await db.policies.insert_one(stamp(pol_dict))
+    change_hub.publish_local("policies", "insert", pol_dict["id"], pol_dict)
+    await bump_catalog_version("policies")
+    await remember_for_dedup("policies", pol_dict["id"], signature)
+    response.headers.update(duplicate_header(duplicates))
     return policy
 
 # ============ CONTROL TESTING ENDPOINTS ============
 
 @api_router.get("/control-tests", response_model=List[ControlTest])
-async def get_control_tests():
-    tests = await db.control_tests.find({}, {"_id": 0}).to_list(1000)
-    for test in tests:
-        if isinstance(test.get('test_date'), str):
-            test['test_date'] = datetime.fromisoformat(test['test_date'])
-        if isinstance(test.get('created_at'), str):
-            test['created_at'] = datetime.fromisoformat(test['created_at'])
-    return tests
+async def get_control_tests(fields: Optional[str] = None):
+    selected = parse_fields(ControlTest, fields)
+    tests = await db.control_tests.find({}, projection(ControlTest, selected)).to_list(1000)
+    return list_response(ControlTest, tests, selected)
 
 @api_router.post("/control-tests", response_model=ControlTest)
 async def create_control_test(test: ControlTest):
     test_dict = test.model_dump()
-    test_dict['test_date'] = test_dict['test_date'].isoformat()
-    test_dict['created_at'] = test_dict['created_at'].isoformat()
-    await db.control_tests.insert_one(test_dict)
+    await db.control_tests.insert_one(stamp(test_dict))
+    change_hub.publish_local("control_tests", "insert", test_dict["id"], test_dict)
     
-    # Auto-create issue if test failed
+    # Auto-create issue if test failed, noting what the failure affects
     if test.result == "Fail":
         control = await db.unified_controls.find_one({"id": test.unified_control_id}, {"_id": 0})
+        impact = impact_graph.impact(test.unified_control_id) if impact_graph_updater.ready.is_set() else None
         issue = Issue(
             title=f"Control Test Failed: {control.get('name', 'Unknown')}",
-            description=f"Control test failed. Notes: {test.notes or 'No notes provided'}",
+            description=f"Control test failed. Notes: {test.notes or 'No notes provided'}"
+                        + (f"\nImpact: {summarize_impact(impact)}" if impact else ""),
             control_test_id=test.id,
             unified_control_id=test.unified_control_id,
             severity="High",
@@ -300,21 +756,20 @@ async def create_control_test(test: ControlTest):
             assigned_to=test.tester
         )
         issue_dict = issue.model_dump()
-        issue_dict['created_at'] = issue_dict['created_at'].isoformat()
-        issue_dict['updated_at'] = issue_dict['updated_at'].isoformat()
-        await db.issues.insert_one(issue_dict)
+        await db.issues.insert_one(stamp(issue_dict))
+        change_hub.publish_local("issues", "insert", issue_dict["id"], issue_dict)
     
+    scorer = await get_risk_scorer()
+    await save_residual_scores(scorer.record_test(test.unified_control_id, test.result, test.test_date, test.id))
     return test
 
 # ============ EVIDENCE ENDPOINTS ============
 
 @api_router.get("/evidence", response_model=List[Evidence])
-async def get_evidence():
-    evidence = await db.evidence.find({}, {"_id": 0}).to_list(1000)
-    for ev in evidence:
-        if isinstance(ev.get('collected_at'), str):
-            ev['collected_at'] = datetime.fromisoformat(ev['collected_at'])
-    return evidence
+async def get_evidence(fields: Optional[str] = None):
+    selected = parse_fields(Evidence, fields)
+    evidence = await db.evidence.find({}, projection(Evidence, selected)).to_list(1000)
+    return list_response(Evidence, evidence, selected)
 
 @api_router.post("/evidence/upload")
 async def upload_evidence(
@@ -340,44 +795,40 @@ async def upload_evidence(
     )
     
     ev_dict = evidence.model_dump()
-    ev_dict['collected_at'] = ev_dict['collected_at'].isoformat()
-    await db.evidence.insert_one(ev_dict)
+    await db.evidence.insert_one(stamp(ev_dict))
+    change_hub.publish_local("evidence", "insert", ev_dict["id"], ev_dict)
     
     return {"message": "Evidence uploaded", "evidence_id": evidence.id}
 
 @api_router.post("/evidence/automated")
 async def create_automated_evidence(evidence: Evidence):
     ev_dict = evidence.model_dump()
-    ev_dict['collected_at'] = ev_dict['collected_at'].isoformat()
-    await db.evidence.insert_one(ev_dict)
+    await db.evidence.insert_one(stamp(ev_dict))
+    change_hub.publish_local("evidence", "insert", ev_dict["id"], ev_dict)
     return evidence
 
 # ============ ISSUE MANAGEMENT ENDPOINTS ============
 
 @api_router.get("/issues", response_model=List[Issue])
-async def get_issues():
-    issues = await db.issues.find({}, {"_id": 0}).to_list(1000)
-    for issue in issues:
-        if isinstance(issue.get('created_at'), str):
-            issue['created_at'] = datetime.fromisoformat(issue['created_at'])
-        if isinstance(issue.get('updated_at'), str):
-            issue['updated_at'] = datetime.fromisoformat(issue['updated_at'])
-    return issues
+async def get_issues(fields: Optional[str] = None):
+    selected = parse_fields(Issue, fields)
+    issues = await db.issues.find({}, projection(Issue, selected)).to_list(1000)
+    return list_response(Issue, issues, selected)
 
 @api_router.post("/issues", response_model=Issue)
 async def create_issue(issue: Issue):
     issue_dict = issue.model_dump()
-    issue_dict['created_at'] = issue_dict['created_at'].isoformat()
-    issue_dict['updated_at'] = issue_dict['updated_at'].isoformat()
-    await db.issues.insert_one(issue_dict)
+    await db.issues.insert_one(stamp(issue_dict))
+    change_hub.publish_local("issues", "insert", issue_dict["id"], issue_dict)
     return issue
 
 @api_router.patch("/issues/{issue_id}/status")
 async def update_issue_status(issue_id: str, status: str):
     await db.issues.update_one(
         {"id": issue_id},
-        {"$set": {"status": status, "updated_at": datetime.now(timezone.utc).isoformat()}}
+        {"$set": {"status": status, "updated_at": datetime.now(timezone.utc)}}
     )
+    change_hub.publish_local("issues", "update", issue_id)
     return {"message": "Issue status updated"}
 
 @api_router.patch("/issues/{issue_id}/exception")
@@ -387,28 +838,72 @@ async def add_exception(issue_id: str, exception_details: Dict):
         {"$set": {
             "has_exception": True,
             "exception_details": exception_details,
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         }}
     )
+    change_hub.publish_local("issues", "update", issue_id)
     return {"message": "Exception added"}
 
 # ============ RISK MANAGEMENT ENDPOINTS ============
 
 @api_router.get("/risks", response_model=List[Risk])
-async def get_risks():
-    risks = await db.risks.find({}, {"_id": 0}).to_list(1000)
-    for risk in risks:
-        if isinstance(risk.get('created_at'), str):
-            risk['created_at'] = datetime.fromisoformat(risk['created_at'])
-    return risks
+async def get_risks(fields: Optional[str] = None):
+    selected = parse_fields(Risk, fields)
+    risks = await db.risks.find({}, projection(Risk, selected)).to_list(1000)
+    return list_response(Risk, risks, selected)
+
+def validate_quantification(risk_id: str, quantification: Optional[RiskQuantification]):
+    if quantification is not None:
+        try:
+            RiskModels.from_risks([{"id": risk_id, "quantification": quantification.model_dump()}])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
 @api_router.post("/risks", response_model=Risk)
 async def create_risk(risk: Risk):
+    validate_quantification(risk.id, risk.quantification)
+    scorer = await get_risk_scorer()
+    risk.residual_risk_score = scorer.upsert_risk(risk.model_dump())
     risk_dict = risk.model_dump()
-    risk_dict['created_at'] = risk_dict['created_at'].isoformat()
-    await db.risks.insert_one(risk_dict)
+    try:
+        await db.risks.insert_one(stamp(risk_dict))
+    except Exception:
+        scorer.remove_risk(risk.id)  # don't leave a risk the database never stored
+        raise
+    change_hub.publish_local("risks", "insert", risk_dict["id"], risk_dict)
     return risk
 
+@api_router.post("/risks/recompute-residuals")
+async def recompute_residuals():
+    """Reload the scorer from the database and rescore every risk in one vectorized pass"""
+    scorer = await get_risk_scorer(reload=True)
+    scores = await run_in_threadpool(scorer.recompute_all)
+    updated = await save_residual_scores(scores)
+    return {"risks": len(scores), "updated": updated}
+
+@api_router.put("/risks/{risk_id}/quantification")
+async def set_risk_quantification(risk_id: str, quantification: RiskQuantification):
+    validate_quantification(risk_id, quantification)
+    result = await db.risks.update_one(
+        {"id": risk_id},
+        {"$set": {"quantification": quantification.model_dump(), "updated_at": datetime.now(timezone.utc)}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Risk not found")
+    change_hub.publish_local("risks", "update", risk_id)
+    return {"message": "Quantification updated"}
+
+@api_router.delete("/risks/{risk_id}/quantification")
+async def clear_risk_quantification(risk_id: str):
+    result = await db.risks.update_one(
+        {"id": risk_id},
+        {"$set": {"quantification": None, "updated_at": datetime.now(timezone.utc)}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Risk not found")
+    change_hub.publish_local("risks", "update", risk_id)
+    return {"message": "Quantification removed"}
+
 @api_router.post("/risks/ai-suggest")
 async def ai_suggest_risks(industry: str = "General"):
     prompt = f"""As a GRC expert, suggest top 10 risks for {industry} industry.
@@ -429,35 +924,33 @@ Provide in JSON format:
 # ============ KRI ENDPOINTS ============
 
 @api_router.get("/kris", response_model=List[KRI])
-async def get_kris():
-    kris = await db.kris.find({}, {"_id": 0}).to_list(1000)
-    for kri in kris:
-        if isinstance(kri.get('created_at'), str):
-            kri['created_at'] = datetime.fromisoformat(kri['created_at'])
-    return kris
+async def get_kris(fields: Optional[str] = None):
+    selected = parse_fields(KRI, fields)
+    kris = await db.kris.find({}, projection(KRI, selected)).to_list(1000)
+    return list_response(KRI, kris, selected)
 
 @api_router.post("/kris", response_model=KRI)
 async def create_kri(kri: KRI):
     kri_dict = kri.model_dump()
-    kri_dict['created_at'] = kri_dict['created_at'].isoformat()
-    await db.kris.insert_one(kri_dict)
+    await db.kris.insert_one(stamp(kri_dict))
+    change_hub.publish_local("kris", "insert", kri_dict["id"], kri_dict)
     return kri
 
 # ============ KCI ENDPOINTS ============
 
 @api_router.get("/kcis", response_model=List[KCI])
-async def get_kcis():
-    kcis = await db.kcis.find({}, {"_id": 0}).to_list(1000)
-    for kci in kcis:
-        if isinstance(kci.get('created_at'), str):
-            kci['created_at'] = datetime.fromisoformat(kci['created_at'])
-    return kcis
+async def get_kcis(fields: Optional[str] = None):
+    selected = parse_fields(KCI, fields)
+    kcis = await db.kcis.find({}, projection(KCI, selected)).to_list(1000)
+    return list_response(KCI, kcis, selected)
 
 @api_router.post("/kcis", response_model=KCI)
 async def create_kci(kci: KCI):
     kci_dict = kci.model_dump()
-    kci_dict['created_at'] = kci_dict['created_at'].isoformat()
-    await db.kcis.insert_one(kci_dict)
+    await db.kcis.insert_one(stamp(kci_dict))
+    change_hub.publish_local("kcis", "insert", kci_dict["id"], kci_dict)
+    scorer = await get_risk_scorer()
+    await save_residual_scores(scorer.record_kci(kci_dict))
     return kci
 
 # ============ AI ANALYSIS ENDPOINT ============
@@ -525,23 +1018,208 @@ async def get_dashboard_stats():
         "avg_residual_risk": round(avg_risk, 2)
     }
 
+# ============ DEDUPLICATION ENDPOINTS ============
+
+def dedup_collection(collection: str) -> str:
+    if collection not in DEDUP_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Deduplication supports: {', '.join(sorted(DEDUP_FIELDS))}")
+    return collection
+
+@api_router.post("/dedup/{collection}/check")
+async def check_duplicates(collection: str, doc: Dict[str, Any]):
+    """Near-duplicates of a draft document (name/description) before it is created"""
+    matches, _ = await find_near_duplicates(dedup_collection(collection), doc)
+    return {"duplicates": matches}
+
+@api_router.get("/dedup/{collection}/clusters")
+async def duplicate_clusters(collection: str, threshold: float = DEFAULT_THRESHOLD):
+    """Batch report: clusters of near-duplicate documents with similarity scores"""
+    fields = DEDUP_FIELDS[dedup_collection(collection)]
+    if not 0 < threshold <= 1:
+        raise HTTPException(status_code=400, detail="threshold must be in (0, 1]")
+    docs = await db[collection].find({}, {"_id": 0, "id": 1, **{f: 1 for f in fields}}).to_list(None)
+    names = {d["id"]: d.get("name", "") for d in docs}
+    index = await run_in_threadpool(build_index, docs, fields, threshold)
+    clusters = await run_in_threadpool(index.clusters)
+    for cluster in clusters:
+        cluster["members"] = [{"id": m, "name": names.get(m, "")} for m in cluster["members"]]
+    return {"collection": collection, "threshold": threshold, "documents": len(docs), "clusters": clusters}
+
+# ============ IMPACT ENDPOINT ============
+
+@api_router.get("/impact/{control_id}")
+async def control_impact(control_id: str, max_depth: Optional[int] = None):
+    """Risks, KRIs, KCIs, framework controls, frameworks and policies a failure of the control reaches"""
+    if max_depth is not None and max_depth < 1:
+        raise HTTPException(status_code=400, detail="max_depth must be at least 1")
+    if not impact_graph_updater.ready.is_set():
+        raise HTTPException(status_code=503, detail="Impact graph is still building")
+    impact = await run_in_threadpool(impact_graph.impact, control_id, max_depth)
+    if impact is None:
+        raise HTTPException(status_code=404, detail="Unified control not found")
+    impact["summary"] = summarize_impact(impact)
+    return FastJSONResponse(impact)
+
+# ============ WHAT-IF SCENARIO ENDPOINT ============
+
+@api_router.post("/scenarios/evaluate")
+async def evaluate_scenarios(batch: ScenarioBatch):
+    """Residual risk, KRI control health and framework coverage under each scenario, diffed against today"""
+    if not 1 <= len(batch.scenarios) <= MAX_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {MAX_SCENARIOS} scenarios")
+    model = await load_scenario_model()
+    scenarios = [s.model_dump() for s in batch.scenarios]
+    try:
+        results = await run_in_threadpool(model.run, scenarios)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    body = {"scenarios": results}
+    if batch.include_baseline:
+        body["baseline"] = await run_in_threadpool(model.baseline_summary)
+    return FastJSONResponse(body)
+
+# ============ RISK QUANTIFICATION ENDPOINT ============
+# Monte Carlo over the risks that carry a quantification model (see quant.py).
+# Runs above a few hundred thousand iterations should use several workers.
+# Multi-worker runs share one process pool, which caps simulation processes
+# for the whole server; it starts on first use.
+MAX_QUANT_ITERATIONS = 5_000_000
+QUANT_POOL_WORKERS = int(os.environ.get("QUANT_POOL_WORKERS", os.cpu_count() or 1))
+quant_pool = None
+
+def get_quant_pool():
+    global quant_pool
+    if quant_pool is None:
+        quant_pool = process_pool(QUANT_POOL_WORKERS)
+    return quant_pool
+
+@api_router.post("/quant/simulate")
+async def simulate_risk_losses(request: QuantSimulationRequest):
+    """Loss exceedance curve, VaR/TVaR and per-risk annualized loss; pass the returned seed to repeat a run"""
+    if not 1 <= request.iterations <= MAX_QUANT_ITERATIONS:
+        raise HTTPException(status_code=400, detail=f"iterations must be between 1 and {MAX_QUANT_ITERATIONS}")
+    if request.seed is not None and request.seed < 0:
+        raise HTTPException(status_code=400, detail="seed must be zero or more")
+    query: Dict[str, Any] = {"quantification": {"$ne": None}}
+    if request.risk_ids is not None:
+        query["id"] = {"$in": request.risk_ids}
+    risks = await db.risks.find(query, {"_id": 0, "id": 1, "name": 1, "quantification": 1}).to_list(None)
+    try:
+        models = RiskModels.from_risks(risks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not len(models):
+        raise HTTPException(status_code=404, detail="No quantified risks to simulate")
+    workers = max(1, min(request.workers, QUANT_POOL_WORKERS))
+    pool = get_quant_pool() if workers > 1 else None
+    result = await run_in_threadpool(simulate_losses, models, request.iterations, request.seed, workers, pool)
+    names = {r["id"]: r.get("name", "") for r in risks}
+    for risk in result["risks"]:
+        risk["name"] = names[risk["id"]]
+    result["workers"] = workers
+    return FastJSONResponse(result)
+
+# ============ SEARCH ENDPOINT ============
+
+@api_router.get("/search")
+async def search(q: str, collections: Optional[str] = None, limit: int = 20):
+    """Ranked matches across controls, framework requirements, policies, issues and risks.
+
+    `title` and `snippet` are HTML-escaped with matching terms wrapped in <mark>.
+    """
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+    names = [c.strip() for c in collections.split(",") if c.strip()] if collections else None
+    unknown = [c for c in names or [] if c not in SEARCH_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(unknown)}")
+    if not search_indexer.ready.is_set():
+        raise HTTPException(status_code=503, detail="Search index is still building")
+    hits = await run_in_threadpool(search_index.search, q, names, limit)
+    return FastJSONResponse({"query": q, "hits": hits})
+
+# ============ SYNC ENDPOINT ============
+
+@api_router.get("/sync")
+async def sync_changes(since: Optional[str] = None, collections: Optional[str] = None):
+    """Changes since a token from a previous sync; omit `since` for a full snapshot.
+
+    Clients apply `deleted` before `upserted`, then keep `token` for the next call.
+    `reset` means the snapshot is complete and replaces the client's copy.
+    """
+    names = parse_collections(collections) or list(SYNC_COLLECTIONS)
+
+    now = datetime.now(timezone.utc)
+    since_ts = decode_sync_token(since) if since else None
+    # Tombstones older than the TTL are gone, so such a client needs a full snapshot
+    reset = since_ts is None or since_ts < now - timedelta(days=SYNC_TOMBSTONE_TTL_DAYS)
+
+    changes = {}
+    for name in names:
+        model = SYNC_COLLECTIONS[name]
+        query = {} if reset else {"updated_at": {"$gt": since_ts}}
+        rows = await db[name].find(query, projection(model)).to_list(None)
+        entry = {"upserted": rows, "deleted": []}
+        if not reset:
+            tombstones = await db.sync_tombstones.find(
+                {"collection": name, "deleted_at": {"$gt": since_ts}}, {"_id": 0, "id": 1}
+            ).to_list(None)
+            entry["deleted"] = [t["id"] for t in tombstones]
+        changes[name] = entry
+
+    return FastJSONResponse({
+        "token": encode_sync_token(now - SYNC_OVERLAP),
+        "reset": reset,
+        "changes": changes,
+    })
+
+# ============ LIVE CHANGE FEED ============
+
+@api_router.websocket("/ws/changes")
+async def changes_websocket(websocket: WebSocket, collections: Optional[str] = None, department: Optional[str] = None):
+    """Push change events over a WebSocket; pings keep idle connections open"""
+    try:
+        names = parse_collections(collections)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    await websocket.accept()
+    sub = change_hub.subscribe(names, department)
+    try:
+        while True:
+            event = await sub.get(timeout=LIVE_HEARTBEAT_SECONDS)
+            await websocket.send_text(encode_event(event or {"op": "ping"}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        change_hub.unsubscribe(sub)
+
+@api_router.get("/changes/stream")
+async def changes_stream(request: Request, collections: Optional[str] = None, department: Optional[str] = None):
+    """Server-sent events variant of /ws/changes"""
+    names = parse_collections(collections)
+    sub = change_hub.subscribe(names, department)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                event = await sub.get(timeout=LIVE_HEARTBEAT_SECONDS)
+                yield f"data: {encode_event(event)}\n\n" if event else ": ping\n\n"
+        finally:
+            change_hub.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # ============ SEED DATA ENDPOINT ============
 
 @api_router.post("/seed-production-data")
 async def seed_production_data():
     """Seeds the database with production-ready framework and sample data"""
     
-    # Clear existing data
-    await db.frameworks.delete_many({})
-    await db.framework_controls.delete_many({})
-    await db.unified_controls.delete_many({})
-    await db.policies.delete_many({})
-    await db.control_tests.delete_many({})
-    await db.evidence.delete_many({})
-    await db.issues.delete_many({})
-    await db.risks.delete_many({})
-    await db.kris.delete_many({})
-    await db.kcis.delete_many({})
+    # Clear existing data, leaving tombstones so synced clients drop it too
+    for name in SYNC_COLLECTIONS:
+        await delete_with_tombstones(name, {})
     
     # Import framework data
     from seed_data import get_frameworks_data, get_sample_data
@@ -551,19 +1229,25 @@ async def seed_production_data():
     
     # Insert frameworks
     for fw in frameworks_data['frameworks']:
-        await db.frameworks.insert_one(fw)
+        await db.frameworks.insert_one(stamp(fw))
+        change_hub.publish_local("frameworks", "insert", fw["id"], fw)
     
     # Insert framework controls
     for ctrl in frameworks_data['framework_controls']:
-        await db.framework_controls.insert_one(ctrl)
+        await db.framework_controls.insert_one(stamp(ctrl))
+        change_hub.publish_local("framework_controls", "insert", ctrl["id"], ctrl)
     
     # Insert sample data
     for uc in sample_data['unified_controls']:
-        await db.unified_controls.insert_one(uc)
+        await db.unified_controls.insert_one(stamp(uc))
+        change_hub.publish_local("unified_controls", "insert", uc["id"], uc)
     
     for pol in sample_data['policies']:
-        await db.policies.insert_one(pol)
+        await db.policies.insert_one(stamp(pol))
+        change_hub.publish_local("policies", "insert", pol["id"], pol)
     
+    await rebuild_satisfied_by()
+    await bump_catalog_version(*CATALOG_COLLECTIONS)
     return {"message": "Production data seeded successfully"}
 
 @api_router.get("/")
@@ -572,12 +1256,15 @@ async def root():
 
 app.include_router(api_router)
 
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Possible-Duplicates"],
 )
 
 logging.basicConfig(
@@ -586,6 +1273,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def init_sync_indexes():
+    await ensure_sync_indexes()
+    await db.unified_controls.create_index("id")
+    await ensure_satisfied_by()
+    change_watcher.start()
+    search_indexer.start()
+    impact_graph_updater.start()
+    risk_scorer_updater.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await search_indexer.stop()
+    await impact_graph_updater.stop()
+    await risk_scorer_updater.stop()
+    if quant_pool is not None:
+        quant_pool.shutdown(cancel_futures=True)
+    await change_watcher.stop()
     client.close()
\ No newline at end of file
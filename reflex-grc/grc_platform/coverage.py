@@ -0,0 +1,178 @@
+"""Framework coverage matrix.
+
+Rows are framework requirements (framework name, control id), and columns
+are unified controls, packed eight per byte. Row r has bit c set when
+unified control c maps to requirement r. Given the set of passing controls
+as a packed mask, "which requirements are covered" is one AND over the
+whole matrix. Per-framework scores are that result reduced with `bincount`.
+No query walks `mapped_framework_controls` lists.
+
+Mapping changes are applied in place. `update_control` rewrites one column,
+new requirements append rows, and new controls append columns. Capacity
+grows geometrically, so updates rarely reallocate.
+"""
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Set bits per byte value, for popcounts over packed rows
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+class CoverageMatrix:
+    """Packed requirement x control bitsets with vectorized coverage queries"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._bits = np.zeros((64, 8), dtype=np.uint8)  # requirements x packed controls
+        self._req_framework = np.zeros(64, dtype=np.int32)
+        self._n_reqs = 0
+        self._n_controls = 0
+        self._req_index: Dict[Tuple[str, str], int] = {}
+        self._req_ids: List[str] = []
+        self._framework_index: Dict[str, int] = {}
+        self._frameworks: List[str] = []
+        self._control_index: Dict[str, int] = {}
+        self._control_ids: List[str] = []
+        self._control_names: List[str] = []
+
+    # ---------- building ----------
+
+    def build(self, frameworks: Iterable[Dict], unified_controls: Iterable[Dict]):
+        """Rebuild from framework documents (with `controls`) and unified controls (with mappings)"""
+        with self._lock:
+            self._reset()
+            for fw in frameworks:
+                self.add_framework(fw)
+            controls = list(unified_controls)
+            rows, cols = [], []
+            for ctrl in controls:
+                col = self._control_col(ctrl.get("ccf_id", ""), ctrl.get("name", ""))
+                for m in ctrl.get("mapped_framework_controls", []):
+                    if m.get("framework") and m.get("control_id"):
+                        rows.append(self._requirement_row(m["framework"], m["control_id"]))
+                        cols.append(col)
+            if rows:
+                r = np.asarray(rows, dtype=np.intp)
+                c = np.asarray(cols, dtype=np.intp)
+                np.bitwise_or.at(self._bits, (r, c >> 3), (0x80 >> (c & 7)).astype(np.uint8))
+
+    def add_framework(self, framework: Dict):
+        """Register a framework's requirements so unmapped ones count against its score"""
+        with self._lock:
+            name = framework.get("name", "")
+            self._framework_row(name)
+            for req in framework.get("controls", []) or []:
+                if req.get("id"):
+                    self._requirement_row(name, req["id"])
+
+    def update_control(self, control: Dict):
+        """Apply a unified control's current mappings (insert or mapping change)"""
+        with self._lock:
+            col = self._control_col(control.get("ccf_id", ""), control.get("name", ""))
+            byte, bit = col >> 3, np.uint8(0x80 >> (col & 7))
+            self._bits[:self._n_reqs, byte] &= ~bit
+            for m in control.get("mapped_framework_controls", []):
+                if m.get("framework") and m.get("control_id"):
+                    row = self._requirement_row(m["framework"], m["control_id"])  # may grow _bits
+                    self._bits[row, byte] |= bit
+
+    def remove_control(self, ccf_id: str):
+        """Clear a control's column; the slot stays reserved so other columns keep their positions"""
+        with self._lock:
+            col = self._control_index.get(ccf_id)
+            if col is not None:
+                self._bits[:self._n_reqs, col >> 3] &= ~np.uint8(0x80 >> (col & 7))
+
+    def _framework_row(self, name: str) -> int:
+        idx = self._framework_index.get(name)
+        if idx is None:
+            idx = self._framework_index[name] = len(self._frameworks)
+            self._frameworks.append(name)
+        return idx
+
+    def _requirement_row(self, framework: str, control_id: str) -> int:
+        key = (framework, control_id)
+        row = self._req_index.get(key)
+        if row is None:
+            if self._n_reqs == self._bits.shape[0]:
+                self._bits = np.vstack([self._bits, np.zeros_like(self._bits)])
+                self._req_framework = np.concatenate([self._req_framework, np.zeros_like(self._req_framework)])
+            row = self._req_index[key] = self._n_reqs
+            self._req_ids.append(control_id)
+            self._req_framework[row] = self._framework_row(framework)
+            self._n_reqs += 1
+        return row
+
+    def _control_col(self, ccf_id: str, name: str) -> int:
+        col = self._control_index.get(ccf_id)
+        if col is None:
+            if self._n_controls == self._bits.shape[1] * 8:
+                self._bits = np.hstack([self._bits, np.zeros_like(self._bits)])
+            col = self._control_index[ccf_id] = self._n_controls
+            self._control_ids.append(ccf_id)
+            self._control_names.append(name)
+            self._n_controls += 1
+        else:
+            self._control_names[col] = name or self._control_names[col]
+        return col
+
+    # ---------- queries ----------
+
+    def control_mask(self, ccf_ids: Iterable[str]) -> np.ndarray:
+        """Packed column mask for a set of unified controls"""
+        mask = np.zeros(self._bits.shape[1], dtype=np.uint8)
+        cols = np.fromiter((self._control_index[c] for c in ccf_ids if c in self._control_index), dtype=np.intp)
+        if cols.size:
+            np.bitwise_or.at(mask, cols >> 3, (0x80 >> (cols & 7)).astype(np.uint8))
+        return mask
+
+    def framework_scores(self, passing_ccf_ids: Iterable[str]) -> List[Dict]:
+        """Per framework: requirements total / mapped to any control / covered by a passing control"""
+        with self._lock:
+            bits = self._bits[:self._n_reqs]
+            fw = self._req_framework[:self._n_reqs]
+            n_fw = len(self._frameworks)
+            mapped = bits.any(axis=1)
+            covered = (bits & self.control_mask(passing_ccf_ids)).any(axis=1)
+            totals = np.bincount(fw, minlength=n_fw)
+            mapped_counts = np.bincount(fw, weights=mapped, minlength=n_fw).astype(int)
+            covered_counts = np.bincount(fw, weights=covered, minlength=n_fw).astype(int)
+            return [
+                {
+                    "framework": name,
+                    "total": int(totals[i]),
+                    "mapped": int(mapped_counts[i]),
+                    "covered": int(covered_counts[i]),
+                    "pct_covered": round(100 * covered_counts[i] / totals[i]) if totals[i] else 0,
+                }
+                for i, name in enumerate(self._frameworks)
+            ]
+
+    def covered_requirements(self, framework: str, passing_ccf_ids: Iterable[str]) -> List[Tuple[str, int]]:
+        """(requirement id, number of passing controls satisfying it) for one framework"""
+        with self._lock:
+            rows = self._framework_rows(framework)
+            hits = self._bits[rows] & self.control_mask(passing_ccf_ids)
+            counts = _POPCOUNT8[hits].sum(axis=1)
+            return [(self._req_ids[r], int(n)) for r, n in zip(rows, counts)]
+
+    def framework_controls(self, framework: str) -> List[Tuple[str, str]]:
+        """(ccf_id, name) of unified controls mapped to any requirement of a framework"""
+        with self._lock:
+            rows = self._framework_rows(framework)
+            if rows.size == 0:
+                return []
+            union = np.bitwise_or.reduce(self._bits[rows], axis=0)
+            cols = np.flatnonzero(np.unpackbits(union)[:self._n_controls])
+            return [(self._control_ids[c], self._control_names[c]) for c in cols]
+
+    def _framework_rows(self, framework: str) -> np.ndarray:
+        idx = self._framework_index.get(framework)
+        if idx is None:
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero(self._req_framework[:self._n_reqs] == idx)
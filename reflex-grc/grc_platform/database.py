@@ -1,10 +1,21 @@
 """Database service for MongoDB operations - Synchronous version"""
+from bson import json_util
 from pymongo import MongoClient
-from typing import List, Dict, Optional
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from typing import Callable, List, Dict, Optional
+import atexit
 import os
+import queue
+import re
+import socket
+import threading
+import time
 from dotenv import load_dotenv
 import hashlib
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from .coverage import CoverageMatrix
+from .typeahead import TYPEAHEAD_DEPARTMENT_SCOPED, TYPEAHEAD_KINDS, TypeaheadIndex
+from .live import change_feed
 
 # Load .env from the reflex-grc directory
 load_dotenv("/app/reflex-grc/.env")
@@ -12,18 +23,258 @@ load_dotenv("/app/reflex-grc/.env")
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "grc_reflex_db")
 
+# Write-behind audit logging: flush every N events or T milliseconds
+AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "200"))
+AUDIT_LOG_FLUSH_MS = int(os.getenv("AUDIT_LOG_FLUSH_MS", "500"))
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "10000"))
+AUDIT_LOG_ENQUEUE_TIMEOUT_MS = int(os.getenv("AUDIT_LOG_ENQUEUE_TIMEOUT_MS", "1000"))
+AUDIT_LOG_FLUSH_TIMEOUT_MS = int(os.getenv("AUDIT_LOG_FLUSH_TIMEOUT_MS", "5000"))
+# Failed batches are retried with exponential backoff, then spooled to a local file
+AUDIT_LOG_WRITE_RETRIES = int(os.getenv("AUDIT_LOG_WRITE_RETRIES", "5"))
+AUDIT_LOG_RETRY_BASE_MS = int(os.getenv("AUDIT_LOG_RETRY_BASE_MS", "500"))
+AUDIT_LOG_RETRY_MAX_MS = int(os.getenv("AUDIT_LOG_RETRY_MAX_MS", "8000"))
+AUDIT_LOG_SPOOL_PATH = os.getenv(
+    "AUDIT_LOG_SPOOL_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "audit_log_spool.jsonl")
+)
+
+# Audit logs are stored in one collection per month (audit_logs_YYYY_MM).
+# Partitions older than the retention window are archived (renamed out of the
+# query path) or dropped; 0 months keeps everything.
+AUDIT_LOG_RETENTION_MONTHS = int(os.getenv("AUDIT_LOG_RETENTION_MONTHS", "24"))
+AUDIT_LOG_RETENTION_ACTION = os.getenv("AUDIT_LOG_RETENTION_ACTION", "archive")
+AUDIT_LOG_PARTITION_RE = re.compile(r"^audit_logs_\d{4}_\d{2}$")
+# A process moving the legacy audit_logs collection holds a lease this long, renewed per batch
+AUDIT_LOG_MIGRATION_LEASE_S = 600
+
 print(f"[DB] Connecting to MongoDB: {MONGO_URL}, DB: {DB_NAME}")
 
+# Sortable columns of the paginated list pages, per collection
+PAGINATED_SORT_FIELDS = {
+    "risks": ["created_at", "residual_risk_score", "inherent_risk_score", "name"],
+    "issues": ["created_at", "severity", "due_date", "status"],
+    "control_tests": ["test_date", "result", "control_ccf_id"],
+    "ai_models": ["created_at", "name", "risk_level", "status"],
+}
+
+# Text index per searchable collection: field -> relevance weight
+SEARCH_TEXT_INDEXES = {
+    "unified_controls": {"ccf_id": 10, "name": 5, "description": 1},
+    "frameworks": {"controls.id": 10, "controls.name": 5, "name": 3, "controls.description": 1},
+    "policies": {"policy_id": 10, "name": 5, "description": 1},
+    "issues": {"title": 5, "description": 1},
+    "risks": {"name": 5, "description": 1, "category": 1},
+}
+# Searchable collections whose documents belong to a department
+SEARCH_DEPARTMENT_SCOPED = {"issues", "risks"}
+
+# Collection behind each type-ahead kind
+TYPEAHEAD_COLLECTIONS = {"control": "unified_controls", "risk": "risks", "kri": "kris"}
+
+# Indexes created on every audit log partition
+AUDIT_LOG_INDEXES = [
+    [("timestamp", -1), ("id", -1)],
+    [("user_email", 1), ("timestamp", -1), ("id", -1)],
+    [("resource", 1), ("timestamp", -1), ("id", -1)],
+    [("action", 1), ("timestamp", -1), ("id", -1)],
+]
+
 
 def hash_password(password: str) -> str:
     """Simple password hashing"""
     return hashlib.sha256(password.encode()).hexdigest()
 
 
+def audit_log_partition(timestamp: datetime) -> str:
+    """Monthly partition collection for a timestamp"""
+    if isinstance(timestamp, str):  # pre-migration ISO string
+        timestamp = datetime.fromisoformat(timestamp)
+    return f"audit_logs_{timestamp.year:04d}_{timestamp.month:02d}"
+
+
+class AuditLogWriter:
+    """Write-behind buffer for audit events.
+    
+    `enqueue` only puts the document on a bounded in-process queue. A
+    background thread hands batches to `sink` once `batch_size` events
+    are waiting or `flush_ms` has passed since the first one. When the queue
+    is full, callers block (backpressure) for up to `enqueue_timeout_ms` and
+    then write the event inline rather than dropping it.
+    
+    A batch the sink rejects is retried with exponential backoff. If it still
+    fails, it is appended to the local `spool_path` file, which is replayed
+    into the sink once writes succeed again. An event only counts as written
+    once the sink or the spool has it. Every queued event gets a sequence
+    number, so `flush` can wait for the events enqueued before the call
+    without waiting on later ones. Pending events are flushed on interpreter
+    shutdown.
+    """
+    
+    def __init__(self, sink: Callable[[List[Dict]], None], batch_size: int = AUDIT_LOG_BATCH_SIZE,
+                 flush_ms: int = AUDIT_LOG_FLUSH_MS, max_queue: int = AUDIT_LOG_QUEUE_SIZE,
+                 enqueue_timeout_ms: int = AUDIT_LOG_ENQUEUE_TIMEOUT_MS,
+                 retries: int = AUDIT_LOG_WRITE_RETRIES, spool_path: str = AUDIT_LOG_SPOOL_PATH):
+        self._sink = sink
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_ms / 1000
+        self._enqueue_timeout = enqueue_timeout_ms / 1000
+        self._retries = max(1, retries)
+        self._spool_path = spool_path
+        self._spool_lock = threading.Lock()  # inline writers and the writer thread share the spool
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._progress = threading.Condition()
+        self._last_seq = 0
+        self._pending: set = set()  # sequence numbers queued but not yet written
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def enqueue(self, doc: Dict):
+        if self._stopped.is_set():
+            self._deliver([doc])
+            return
+        with self._progress:
+            self._last_seq += 1
+            seq = self._last_seq
+            self._pending.add(seq)
+        try:
+            self._queue.put((seq, doc), timeout=self._enqueue_timeout)
+        except queue.Full:
+            print("[DB] Audit log queue full, writing event inline")
+            self._deliver([doc])
+            self._mark_written([seq])
+    
+    def flush(self, timeout: float = AUDIT_LOG_FLUSH_TIMEOUT_MS / 1000) -> bool:
+        """Wait until every event enqueued before this call is written; False on timeout"""
+        with self._progress:
+            marker = self._last_seq
+            return self._progress.wait_for(lambda: min(self._pending, default=marker + 1) > marker, timeout)
+    
+    def close(self):
+        """Stop the writer thread and flush whatever is still queued to the sink or the spool"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._thread.join(timeout=10)
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                break
+            self._deliver([doc for _, doc in batch])
+            self._mark_written([seq for seq, _ in batch])
+    
+    def _drain(self, block: bool) -> List[tuple]:
+        """Collect up to one batch of (seq, doc), waiting at most one flush interval after the first event"""
+        batch = []
+        deadline = None
+        while len(batch) < self._batch_size:
+            try:
+                if not block:
+                    batch.append(self._queue.get_nowait())
+                elif deadline is None:
+                    batch.append(self._queue.get(timeout=self._flush_interval))
+                    deadline = time.monotonic() + self._flush_interval
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _mark_written(self, seqs: List[int]):
+        with self._progress:
+            self._pending.difference_update(seqs)
+            self._progress.notify_all()
+    
+    def _write(self, batch: List[Dict]) -> bool:
+        try:
+            self._sink(batch)
+            return True
+        except Exception as e:
+            print(f"[ERROR] Failed to write {len(batch)} audit log(s): {e}")
+            return False
+    
+    def _deliver(self, batch: List[Dict]):
+        """Write a batch, retrying with backoff; spool it locally if the sink keeps failing"""
+        if not batch:
+            return
+        delay = AUDIT_LOG_RETRY_BASE_MS / 1000
+        for attempt in range(self._retries):
+            if self._write(batch):
+                self._replay_spool()
+                return
+            if attempt + 1 < self._retries and not self._stopped.is_set():
+                time.sleep(delay)
+                delay = min(delay * 2, AUDIT_LOG_RETRY_MAX_MS / 1000)
+        self._spool(batch)
+    
+    def _spool(self, batch: List[Dict]):
+        # Appends are retried until they land: an event is never reported written while lost
+        with self._spool_lock:
+            self._append_to_spool(batch)
+    
+    def _append_to_spool(self, batch: List[Dict]):
+        while True:
+            try:
+                with open(self._spool_path, "a", encoding="utf-8") as f:
+                    for doc in batch:
+                        f.write(json_util.dumps(doc) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                print(f"[DB] Spooled {len(batch)} audit log(s) to {self._spool_path}")
+                return
+            except OSError as e:
+                print(f"[ERROR] Failed to spool audit logs, retrying: {e}")
+                time.sleep(AUDIT_LOG_RETRY_MAX_MS / 1000)
+    
+    def _replay_spool(self):
+        """Move spooled events into the sink; the sink ignores ids it already has, so replays are idempotent"""
+        replaying = self._spool_path + ".replaying"
+        if not os.path.exists(self._spool_path) and not os.path.exists(replaying):
+            return
+        with self._spool_lock:
+            self._replay(replaying)
+    
+    def _replay(self, replaying: str):
+        try:
+            if not os.path.exists(replaying):
+                if not os.path.exists(self._spool_path):
+                    return
+                os.replace(self._spool_path, replaying)
+            with open(replaying, encoding="utf-8") as f:
+                docs = [json_util.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Failed to read audit log spool: {e}")
+            return
+        for i in range(0, len(docs), self._batch_size):
+            if not self._write(docs[i:i + self._batch_size]):
+                return  # left in place; the next successful write tries again
+        os.remove(replaying)
+        print(f"[DB] Replayed {len(docs)} spooled audit log(s)")
+    
+    def _run(self):
+        self._replay_spool()
+        while not self._stopped.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                self._deliver([doc for _, doc in batch])
+                self._mark_written([seq for seq, _ in batch])
+
+
 class DatabaseService:
     _instance = None
     _client = None
     _db = None
+    _audit_writer = None
+    _audit_partitions_ready: set = set()
+    _coverage: Optional[CoverageMatrix] = None
+    _coverage_stale = False
+    _coverage_versions: Optional[Dict[str, int]] = None
+    _typeahead: Optional[TypeaheadIndex] = None
+    _typeahead_stale: set = set()  # kinds to rebuild on next lookup
+    _typeahead_versions: Dict[str, int] = {}  # kind -> source collection's write counter when built
     
     def __new__(cls):
         if cls._instance is None:
@@ -32,14 +283,117 @@ class DatabaseService:
     
     def __init__(self):
         if DatabaseService._client is None:
-            DatabaseService._client = MongoClient(MONGO_URL)
+            DatabaseService._client = MongoClient(MONGO_URL, tz_aware=True)
             DatabaseService._db = DatabaseService._client[DB_NAME]
             print(f"[DB] Connected to database: {DB_NAME}")
+            self._ensure_indexes()
+            self._migrate_legacy_audit_logs()
+            self.apply_audit_retention()
+            DatabaseService._audit_writer = AuditLogWriter(self._write_audit_batch)
+            change_feed.bind_versions(DatabaseService._db)
+            change_feed.add_listener(self._on_change)
     
     @property
     def db(self):
         return DatabaseService._db
     
+    def _ensure_indexes(self):
+        """Create the indexes backing paginated list queries (idempotent)"""
+        for collection, sort_fields in PAGINATED_SORT_FIELDS.items():
+            for field in sort_fields:
+                self._db[collection].create_index([(field, -1), ("id", -1)])
+                self._db[collection].create_index([("department", 1), (field, -1), ("id", -1)])
+        for collection, weights in SEARCH_TEXT_INDEXES.items():
+            self._db[collection].create_index(
+                [(field, "text") for field in weights], weights=weights, name="search_text"
+            )
+    
+    # ========== PAGINATION ==========
+    def find_page(self, collection: str, query: Dict = None, sort_field: str = "created_at",
+                  descending: bool = True, skip: int = 0, limit: int = 25,
+                  after: Optional[tuple] = None) -> List[Dict]:
+        """Fetch one page of a collection, sorted DB-side.
+        
+        `after` is the (sort value, id) of the last row on the previous page;
+        when given, the page is located with a keyset query instead of `skip`.
+        """
+        query = dict(query or {})
+        direction = -1 if descending else 1
+        if after is not None:
+            value, last_id = after
+            op = "$lt" if descending else "$gt"
+            query["$or"] = [
+                {sort_field: {op: value}},
+                {sort_field: value, "id": {op: last_id}},
+            ]
+            skip = 0
+        cursor = (
+            self._db[collection].find(query, {"_id": 0})
+            .sort([(sort_field, direction), ("id", direction)])
+            .skip(skip)
+            .limit(limit)
+        )
+        return list(cursor)
+    
+    def count(self, collection: str, query: Dict = None) -> int:
+        return self._db[collection].count_documents(query or {})
+    
+    # ========== SEARCH ==========
+    def search(self, query: str, department: str = None, limit: int = 20) -> List[Dict]:
+        """Text search across controls, framework requirements, policies, issues and risks.
+        
+        Each collection is ranked by its text index (textScore). Hits from all
+        collections are merged by score and cut to `limit`. Framework
+        documents expand into their matching requirements.
+        """
+        terms = [t for t in re.findall(r"[a-z0-9]+", query.lower()) if len(t) > 1]
+        if not terms:
+            return []
+        hits = []
+        for collection, weights in SEARCH_TEXT_INDEXES.items():
+            q = {"$text": {"$search": query}}
+            if department and collection in SEARCH_DEPARTMENT_SCOPED:
+                q["department"] = department
+            fields = {f.split(".")[0] for f in weights} | {"id", "title", "name", "description"}
+            cursor = (
+                self._db[collection]
+                .find(q, {"_id": 0, "score": {"$meta": "textScore"}, **{f: 1 for f in fields}})
+                .sort([("score", {"$meta": "textScore"})])
+                .limit(limit)
+            )
+            for doc in cursor:
+                if collection == "frameworks":
+                    hits.extend(self._requirement_hits(doc, terms))
+                    continue
+                label = doc.get("ccf_id") or doc.get("policy_id") or ""
+                hits.append({
+                    "collection": collection,
+                    "id": doc.get("id", ""),
+                    "label": label,
+                    "title": doc.get("title") or doc.get("name", ""),
+                    "text": doc.get("description", ""),
+                    "score": doc["score"],
+                })
+        hits.sort(key=lambda h: -h["score"])
+        return hits[:limit]
+    
+    @staticmethod
+    def _requirement_hits(framework: Dict, terms: List[str]) -> List[Dict]:
+        """One hit per requirement of a matched framework whose text contains a query term"""
+        hits = []
+        for req in framework.get("controls", []) or []:
+            text = f"{req.get('id', '')} {req.get('name', '')} {req.get('description', '')}".lower()
+            if any(t in text for t in terms):
+                hits.append({
+                    "collection": "frameworks",
+                    "id": framework.get("id", ""),
+                    "label": f"{framework.get('name', '')} {req.get('id', '')}",
+                    "title": req.get("name", ""),
+                    "text": req.get("description", ""),
+                    "score": framework["score"],
+                })
+        return hits
+    
     # ========== AUTH ==========
     def get_user_by_email(self, email: str) -> Optional[Dict]:
         return self._db.users.find_one({"email": email}, {"_id": 0})
@@ -54,124 +408,355 @@ class DatabaseService:
         user["password"] = hash_password(user["password"])
         self._db.users.insert_one(user)
     
+    @staticmethod
+    def _projection(fields: Optional[List[str]] = None) -> Dict:
+        """Mongo projection for a loader; None returns whole documents"""
+        if not fields:
+            return {"_id": 0}
+        return {"_id": 0, **{f: 1 for f in fields}}
+    
     # ========== FRAMEWORKS ==========
-    def get_frameworks(self) -> List[Dict]:
-        cursor = self._db.frameworks.find({}, {"_id": 0})
+    def get_frameworks(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.frameworks.find({}, self._projection(fields))
         return list(cursor)
     
+    def get_framework_by_name(self, name: str) -> Optional[Dict]:
+        return self._db.frameworks.find_one({"name": name}, {"_id": 0})
+    
     def toggle_framework(self, framework_id: str, enabled: bool):
         self._db.frameworks.update_one(
             {"id": framework_id},
             {"$set": {"enabled": enabled}}
         )
+        change_feed.publish_local("frameworks", "update")
         self.log_audit("system", "system@grc.local", "UPDATE", "Framework", 
                       f"{'Enabled' if enabled else 'Disabled'} framework: {framework_id}")
     
     # ========== UNIFIED CONTROLS ==========
-    def get_unified_controls(self) -> List[Dict]:
-        cursor = self._db.unified_controls.find({}, {"_id": 0})
+    def get_unified_controls(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.unified_controls.find({}, self._projection(fields))
         return list(cursor)
     
+    def get_unified_control(self, control_id: str) -> Optional[Dict]:
+        return self._db.unified_controls.find_one({"id": control_id}, {"_id": 0})
+    
     def create_unified_control(self, control: Dict):
         self._db.unified_controls.insert_one(control)
+        if DatabaseService._coverage is not None:
+            DatabaseService._coverage.update_control(control)
+        if DatabaseService._typeahead is not None:
+            DatabaseService._typeahead.add("control", control)
+        change_feed.publish_local("unified_controls", "insert", control.get("department"))
+    
+    # ========== COVERAGE ==========
+    def get_coverage(self) -> CoverageMatrix:
+        """Framework coverage matrix, built on first use and updated in place by control writes"""
+        # Read before building, so a write that lands mid-build still invalidates next time
+        versions = change_feed.versions(("frameworks", "unified_controls"))
+        if (DatabaseService._coverage is None or DatabaseService._coverage_stale
+                or (versions is not None and versions != DatabaseService._coverage_versions)):
+            DatabaseService._coverage_stale = False
+            DatabaseService._coverage_versions = versions
+            coverage = CoverageMatrix()
+            coverage.build(
+                self.get_frameworks(fields=["name", "controls.id"]),
+                self.get_unified_controls(fields=["ccf_id", "name", "mapped_framework_controls"]),
+            )
+            DatabaseService._coverage = coverage
+        return DatabaseService._coverage
+    
+    def _on_change(self, event: Dict):
+        # Change-stream events and, without change streams, this process's writes; rebuild on next use
+        if event["collection"] in ("frameworks", "unified_controls"):
+            DatabaseService._coverage_stale = True
+        for kind, collection in TYPEAHEAD_COLLECTIONS.items():
+            if event["collection"] == collection:
+                DatabaseService._typeahead_stale.add(kind)
+    
+    # ========== TYPE-AHEAD ==========
+    def typeahead(self, prefix: str, kinds: Optional[List[str]] = None, limit: int = 20,
+                  department: Optional[str] = None) -> List[Dict]:
+        """Prefix matches on CCF IDs, control names, risk names and KRI names (risks and KRIs of `department` only)"""
+        if DatabaseService._typeahead is None:
+            DatabaseService._typeahead = TypeaheadIndex()
+            DatabaseService._typeahead_stale = set(TYPEAHEAD_KINDS)
+        index = DatabaseService._typeahead
+        wanted = kinds or TYPEAHEAD_KINDS
+        versions = change_feed.versions(TYPEAHEAD_COLLECTIONS[k] for k in wanted)
+        if versions is not None:
+            for kind in wanted:
+                version = versions[TYPEAHEAD_COLLECTIONS[kind]]
+                if DatabaseService._typeahead_versions.get(kind) != version:
+                    DatabaseService._typeahead_versions[kind] = version
+                    DatabaseService._typeahead_stale.add(kind)
+        for kind in [k for k in wanted if k in DatabaseService._typeahead_stale]:
+            DatabaseService._typeahead_stale.discard(kind)
+            fields = ["id", "ccf_id", "name"] if kind == "control" else ["id", "name"]
+            if kind in TYPEAHEAD_DEPARTMENT_SCOPED:
+                fields.append("department")
+            index.build(kind, self._db[TYPEAHEAD_COLLECTIONS[kind]].find({}, self._projection(fields)))
+        return index.lookup(prefix, kinds, limit, department)
     
     # ========== POLICIES ==========
-    def get_policies(self) -> List[Dict]:
-        cursor = self._db.policies.find({}, {"_id": 0})
+    def get_policies(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.policies.find({}, self._projection(fields))
         return list(cursor)
     
     def create_policy(self, policy: Dict):
         self._db.policies.insert_one(policy)
+        change_feed.publish_local("policies", "insert", policy.get("department"))
     
     # ========== CONNECTORS ==========
-    def get_connectors(self) -> List[Dict]:
-        cursor = self._db.connectors.find({}, {"_id": 0})
+    def get_connectors(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.connectors.find({}, self._projection(fields))
         return list(cursor)
     
     def update_connector_status(self, connector_id: str, status: str):
         self._db.connectors.update_one(
             {"id": connector_id},
-            {"$set": {"status": status, "last_sync": datetime.utcnow().isoformat() if status == "Connected" else None}}
+            {"$set": {"status": status, "last_sync": datetime.now(timezone.utc) if status == "Connected" else None}}
         )
+        change_feed.publish_local("connectors", "update")
     
     # ========== CONTROL TESTS ==========
-    def get_control_tests(self) -> List[Dict]:
-        cursor = self._db.control_tests.find({}, {"_id": 0})
+    def get_control_tests(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.control_tests.find({}, self._projection(fields))
         return list(cursor)
     
     def create_control_test(self, test: Dict):
         self._db.control_tests.insert_one(test)
+        change_feed.publish_local("control_tests", "insert", test.get("department"))
     
     # ========== ISSUES ==========
-    def get_issues(self) -> List[Dict]:
-        cursor = self._db.issues.find({}, {"_id": 0})
+    def get_issues(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.issues.find({}, self._projection(fields))
         return list(cursor)
     
     def create_issue(self, issue: Dict):
         self._db.issues.insert_one(issue)
+        change_feed.publish_local("issues", "insert", issue.get("department"))
     
     def update_issue_status(self, issue_id: str, status: str):
         self._db.issues.update_one(
             {"id": issue_id},
             {"$set": {"status": status}}
         )
+        change_feed.publish_local("issues", "update")
     
     # ========== RISKS ==========
-    def get_risks(self) -> List[Dict]:
-        cursor = self._db.risks.find({}, {"_id": 0})
+    def get_risks(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.risks.find({}, self._projection(fields))
         return list(cursor)
     
     def create_risk(self, risk: Dict):
         self._db.risks.insert_one(risk)
+        if DatabaseService._typeahead is not None:
+            DatabaseService._typeahead.add("risk", risk)
+        change_feed.publish_local("risks", "insert", risk.get("department"))
     
     # ========== KRIs ==========
-    def get_kris(self) -> List[Dict]:
-        cursor = self._db.kris.find({}, {"_id": 0})
+    def get_kris(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.kris.find({}, self._projection(fields))
         return list(cursor)
     
     def create_kri(self, kri: Dict):
         self._db.kris.insert_one(kri)
+        if DatabaseService._typeahead is not None:
+            DatabaseService._typeahead.add("kri", kri)
+        change_feed.publish_local("kris", "insert", kri.get("department"))
     
     # ========== KCIs ==========
-    def get_kcis(self) -> List[Dict]:
-        cursor = self._db.kcis.find({}, {"_id": 0})
+    def get_kcis(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.kcis.find({}, self._projection(fields))
         return list(cursor)
     
     def create_kci(self, kci: Dict):
         self._db.kcis.insert_one(kci)
+        change_feed.publish_local("kcis", "insert", kci.get("department"))
     
     # ========== AI MODELS ==========
-    def get_ai_models(self) -> List[Dict]:
-        cursor = self._db.ai_models.find({}, {"_id": 0})
+    def get_ai_models(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.ai_models.find({}, self._projection(fields))
         return list(cursor)
     
+    def get_ai_model(self, model_id: str) -> Optional[Dict]:
+        return self._db.ai_models.find_one({"id": model_id}, {"_id": 0})
+    
     def create_ai_model(self, model: Dict):
         self._db.ai_models.insert_one(model)
+        change_feed.publish_local("ai_models", "insert", model.get("department"))
     
     def update_ai_model(self, model_id: str, updates: Dict):
         self._db.ai_models.update_one(
             {"id": model_id},
             {"$set": updates}
         )
+        change_feed.publish_local("ai_models", "update")
     
     # ========== AI ASSESSMENTS ==========
-    def get_ai_assessments(self) -> List[Dict]:
-        cursor = self._db.ai_assessments.find({}, {"_id": 0})
+    def get_ai_assessments(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        cursor = self._db.ai_assessments.find({}, self._projection(fields))
         return list(cursor)
     
     def create_ai_assessment(self, assessment: Dict):
         self._db.ai_assessments.insert_one(assessment)
+        change_feed.publish_local("ai_assessments", "insert", assessment.get("department"))
     
     # ========== AUDIT LOGS ==========
+    def _audit_partition(self, name: str):
+        """Partition collection, creating its indexes on first use"""
+        if name not in DatabaseService._audit_partitions_ready:
+            for keys in AUDIT_LOG_INDEXES:
+                self._db[name].create_index(keys)
+            try:
+                # Makes re-delivered events (spool replays, re-run migrations) no-ops
+                self._db[name].create_index("id", unique=True)
+            except OperationFailure as e:
+                print(f"[ERROR] {name} holds duplicate audit ids, unique index not created: {e}")
+            DatabaseService._audit_partitions_ready.add(name)
+        return self._db[name]
+    
+    def audit_log_partitions(self) -> List[str]:
+        """Live monthly partitions, newest first"""
+        names = [n for n in self._db.list_collection_names() if AUDIT_LOG_PARTITION_RE.match(n)]
+        return sorted(names, reverse=True)
+    
+    def _write_audit_batch(self, batch: List[Dict]):
+        by_partition: Dict[str, List[Dict]] = {}
+        for log in batch:
+            by_partition.setdefault(audit_log_partition(log["timestamp"]), []).append(log)
+        for name, logs in by_partition.items():
+            try:
+                self._audit_partition(name).insert_many(logs, ordered=False)
+            except BulkWriteError as e:
+                # Events already stored (duplicate key) were written by an earlier attempt
+                if e.details.get("writeConcernErrors") or any(
+                    err.get("code") != 11000 for err in e.details.get("writeErrors", [])
+                ):
+                    raise
+    
+    def _take_migration_lease(self, name: str, holder: str) -> bool:
+        """Acquire or renew a lease in `migrations`; False while another process holds it"""
+        now = datetime.now(timezone.utc)
+        try:
+            self._db.migrations.update_one(
+                {"_id": name, "$or": [{"holder": holder}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=AUDIT_LOG_MIGRATION_LEASE_S)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:  # the document exists, held by someone else
+            return False
+    
+    def _migrate_legacy_audit_logs(self):
+        """Move documents from the old single audit_logs collection into monthly partitions.
+        
+        One process at a time holds the migration lease. Partition writes skip
+        ids already stored, so a copy interrupted by a crash is simply redone by
+        the next process that starts once the lease expires.
+        """
+        if "audit_logs" not in self._db.list_collection_names():
+            return
+        holder = f"{socket.gethostname()}:{os.getpid()}"
+        if not self._take_migration_lease("audit_log_partitions", holder):
+            print("[DB] Audit log partition migration is running in another process")
+            return
+        legacy = self._db.audit_logs
+        moved = 0
+        batch = []
+        for log in legacy.find({}, {"_id": 0}):
+            batch.append(log)
+            if len(batch) >= 1000:
+                self._write_audit_batch(batch)
+                moved += len(batch)
+                batch = []
+                if not self._take_migration_lease("audit_log_partitions", holder):
+                    print("[DB] Lost the audit log migration lease; another process will finish it")
+                    return
+        self._write_audit_batch(batch)
+        moved += len(batch)
+        legacy.drop()
+        self._db.migrations.delete_one({"_id": "audit_log_partitions", "holder": holder})
+        print(f"[DB] Moved {moved} audit logs into monthly partitions")
+    
+    def apply_audit_retention(self, now: datetime = None):
+        """Archive or drop partitions older than AUDIT_LOG_RETENTION_MONTHS"""
+        if AUDIT_LOG_RETENTION_MONTHS <= 0:
+            return
+        now = now or datetime.now(timezone.utc)
+        month_index = now.year * 12 + now.month - 1 - AUDIT_LOG_RETENTION_MONTHS
+        cutoff = f"audit_logs_{month_index // 12:04d}_{month_index % 12 + 1:02d}"
+        for name in self.audit_log_partitions():
+            if name >= cutoff:
+                continue
+            if AUDIT_LOG_RETENTION_ACTION == "drop":
+                self._db.drop_collection(name)
+                print(f"[DB] Dropped expired audit log partition {name}")
+            else:
+                archived = name.replace("audit_logs_", "audit_logs_archive_", 1)
+                self._db[name].rename(archived, dropTarget=True)
+                print(f"[DB] Archived audit log partition {name} -> {archived}")
+            DatabaseService._audit_partitions_ready.discard(name)
+    
+    def get_audit_log_page(self, filters: Optional[Dict] = None, after: Optional[tuple] = None,
+                           limit: int = 50) -> List[Dict]:
+        """Newest-first page of audit logs, keyset-paginated on (timestamp, id).
+        
+        Walks monthly partitions from the cursor's month backwards and stops as
+        soon as the page is full, so cost depends on the page size rather than
+        on total log volume.
+        """
+        query = {k: v for k, v in (filters or {}).items() if v}
+        if after is not None:
+            ts, last_id = after
+            query["$or"] = [
+                {"timestamp": {"$lt": ts}},
+                {"timestamp": ts, "id": {"$lt": last_id}},
+            ]
+        start = audit_log_partition(after[0]) if after is not None else None
+        
+        rows: List[Dict] = []
+        for name in self.audit_log_partitions():
+            if start and name > start:
+                continue
+            cursor = self._db[name].find(query, {"_id": 0}).sort(
+                [("timestamp", -1), ("id", -1)]
+            ).limit(limit - len(rows))
+            rows.extend(cursor)
+            if len(rows) >= limit:
+                break
+        return rows
+    
     def get_audit_logs(self, limit: int = 100) -> List[Dict]:
-        cursor = self._db.audit_logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(limit)
-        return list(cursor)
+        return self.get_audit_log_page(limit=limit)
+    
+    def iter_audit_logs(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                        resource: Optional[str] = None, batch_size: int = 1000):
+        """Stream audit logs oldest-first over [start, end), one cursor batch at a time"""
+        query: Dict = {}
+        if start or end:
+            query["timestamp"] = {}
+            if start:
+                query["timestamp"]["$gte"] = start
+            if end:
+                query["timestamp"]["$lt"] = end
+        if resource:
+            query["resource"] = resource
+        first = audit_log_partition(start) if start else None
+        last = audit_log_partition(end) if end else None
+        for name in reversed(self.audit_log_partitions()):
+            if (first and name < first) or (last and name > last):
+                continue
+            cursor = self._db[name].find(query, {"_id": 0}).sort(
+                [("timestamp", 1), ("id", 1)]
+            ).batch_size(batch_size)
+            yield from cursor
     
     def log_audit(self, user_id: str, user_email: str, action: str, resource: str, details: str, ip_address: str = "system"):
         import uuid
         log = {
             "id": str(uuid.uuid4()),
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc),
             "user_id": user_id,
             "user_email": user_email,
             "action": action,
@@ -179,41 +764,43 @@ class DatabaseService:
             "details": details,
             "ip_address": ip_address
         }
-        self._db.audit_logs.insert_one(log)
+        self._audit_writer.enqueue(log)
+    
+    def flush_audit_logs(self):
+        """Wait (bounded) for audit events buffered before this call to reach the database"""
+        if not self._audit_writer.flush():
+            print("[DB] Audit log flush timed out; the newest events may not be visible yet")
     
     # ========== DASHBOARD STATS ==========
-    def get_dashboard_stats(self) -> Dict:
-        frameworks = self.get_frameworks()
-        controls = self.get_unified_controls()
-        tests = self.get_control_tests()
-        issues = self.get_issues()
-        risks = self.get_risks()
-        ai_models = self.get_ai_models()
-        
-        passed_tests = [t for t in tests if t.get("result") == "Pass"]
-        control_effectiveness = (len(passed_tests) / len(tests) * 100) if tests else 0
-        
-        open_issues = [i for i in issues if i.get("status") not in ["Resolved", "Closed"]]
+    def get_dashboard_stats(self, department: str = None) -> Dict:
+        """Dashboard counters computed DB-side, optionally scoped to a department"""
+        dept_query = {"department": department} if department else {}
         
-        avg_risk = sum(r.get("residual_risk_score", 0) for r in risks) / len(risks) if risks else 0
+        total_controls = self._db.unified_controls.count_documents({})
+        effective_controls = self._db.unified_controls.count_documents({"status": "Effective"})
+        total_tests = self._db.control_tests.count_documents(dept_query)
         
-        # AI stats
-        production_models = [m for m in ai_models if m.get("status") == "Production"]
-        high_risk_models = [m for m in ai_models if m.get("risk_level") in ["High", "Critical"]]
+        avg_risk = 0
+        risk_stats = list(self._db.risks.aggregate([
+            {"$match": dept_query},
+            {"$group": {"_id": None, "avg": {"$avg": "$residual_risk_score"}}},
+        ]))
+        if risk_stats and risk_stats[0].get("avg") is not None:
+            avg_risk = risk_stats[0]["avg"]
         
         return {
-            "enabled_frameworks": len([f for f in frameworks if f.get("enabled")]),
-            "total_unified_controls": len(controls),
-            "control_effectiveness": round(control_effectiveness, 1),
-            "total_tests": len(tests),
-            "passed_tests": len(passed_tests),
-            "open_issues": len(open_issues),
-            "total_issues": len(issues),
-            "total_risks": len(risks),
+            "enabled_frameworks": self._db.frameworks.count_documents({"enabled": True}),
+            "total_unified_controls": total_controls,
+            "control_effectiveness": round((effective_controls / max(total_controls, 1)) * 100, 1),
+            "total_tests": total_tests,
+            "passed_tests": self._db.control_tests.count_documents({**dept_query, "result": "Pass"}),
+            "open_issues": self._db.issues.count_documents({**dept_query, "status": {"$in": ["Open", "In Progress"]}}),
+            "total_issues": self._db.issues.count_documents(dept_query),
+            "total_risks": self._db.risks.count_documents(dept_query),
             "avg_residual_risk": round(avg_risk, 2),
-            "total_ai_models": len(ai_models),
-            "production_ai_models": len(production_models),
-            "high_risk_ai_models": len(high_risk_models)
+            "total_ai_models": self._db.ai_models.count_documents({}),
+            "production_ai_models": self._db.ai_models.count_documents({"status": "Production"}),
+            "high_risk_ai_models": self._db.ai_models.count_documents({"risk_level": {"$in": ["High", "Critical"]}}),
         }
     
     # ── Audit Management ──
@@ -224,13 +811,16 @@ class DatabaseService:
     
     def create_audit(self, audit: dict):
         self.db.audits.insert_one(audit)
+        change_feed.publish_local("audits", "insert", audit.get("department"))
     
     def update_audit(self, audit_id: str, updates: dict):
         self.db.audits.update_one({"id": audit_id}, {"$set": updates})
+        change_feed.publish_local("audits", "update")
     
     def delete_audit(self, audit_id: str):
         self.db.audits.delete_one({"id": audit_id})
         self.db.audit_findings.delete_many({"audit_id": audit_id})
+        change_feed.publish_local("audits", "delete")
     
     def get_audit_findings(self, audit_id: str = None) -> list:
         query = {"audit_id": audit_id} if audit_id else {}
@@ -238,14 +828,18 @@ class DatabaseService:
     
     def create_audit_finding(self, finding: dict):
         self.db.audit_findings.insert_one(finding)
+        change_feed.publish_local("audit_findings", "insert")
     
     def update_audit_finding(self, finding_id: str, updates: dict):
         self.db.audit_findings.update_one({"id": finding_id}, {"$set": updates})
+        change_feed.publish_local("audit_findings", "update")
     
-    def get_tested_ccf_ids(self) -> set:
+    def get_tested_ccf_ids(self, department: str = None) -> set:
         """Get CCF IDs that have passed control testing"""
-        tests = self.get_control_tests()
-        return {t.get("control_ccf_id") for t in tests if t.get("result") == "Pass"}
+        query = {"result": "Pass"}
+        if department:
+            query["department"] = department
+        return set(self.db.control_tests.distinct("control_ccf_id", query))
     
     # ── Departments / Workspaces ──
     
@@ -254,18 +848,19 @@ class DatabaseService:
     
     def create_department(self, dept: dict):
         self.db.departments.insert_one(dept)
+        change_feed.publish_local("departments", "insert")
     
-    def get_risks_by_dept(self, department: str = None) -> list:
+    def get_risks_by_dept(self, department: str = None, fields: Optional[List[str]] = None) -> list:
         query = {"department": department} if department else {}
-        return list(self.db.risks.find(query, {"_id": 0}))
+        return list(self.db.risks.find(query, self._projection(fields)))
     
-    def get_issues_by_dept(self, department: str = None) -> list:
+    def get_issues_by_dept(self, department: str = None, fields: Optional[List[str]] = None) -> list:
         query = {"department": department} if department else {}
-        return list(self.db.issues.find(query, {"_id": 0}))
+        return list(self.db.issues.find(query, self._projection(fields)))
     
-    def get_control_tests_by_dept(self, department: str = None) -> list:
+    def get_control_tests_by_dept(self, department: str = None, fields: Optional[List[str]] = None) -> list:
         query = {"department": department} if department else {}
-        return list(self.db.control_tests.find(query, {"_id": 0}))
+        return list(self.db.control_tests.find(query, self._projection(fields)))
 
 
 # Global database instance
@@ -0,0 +1,122 @@
+"""Streaming audit log export for examiners.
+
+Rows are read from the monthly partitions through a cursor and encoded
+on the fly, so memory stays flat no matter how many rows are emitted.
+"""
+import csv
+import hmac
+import io
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+from fastapi import Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from .database import db_service
+
+# Shared secret required in the X-Export-Token header; export is disabled when unset
+AUDIT_EXPORT_TOKEN = os.getenv("AUDIT_EXPORT_TOKEN", "")
+
+CSV_FIELDS = ["timestamp", "id", "user_id", "user_email", "action", "resource", "details", "ip_address"]
+
+# Flush encoded rows downstream in chunks of roughly this size
+CHUNK_BYTES = 64 * 1024
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _ndjson_lines(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def _csv_lines(rows: Iterable[dict]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        if isinstance(row.get("timestamp"), datetime):
+            row["timestamp"] = row["timestamp"].isoformat()
+        writer.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def _chunked(lines: Iterable[str]) -> Iterator[bytes]:
+    """Group encoded lines into ~CHUNK_BYTES writes"""
+    parts = []
+    size = 0
+    for line in lines:
+        data = line.encode("utf-8")
+        parts.append(data)
+        size += len(data)
+        if size >= CHUNK_BYTES:
+            yield b"".join(parts)
+            parts = []
+            size = 0
+    if parts:
+        yield b"".join(parts)
+
+
+def _gzipped(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def _parse_date(value: Optional[str], name: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} date: {value}")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def export_audit_logs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    resource: Optional[str] = None,
+    x_export_token: str = Header(""),
+):
+    """Stream audit logs in [start, end) as NDJSON or CSV, optionally gzip-compressed"""
+    if not AUDIT_EXPORT_TOKEN:
+        raise HTTPException(status_code=503, detail="Audit export is not configured")
+    if not hmac.compare_digest(x_export_token.encode("utf-8"), AUDIT_EXPORT_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid export token")
+    
+    start = _parse_date(start, "start")
+    end = _parse_date(end, "end")
+    db_service.flush_audit_logs()
+    
+    rows = db_service.iter_audit_logs(start=start, end=end, resource=resource)
+    lines = _csv_lines(rows) if format == "csv" else _ndjson_lines(rows)
+    body = _chunked(lines)
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"audit_logs_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}.{format}"
+    headers = {}
+    if gzip:
+        body = _gzipped(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    
+    # Sync generator: Starlette iterates it in a threadpool, keeping the event loop free
+    return StreamingResponse(body, media_type=media_type, headers=headers)
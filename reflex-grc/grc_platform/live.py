@@ -0,0 +1,194 @@
+"""Live change feed for Reflex sessions.
+
+A watcher thread tails a Mongo change stream on the app database and fans
+each change out to subscribed page states (see `WorkspaceMixin.watch_changes`),
+which reload themselves. On a standalone mongod, where change streams are not
+available, the watcher exits and `DatabaseService` writes are published
+in-process instead. That covers every session served by this process.
+
+Without change streams, each local write also bumps a per-collection counter
+in `change_versions`, so process-local caches can tell when another process
+has written (see `ChangeFeed.versions`).
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+
+LIVE_QUEUE_SIZE = 256
+LIVE_RETRY_MAX_SECONDS = 30
+
+# Collections page states may subscribe to
+LIVE_COLLECTIONS = [
+    "frameworks", "unified_controls", "policies", "connectors", "control_tests",
+    "issues", "risks", "kris", "kcis", "ai_models", "ai_assessments",
+    "audits", "audit_findings", "departments",
+]
+
+# Mongo error codes meaning change streams are not supported on this deployment
+CHANGE_STREAMS_UNSUPPORTED = {40573, 40415}
+
+
+class Subscription:
+    """Change events for a set of collections, delivered on the subscriber's event loop"""
+
+    def __init__(self, collections: Set[str], loop: asyncio.AbstractEventLoop):
+        self.collections = collections
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+
+    def offer(self, event: Dict):
+        """Thread-safe enqueue; a full queue already guarantees a reload, so extra events are dropped"""
+        def put():
+            if not self._queue.full():
+                self._queue.put_nowait(event)
+        self._loop.call_soon_threadsafe(put)
+
+    async def get(self, timeout: float) -> Optional[Dict]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def drain(self) -> List[Dict]:
+        events = []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+
+class ChangeFeed:
+    """Process-wide pub/sub fed by a change stream, or by local writes as a fallback"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._versions = None  # change_versions collection, once bound
+        self.change_streams_active = False
+
+    def start(self, db):
+        """Start the change stream watcher once per process"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch, args=(db,), name="change-feed", daemon=True)
+                self._thread.start()
+
+    def bind_versions(self, db):
+        """Count local writes per collection in `db.change_versions` while change streams are off"""
+        self._versions = db.change_versions
+    
+    def versions(self, collections: Iterable[str]) -> Optional[Dict[str, int]]:
+        """Write counters for `collections`, or None while the change stream keeps listeners current"""
+        if self.change_streams_active or self._versions is None:
+            return None
+        collections = list(collections)
+        found = {d["_id"]: d.get("v", 0) for d in self._versions.find({"_id": {"$in": collections}})}
+        return {c: found.get(c, 0) for c in collections}
+    
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Call `callback(event)` for every change.
+
+        With change streams this runs on the watcher thread and sees every
+        process's writes. Without them it runs on the writer's thread for this
+        process's local publishes only; use `versions` to catch the rest.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def subscribe(self, collections: Iterable[str]) -> Subscription:
+        sub = Subscription(set(collections), asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def publish(self, event: Dict):
+        with self._lock:
+            subscribers = [s for s in self._subscribers if event["collection"] in s.collections]
+        for sub in subscribers:
+            try:
+                sub.offer(event)
+            except RuntimeError:  # the session's event loop is closed; it will never unsubscribe itself
+                self.unsubscribe(sub)
+    
+    def _notify_listeners(self, event: Dict):
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"[ERROR] Change listener {getattr(listener, '__qualname__', listener)} failed: {e}")
+
+    def publish_local(self, collection: str, op: str, department: Optional[str] = None):
+        """Publish a write made by this process; no-op while the change stream delivers it"""
+        if self.change_streams_active:
+            return
+        event = {"collection": collection, "op": op, "department": department}
+        self._bump_version(collection)
+        self._notify_listeners(event)
+        if self._subscribers:
+            self.publish(event)
+    
+    def _bump_version(self, collection: str):
+        if self._versions is None:
+            return
+        try:
+            try:
+                self._versions.update_one({"_id": collection}, {"$inc": {"v": 1}}, upsert=True)
+            except DuplicateKeyError:  # a concurrent upsert created it first
+                self._versions.update_one({"_id": collection}, {"$inc": {"v": 1}})
+        except PyMongoError as e:
+            print(f"[ERROR] Failed to bump change version for {collection}: {e}")
+
+    def _watch(self, db):
+        try:
+            self._watch_stream(db)
+        finally:
+            # However the watcher ends, local publishes must take over
+            self.change_streams_active = False
+    
+    def _watch_stream(self, db):
+        pipeline = [{"$match": {"ns.coll": {"$in": LIVE_COLLECTIONS}}}]
+        resume_token = None
+        backoff = 1
+        while True:
+            try:
+                with db.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                    self.change_streams_active = True
+                    print("[DB] Watching change stream for live updates")
+                    backoff = 1
+                    for change in stream:
+                        resume_token = change["_id"]
+                        document = change.get("fullDocument") or {}
+                        event = {
+                            "collection": change["ns"]["coll"],
+                            "op": change["operationType"],
+                            "department": document.get("department"),
+                        }
+                        self._notify_listeners(event)
+                        self.publish(event)
+            except OperationFailure as e:
+                self.change_streams_active = False
+                if e.code in CHANGE_STREAMS_UNSUPPORTED or "replica set" in str(e):
+                    print(f"[DB] Change streams unavailable, using in-process change feed: {e}")
+                    return
+                if e.code == 286:  # ChangeStreamHistoryLost
+                    resume_token = None
+                print(f"[ERROR] Change stream failed, retrying in {backoff}s: {e}")
+            except PyMongoError as e:
+                self.change_streams_active = False
+                print(f"[ERROR] Change stream interrupted, retrying in {backoff}s: {e}")
+            except Exception as e:
+                self.change_streams_active = False
+                print(f"[ERROR] Change stream watcher error, retrying in {backoff}s: {e}")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, LIVE_RETRY_MAX_SECONDS)
+
+
+change_feed = ChangeFeed()
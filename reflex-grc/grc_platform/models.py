@@ -0,0 +1,109 @@
+"""Typed row models passed from state to the UI.
+
+States hand these to components instead of preformatted strings, so
+display formatting lives in the components and state deltas only carry
+the raw fields.
+"""
+import reflex as rx
+
+
+class FrameworkMapping(rx.Base):
+    """Framework control mapped to a unified control"""
+    framework: str = ""
+    control_id: str = ""
+    control_name: str = ""
+
+
+class PolicyMapping(rx.Base):
+    """Policy mapped to a unified control"""
+    policy_id: str = ""
+    policy_name: str = ""
+
+
+class ControlMapping(rx.Base):
+    """Unified control mapped to a policy"""
+    ccf_id: str = ""
+    control_name: str = ""
+
+
+class ReadinessRow(rx.Base):
+    """Audit readiness of one control; status is covered | audited | needs_audit"""
+    ccf_id: str = ""
+    name: str = ""
+    status: str = "needs_audit"
+
+
+class ReadinessSummary(rx.Base):
+    """Readiness counts for a framework"""
+    total: int = 0
+    covered: int = 0
+    audited: int = 0
+    needs_audit: int = 0
+    pct_ready: int = 0
+
+
+class FrameworkCoverageRow(rx.Base):
+    """Requirements of a framework covered by passing controls"""
+    framework: str = ""
+    total: int = 0
+    mapped: int = 0
+    covered: int = 0
+    pct_covered: int = 0
+
+
+class TypeaheadOption(rx.Base):
+    """Picker match; `code` is the CCF ID for controls"""
+    kind: str = ""
+    id: str = ""
+    code: str = ""
+    name: str = ""
+
+
+class SearchSegment(rx.Base):
+    """Run of search result text; `match` marks a query term"""
+    text: str = ""
+    match: bool = False
+
+
+class SearchHit(rx.Base):
+    """Search result with highlighted title and snippet"""
+    collection: str = ""
+    label: str = ""
+    title: list[SearchSegment] = []
+    snippet: list[SearchSegment] = []
+    href: str = "/"
+
+
+class AuditFindingRow(rx.Base):
+    """Finding shown under an audit"""
+    id: str = ""
+    severity: str = "Medium"
+    control_ccf_id: str = "N/A"
+    description: str = ""
+    remediation: str = ""
+    assigned_to: str = "Unassigned"
+    status: str = "Open"
+
+
+class Strength(rx.Base):
+    area: str = ""
+    detail: str = ""
+
+
+class CriticalGap(rx.Base):
+    gap: str = ""
+    detail: str = ""
+    severity: str = "Medium"
+    recommendation: str = ""
+
+
+class Improvement(rx.Base):
+    area: str = ""
+    current_state: str = ""
+    target_state: str = ""
+    effort: str = ""
+
+
+class RoadmapPhase(rx.Base):
+    phase: str = ""
+    actions: list[str] = []
@@ -1,9 +1,74 @@
 """Global state management for GRC Platform"""
 import reflex as rx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, ClassVar, Optional
+import asyncio
+import re
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from .database import db_service
+from .live import change_feed
+from .models import (
+    FrameworkMapping, PolicyMapping, ControlMapping, ReadinessRow, ReadinessSummary,
+    FrameworkCoverageRow, SearchHit, SearchSegment, TypeaheadOption, AuditFindingRow, Strength, CriticalGap, Improvement, RoadmapPhase
+)
+
+
+# Live reload: wait this long after a change for the burst to settle, and stop
+# watching after this long without a relevant change
+LIVE_DEBOUNCE_SECONDS = 0.5
+LIVE_IDLE_SECONDS = 3600
+LIVE_POLL_SECONDS = 30
+
+SEARCH_RESULT_LIMIT = 30
+SEARCH_SNIPPET_CHARS = 160
+# Page listing each searchable collection
+SEARCH_RESULT_ROUTES = {
+    "unified_controls": "/controls",
+    "frameworks": "/frameworks",
+    "policies": "/policies",
+    "issues": "/issues",
+    "risks": "/risks",
+}
+
+
+def _form_ints(form_data: dict, defaults: dict[str, int]) -> Optional[dict[str, int]]:
+    """Read integer fields from submitted form data, falling back to defaults when blank;
+    None when any field is not a whole number"""
+    values = {}
+    for key, default in defaults.items():
+        value = str(form_data.get(key, "")).strip()
+        try:
+            values[key] = int(value) if value else default
+        except ValueError:
+            return None
+    return values
+
+
+def _reset_form(form_id: str):
+    """Clear a create form back to its defaults; called only after the record is saved,
+    so a rejected submit keeps what the user typed"""
+    return rx.call_script(f"document.getElementById('{form_id}')?.reset()")
+
+
+def _highlight_segments(text: str, terms: list[str], max_chars: int = 0) -> list[SearchSegment]:
+    """Split text into plain and matching runs; words starting with a query term match,
+    so stemmed text-index matches ("controls" for "control") are highlighted too"""
+    if max_chars and len(text) > max_chars:
+        first = next((m.start() for m in re.finditer(r"[A-Za-z0-9]+", text)
+                      if any(m.group().lower().startswith(t) for t in terms)), 0)
+        start = max(0, first - max_chars // 4)
+        text = ("…" if start else "") + text[start:start + max_chars] + ("…" if start + max_chars < len(text) else "")
+    segments, pos = [], 0
+    for m in re.finditer(r"[A-Za-z0-9]+", text):
+        if any(m.group().lower().startswith(t) for t in terms):
+            if m.start() > pos:
+                segments.append(SearchSegment(text=text[pos:m.start()]))
+            segments.append(SearchSegment(text=m.group(), match=True))
+            pos = m.end()
+    if pos < len(text):
+        segments.append(SearchSegment(text=text[pos:]))
+    return segments
 
 
 class AuthState(rx.State):
@@ -57,43 +122,23 @@ class AuthState(rx.State):
 
 
 class GRCState(AuthState):
-    """Global state for the entire GRC application"""
+    """Workspace state shared by every page.
+    
+    Holds only the department selector and UI flags. Domain data lives in
+    per-page substates, so an event marks dirty (and ships to the client)
+    only the vars of the page that handled it.
+    """
     
     # Department / Workspace
     departments: list[dict[str, Any]] = []
     current_department: str = "All Departments"
     
-    # Data - using list[dict[str, Any]] for proper typing
-    frameworks: list[dict[str, Any]] = []
-    unified_controls: list[dict[str, Any]] = []
-    policies: list[dict[str, Any]] = []
-    control_tests: list[dict[str, Any]] = []
-    issues: list[dict[str, Any]] = []
-    risks: list[dict[str, Any]] = []
-    kris: list[dict[str, Any]] = []
-    kcis: list[dict[str, Any]] = []
-    connectors: list[dict[str, Any]] = []
-    ai_models: list[dict[str, Any]] = []
-    ai_assessments: list[dict[str, Any]] = []
-    audit_logs: list[dict[str, Any]] = []
-    
     # UI State
     loading: bool = False
     current_page: str = "dashboard"
     
-    # Dashboard stats
-    enabled_frameworks: int = 0
-    total_unified_controls: int = 0
-    control_effectiveness: float = 0
-    total_tests: int = 0
-    passed_tests: int = 0
-    open_issues: int = 0
-    total_issues: int = 0
-    total_risks: int = 0
-    avg_residual_risk: float = 0
-    total_ai_models: int = 0
-    production_ai_models: int = 0
-    high_risk_ai_models: int = 0
+    # Bumped by each page's watch_changes; older watchers see the mismatch and exit
+    _live_generation: int = 0
     
     @rx.var
     def department_names(self) -> list[str]:
@@ -106,81 +151,254 @@ class GRCState(AuthState):
     def is_dept_filtered(self) -> bool:
         return self.current_department != "All Departments"
     
-    def set_department(self, dept: str):
-        """Switch department workspace and reload data"""
-        self.current_department = dept
-        self.load_all_data()
-    
     def _filter_dept(self) -> str:
         """Return department filter or None for all"""
         if self.current_department == "All Departments":
             return None
         return self.current_department
     
-    def load_all_data(self):
-        """Load all data from database, filtered by current department"""
-        self.loading = True
+    def _dept_query(self) -> dict:
+        """Mongo query scoping department-owned collections to the workspace"""
         dept = self._filter_dept()
-        
-        try:
+        return {"department": dept} if dept else {}
+    
+    def load_workspace(self):
+        """Load the department list for the workspace selector (once per session)"""
+        # Navigating away stops the previous page's live watcher
+        self._live_generation += 1
+        if not self.departments:
             self.departments = db_service.get_departments()
-            
-            # Shared data (org-wide)
-            self.frameworks = db_service.get_frameworks()
-            self.unified_controls = db_service.get_unified_controls()
-            self.policies = db_service.get_policies()
-            self.connectors = db_service.get_connectors()
-            self.ai_models = db_service.get_ai_models()
-            self.ai_assessments = db_service.get_ai_assessments()
-            self.audit_logs = db_service.get_audit_logs(50)
-            self.kris = db_service.get_kris()
-            self.kcis = db_service.get_kcis()
-            
-            # Department-scoped data
-            if dept:
-                self.control_tests = db_service.get_control_tests_by_dept(dept)
-                self.issues = db_service.get_issues_by_dept(dept)
-                self.risks = db_service.get_risks_by_dept(dept)
-            else:
-                self.control_tests = db_service.get_control_tests()
-                self.issues = db_service.get_issues()
-                self.risks = db_service.get_risks()
-            
-            # Calculate stats from loaded data
-            self.enabled_frameworks = len([f for f in self.frameworks if f.get("enabled")])
-            self.total_unified_controls = len(self.unified_controls)
-            effective = [c for c in self.unified_controls if c.get("status") == "Effective"]
-            self.control_effectiveness = round((len(effective) / max(len(self.unified_controls), 1)) * 100, 1)
-            self.total_tests = len(self.control_tests)
-            self.passed_tests = len([t for t in self.control_tests if t.get("result") == "Pass"])
-            open_iss = [i for i in self.issues if i.get("status") in ["Open", "In Progress"]]
-            self.open_issues = len(open_iss)
-            self.total_issues = len(self.issues)
-            self.total_risks = len(self.risks)
-            if self.risks:
-                self.avg_residual_risk = round(sum(r.get("residual_risk_score", 0) for r in self.risks) / len(self.risks), 2)
-            else:
-                self.avg_residual_risk = 0
-            self.total_ai_models = len(self.ai_models)
-            self.production_ai_models = len([m for m in self.ai_models if m.get("status") == "Production"])
-            self.high_risk_ai_models = len([m for m in self.ai_models if m.get("risk_level") in ["High", "Critical"]])
-            
-            print(f"[DEBUG] Loaded {len(self.frameworks)} frameworks, {len(self.unified_controls)} controls, dept={dept or 'All'}")
-        except Exception as e:
-            print(f"[ERROR] Failed to load data: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        self.loading = False
     
     def set_page(self, page: str):
         """Change current page"""
         self.current_page = page
 
 
-class FrameworkState(GRCState):
+class WorkspaceMixin(rx.State, mixin=True):
+    """Department switching and live reload for page states.
+    
+    Each page state implements `load`; switching workspace re-runs it along
+    with the shared dashboard counters. States listing `live_collections`
+    also reload when those collections change (see `watch_changes`).
+    """
+    
+    live_collections: ClassVar[tuple[str, ...]] = ()
+    
+    def switch_department(self, dept: str):
+        """Switch department workspace and reload this page's data"""
+        self.current_department = dept
+        return [DashboardState.load, type(self).load]
+    
+    @rx.event(background=True)
+    async def watch_changes(self):
+        """Reload this page when a watched collection changes in the current workspace"""
+        collections = type(self).live_collections
+        if not collections:
+            return
+        change_feed.start(db_service.db)
+        async with self:
+            self._live_generation += 1
+            generation = self._live_generation
+        
+        sub = change_feed.subscribe(collections)
+        idle_until = time.monotonic() + LIVE_IDLE_SECONDS
+        try:
+            while time.monotonic() < idle_until:
+                event = await sub.get(timeout=LIVE_POLL_SECONDS)
+                events = []
+                if event is not None:
+                    await asyncio.sleep(LIVE_DEBOUNCE_SECONDS)
+                    events = [event] + sub.drain()
+                async with self:
+                    if self._live_generation != generation:
+                        return  # the session moved to another page
+                    dept = self._filter_dept()
+                    if any(dept is None or e.get("department") in (None, dept) for e in events):
+                        # Paginated lists refresh in place instead of jumping back to page 1
+                        if isinstance(self, PaginationMixin):
+                            self.refresh_page()
+                        else:
+                            self.load()
+                        idle_until = time.monotonic() + LIVE_IDLE_SECONDS
+        finally:
+            change_feed.unsubscribe(sub)
+
+
+class ControlPickerMixin(rx.State, mixin=True):
+    """Type-ahead unified control picker for forms.
+    
+    Each keystroke asks the server-side prefix index for the top matches,
+    so the client never holds the whole control list.
+    """
+    
+    control_query: str = ""
+    control_matches: list[TypeaheadOption] = []
+    picked_control_id: str = ""
+    picked_control_ccf: str = ""
+    
+    def search_controls(self, value: str):
+        self.control_query = value
+        self.picked_control_id = ""
+        self.picked_control_ccf = ""
+        self.control_matches = [TypeaheadOption(**m) for m in db_service.typeahead(value, ["control"])]
+    
+    def pick_control(self, control_id: str, ccf_id: str, name: str):
+        self.picked_control_id = control_id
+        self.picked_control_ccf = ccf_id
+        self.control_query = f"{ccf_id}: {name}"
+        self.control_matches = []
+    
+    def _reset_control_picker(self):
+        self.control_query = ""
+        self.control_matches = []
+        self.picked_control_id = ""
+        self.picked_control_ccf = ""
+
+
+class DashboardState(WorkspaceMixin, GRCState):
+    """Workspace counters shown on the dashboard and page stat cards"""
+    
+    live_collections: ClassVar[tuple[str, ...]] = ("frameworks", "unified_controls", "control_tests", "issues", "risks", "ai_models")
+    
+    enabled_frameworks: int = 0
+    total_unified_controls: int = 0
+    control_effectiveness: float = 0
+    total_tests: int = 0
+    passed_tests: int = 0
+    open_issues: int = 0
+    total_issues: int = 0
+    total_risks: int = 0
+    avg_residual_risk: float = 0
+    total_ai_models: int = 0
+    production_ai_models: int = 0
+    high_risk_ai_models: int = 0
+    
+    def load(self):
+        """Refresh counters, aggregated DB-side for the current department"""
+        try:
+            for key, value in db_service.get_dashboard_stats(self._filter_dept()).items():
+                setattr(self, key, value)
+        except Exception as e:
+            print(f"[ERROR] Failed to load dashboard stats: {e}")
+
+
+class PaginationMixin(rx.State, mixin=True):
+    """Server-side paginated list for a page state.
+    
+    Only the rows of the visible page live in state; filtering, sorting and
+    paging are pushed down to MongoDB. Pages set `page_source` and may
+    override `_page_query`.
+    """
+    
+    # (collection, default sort field); required on every concrete page state
+    page_source: ClassVar[tuple[str, str]] = ()
+    
+    page_rows: list[dict[str, Any]] = []
+    page_index: int = 0
+    page_size: int = 25
+    total_rows: int = 0
+    sort_field: str = ""
+    sort_desc: bool = True
+    
+    @rx.var
+    def total_pages(self) -> int:
+        return max((self.total_rows + self.page_size - 1) // self.page_size, 1)
+    
+    @rx.var
+    def has_prev_page(self) -> bool:
+        return self.page_index > 0
+    
+    @rx.var
+    def has_next_page(self) -> bool:
+        return (self.page_index + 1) * self.page_size < self.total_rows
+    
+    @rx.var
+    def page_label(self) -> str:
+        if self.total_rows == 0:
+            return "No records"
+        first = self.page_index * self.page_size + 1
+        last = min(first + self.page_size - 1, self.total_rows)
+        return f"{first}-{last} of {self.total_rows}"
+    
+    def __init_subclass__(cls, mixin: bool = False, **kwargs):
+        super().__init_subclass__(mixin=mixin, **kwargs)
+        if not mixin and len(cls.page_source) != 2:
+            raise TypeError(f"{cls.__name__} must set page_source = (collection, default sort field)")
+    
+    def _page_query(self) -> dict:
+        """Mongo filter for the list; scoped to the workspace department by default"""
+        return self._dept_query()
+    
+    def _fetch_page(self, after: tuple = None):
+        collection, default_sort = self.page_source
+        query = self._page_query()
+        if not self.sort_field:
+            self.sort_field = default_sort
+        self.total_rows = db_service.count(collection, query)
+        self.page_rows = db_service.find_page(
+            collection,
+            query,
+            sort_field=self.sort_field,
+            descending=self.sort_desc,
+            skip=self.page_index * self.page_size,
+            limit=self.page_size,
+            after=after,
+        )
+    
+    def load_page(self):
+        """Load the first page (on page load and after filters change)"""
+        self.page_index = 0
+        self._fetch_page()
+    
+    def refresh_page(self):
+        """Re-fetch the current page in place after a write, stepping back if it no longer exists"""
+        self._fetch_page()
+        if not self.page_rows and self.page_index > 0:
+            self.page_index = self.total_pages - 1
+            self._fetch_page()
+    
+    def next_page(self):
+        if not self.has_next_page:
+            return
+        after = None
+        if self.page_rows:
+            last = self.page_rows[-1]
+            if last.get(self.sort_field) is not None:
+                after = (last[self.sort_field], last.get("id", ""))
+        self.page_index += 1
+        self._fetch_page(after)
+    
+    def prev_page(self):
+        if self.page_index > 0:
+            self.page_index -= 1
+            self._fetch_page()
+    
+    def set_page_size(self, value: str):
+        self.page_size = int(value) if value else 25
+        self.load_page()
+    
+    def sort_by(self, field: str):
+        """Sort by a column; clicking the active column flips the direction"""
+        if self.sort_field == field:
+            self.sort_desc = not self.sort_desc
+        else:
+            self.sort_field = field
+            self.sort_desc = True
+        self.load_page()
+
+
+class FrameworkState(WorkspaceMixin, GRCState):
     """State for framework management"""
     
+    live_collections: ClassVar[tuple[str, ...]] = ("frameworks",)
+    
+    frameworks: list[dict[str, Any]] = []
+    
+    def load(self):
+        self.loading = True
+        self.frameworks = db_service.get_frameworks()
+        self.loading = False
+    
     def toggle_framework(self, framework_id: str):
         """Toggle framework enabled status"""
         for fw in self.frameworks:
@@ -188,15 +406,21 @@ class FrameworkState(GRCState):
                 new_status = not fw["enabled"]
                 db_service.toggle_framework(framework_id, new_status)
                 break
-        self.load_all_data()
+        self.load()
         return rx.toast.success("Framework updated successfully")
 
 
-class ControlState(GRCState):
+class ControlState(WorkspaceMixin, GRCState):
     """State for control management"""
     
+    live_collections: ClassVar[tuple[str, ...]] = ("unified_controls",)
+    
+    unified_controls: list[dict[str, Any]] = []
     selected_control_id: str = ""
     
+    def load(self):
+        self.unified_controls = db_service.get_unified_controls()
+    
     def toggle_control_details(self, ccf_id: str):
         """Toggle control details expansion (one at a time)"""
         if self.selected_control_id == ccf_id:
@@ -205,29 +429,36 @@ class ControlState(GRCState):
             self.selected_control_id = ccf_id
     
     @rx.var
-    def selected_fw_mappings(self) -> list[str]:
-        """Return framework mappings for the selected control as formatted strings"""
+    def selected_fw_mappings(self) -> list[FrameworkMapping]:
+        """Return framework mappings for the selected control"""
         for ctrl in self.unified_controls:
             if ctrl.get("ccf_id") == self.selected_control_id:
-                return [f"{m['framework']} | {m['control_id']}: {m['control_name']}" 
+                return [FrameworkMapping(framework=m.get("framework", ""), control_id=m.get("control_id", ""),
+                                         control_name=m.get("control_name", ""))
                         for m in ctrl.get("mapped_framework_controls", [])]
         return []
     
     @rx.var
-    def selected_pol_mappings(self) -> list[str]:
-        """Return policy mappings for the selected control as formatted strings"""
+    def selected_pol_mappings(self) -> list[PolicyMapping]:
+        """Return policy mappings for the selected control"""
         for ctrl in self.unified_controls:
             if ctrl.get("ccf_id") == self.selected_control_id:
-                return [f"{m['policy_id']}: {m['policy_name']}" 
+                return [PolicyMapping(policy_id=m.get("policy_id", ""), policy_name=m.get("policy_name", ""))
                         for m in ctrl.get("mapped_policies", [])]
         return []
 
 
-class PolicyState(GRCState):
+class PolicyState(WorkspaceMixin, GRCState):
     """State for policy management"""
     
+    live_collections: ClassVar[tuple[str, ...]] = ("policies",)
+    
+    policies: list[dict[str, Any]] = []
     selected_policy_id: str = ""
     
+    def load(self):
+        self.policies = db_service.get_policies()
+    
     def toggle_policy_details(self, policy_id: str):
         """Toggle policy details expansion (one at a time)"""
         if self.selected_policy_id == policy_id:
@@ -236,11 +467,11 @@ class PolicyState(GRCState):
             self.selected_policy_id = policy_id
     
     @rx.var
-    def selected_ctrl_mappings(self) -> list[str]:
-        """Return control mappings for the selected policy as formatted strings"""
+    def selected_ctrl_mappings(self) -> list[ControlMapping]:
+        """Return control mappings for the selected policy"""
         for pol in self.policies:
             if pol.get("policy_id") == self.selected_policy_id:
-                return [f"{m['ccf_id']}: {m['control_name']}" 
+                return [ControlMapping(ccf_id=m.get("ccf_id", ""), control_name=m.get("control_name", ""))
                         for m in pol.get("mapped_controls", [])]
         return []
     
@@ -253,13 +484,12 @@ class PolicyState(GRCState):
         return []
 
 
-class RiskState(GRCState):
+class RiskState(WorkspaceMixin, PaginationMixin, GRCState):
     """State for risk management"""
     
-    new_risk_name: str = ""
-    new_risk_description: str = ""
-    new_risk_category: str = "Security"
-    new_risk_owner: str = ""
+    live_collections: ClassVar[tuple[str, ...]] = ("risks",)
+    page_source: ClassVar[tuple[str, str]] = ("risks", "created_at")
+    
     show_risk_form: bool = False
     
     # AI Suggestion state
@@ -268,18 +498,6 @@ class RiskState(GRCState):
     show_ai_suggestions: bool = False
     ai_industry: str = "General"
     
-    def set_new_risk_name(self, value: str):
-        self.new_risk_name = value
-    
-    def set_new_risk_description(self, value: str):
-        self.new_risk_description = value
-    
-    def set_new_risk_category(self, value: str):
-        self.new_risk_category = value
-    
-    def set_new_risk_owner(self, value: str):
-        self.new_risk_owner = value
-    
     def set_ai_industry(self, value: str):
         self.ai_industry = value
     
@@ -289,6 +507,9 @@ class RiskState(GRCState):
     def toggle_ai_suggestions(self):
         self.show_ai_suggestions = not self.show_ai_suggestions
     
+    def load(self):
+        self.load_page()
+    
     def get_ai_suggestions(self):
         """Get AI-powered risk suggestions"""
         self.ai_loading = True
@@ -320,439 +541,280 @@ class RiskState(GRCState):
                 "treatment": "Mitigate",
                 "kri_ids": [],
                 "linked_control_ids": [],
-                "created_at": datetime.utcnow().isoformat()
+                "created_at": datetime.now(timezone.utc)
             }
             db_service.create_risk(risk)
-            self.load_all_data()
-            return rx.toast.success(f"Risk '{suggestion.get('name', '')}' added")
+            self.refresh_page()
+            return [DashboardState.load, rx.toast.success(f"Risk '{suggestion.get('name', '')}' added")]
     
-    def create_risk(self):
+    def create_risk(self, form_data: dict):
         """Create new risk"""
-        if not self.new_risk_name:
+        if not form_data.get("name", ""):
             return rx.toast.error("Please enter risk name")
         
         risk = {
             "id": str(uuid.uuid4()),
-            "name": self.new_risk_name,
-            "description": self.new_risk_description,
-            "category": self.new_risk_category,
+            "name": form_data.get("name", ""),
+            "description": form_data.get("description", ""),
+            "category": form_data.get("category", "Security"),
             "department": self.current_department if self.current_department != "All Departments" else "Unassigned",
             "inherent_risk_score": 5,
             "residual_risk_score": 3,
             "status": "Active",
-            "owner": self.new_risk_owner,
+            "owner": form_data.get("owner", ""),
             "treatment": "Mitigate",
             "kri_ids": [],
             "linked_control_ids": [],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         
         db_service.create_risk(risk)
         
-        # Reset form
-        self.new_risk_name = ""
-        self.new_risk_description = ""
-        self.new_risk_category = "Security"
-        self.new_risk_owner = ""
+        # Close and clear the form
         self.show_risk_form = False
         
-        self.load_all_data()
-        return rx.toast.success("Risk created successfully")
+        self.refresh_page()
+        return [DashboardState.load, _reset_form("risk-form"), rx.toast.success("Risk created successfully")]
 
 
-class TestingState(GRCState):
+class TestingState(WorkspaceMixin, ControlPickerMixin, PaginationMixin, GRCState):
     """State for control testing management"""
     
-    new_test_control_id: str = ""
-    new_test_date: str = ""
-    new_test_tester: str = ""
-    new_test_result: str = "Pass"
-    new_test_evidence: str = ""
-    new_test_notes: str = ""
-    new_test_type: str = "Manual"
-    show_test_form: bool = False
-    
-    def set_new_test_control_id(self, value: str):
-        self.new_test_control_id = value
-    
-    def set_new_test_date(self, value: str):
-        self.new_test_date = value
+    live_collections: ClassVar[tuple[str, ...]] = ("control_tests",)
+    page_source: ClassVar[tuple[str, str]] = ("control_tests", "test_date")
     
-    def set_new_test_tester(self, value: str):
-        self.new_test_tester = value
-    
-    def set_new_test_result(self, value: str):
-        self.new_test_result = value
-    
-    def set_new_test_evidence(self, value: str):
-        self.new_test_evidence = value
-    
-    def set_new_test_notes(self, value: str):
-        self.new_test_notes = value
-    
-    def set_new_test_type(self, value: str):
-        self.new_test_type = value
+    show_test_form: bool = False
     
     def toggle_test_form(self):
         self.show_test_form = not self.show_test_form
+        self._reset_control_picker()
+    
+    def load(self):
+        self.load_page()
     
-    def create_control_test(self):
+    def create_control_test(self, form_data: dict):
         """Create new control test"""
-        if not self.new_test_control_id or not self.new_test_tester:
+        if not self.picked_control_id or not form_data.get("tester", ""):
             return rx.toast.error("Please fill required fields")
         
-        # Find control ccf_id
-        control = next((c for c in self.unified_controls if c["id"] == self.new_test_control_id), None)
-        ccf_id = control.get("ccf_id", "") if control else ""
-        
         test = {
             "id": str(uuid.uuid4()),
-            "control_id": self.new_test_control_id,
-            "control_ccf_id": ccf_id,
-            "test_type": self.new_test_type,
+            "control_id": self.picked_control_id,
+            "control_ccf_id": self.picked_control_ccf,
+            "test_type": form_data.get("type", "Manual"),
             "connector_id": None,
-            "test_date": self.new_test_date or datetime.utcnow().strftime("%Y-%m-%d"),
-            "tester": self.new_test_tester,
-            "result": self.new_test_result,
-            "evidence": self.new_test_evidence,
-            "notes": self.new_test_notes,
-            "created_at": datetime.utcnow().isoformat()
+            "test_date": form_data.get("date", "") or datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+            "tester": form_data.get("tester", ""),
+            "result": form_data.get("result", "Pass"),
+            "evidence": form_data.get("evidence", ""),
+            "notes": form_data.get("notes", ""),
+            "created_at": datetime.now(timezone.utc)
         }
         
         db_service.create_control_test(test)
         
-        # Reset form
-        self.new_test_control_id = ""
-        self.new_test_date = ""
-        self.new_test_tester = ""
-        self.new_test_result = "Pass"
-        self.new_test_evidence = ""
-        self.new_test_notes = ""
-        self.new_test_type = "Manual"
+        # Close and clear the form
         self.show_test_form = False
+        self._reset_control_picker()
         
-        self.load_all_data()
-        return rx.toast.success("Control test recorded successfully")
+        self.refresh_page()
+        return [DashboardState.load, _reset_form("control-test-form"), rx.toast.success("Control test recorded successfully")]
 
 
-class IssueState(GRCState):
+class IssueState(WorkspaceMixin, PaginationMixin, GRCState):
     """State for issue management"""
     
-    new_issue_title: str = ""
-    new_issue_description: str = ""
-    new_issue_severity: str = "Medium"
-    new_issue_control_id: str = ""
-    new_issue_assigned_to: str = ""
-    new_issue_due_date: str = ""
-    show_issue_form: bool = False
-    
-    def set_new_issue_title(self, value: str):
-        self.new_issue_title = value
-    
-    def set_new_issue_description(self, value: str):
-        self.new_issue_description = value
-    
-    def set_new_issue_severity(self, value: str):
-        self.new_issue_severity = value
+    live_collections: ClassVar[tuple[str, ...]] = ("issues",)
+    page_source: ClassVar[tuple[str, str]] = ("issues", "created_at")
     
-    def set_new_issue_control_id(self, value: str):
-        self.new_issue_control_id = value
-    
-    def set_new_issue_assigned_to(self, value: str):
-        self.new_issue_assigned_to = value
-    
-    def set_new_issue_due_date(self, value: str):
-        self.new_issue_due_date = value
+    show_issue_form: bool = False
     
     def toggle_issue_form(self):
         self.show_issue_form = not self.show_issue_form
     
-    def create_issue(self):
+    def load(self):
+        self.load_page()
+    
+    def create_issue(self, form_data: dict):
         """Create new issue"""
-        if not self.new_issue_title:
+        if not form_data.get("title", ""):
             return rx.toast.error("Please fill required fields")
         
         issue = {
             "id": str(uuid.uuid4()),
-            "title": self.new_issue_title,
-            "description": self.new_issue_description,
-            "severity": self.new_issue_severity,
+            "title": form_data.get("title", ""),
+            "description": form_data.get("description", ""),
+            "severity": form_data.get("severity", "Medium"),
             "status": "Open",
-            "control_id": self.new_issue_control_id,
-            "assigned_to": self.new_issue_assigned_to,
-            "due_date": self.new_issue_due_date,
-            "created_at": datetime.utcnow().isoformat()
+            "control_id": form_data.get("control_id", ""),
+            "assigned_to": form_data.get("assigned_to", ""),
+            "due_date": form_data.get("due_date", ""),
+            "created_at": datetime.now(timezone.utc)
         }
         
         db_service.create_issue(issue)
         
-        # Reset form
-        self.new_issue_title = ""
-        self.new_issue_description = ""
-        self.new_issue_severity = "Medium"
-        self.new_issue_control_id = ""
-        self.new_issue_assigned_to = ""
-        self.new_issue_due_date = ""
+        # Close and clear the form
         self.show_issue_form = False
         
-        self.load_all_data()
-        return rx.toast.success("Issue created successfully")
+        self.refresh_page()
+        return [DashboardState.load, _reset_form("issue-form"), rx.toast.success("Issue created successfully")]
     
     def update_issue_status(self, issue_id: str, new_status: str):
         """Update issue status"""
         db_service.update_issue_status(issue_id, new_status)
-        self.load_all_data()
-        return rx.toast.success(f"Issue marked as {new_status}")
+        self.refresh_page()
+        return [DashboardState.load, rx.toast.success(f"Issue marked as {new_status}")]
 
 
-class KRIState(GRCState):
+class KRIState(WorkspaceMixin, GRCState):
     """State for KRI management"""
     
-    new_kri_name: str = ""
-    new_kri_description: str = ""
-    new_kri_risk_id: str = ""
-    new_kri_threshold_green: int = 0
-    new_kri_threshold_yellow: int = 5
-    new_kri_threshold_red: int = 10
-    new_kri_current_value: int = 0
-    new_kri_unit: str = "Count"
-    new_kri_frequency: str = "Monthly"
-    new_kri_owner: str = ""
-    show_kri_form: bool = False
-    
-    def set_new_kri_name(self, value: str):
-        self.new_kri_name = value
-    
-    def set_new_kri_description(self, value: str):
-        self.new_kri_description = value
-    
-    def set_new_kri_risk_id(self, value: str):
-        self.new_kri_risk_id = value
-    
-    def set_new_kri_threshold_green(self, value: str):
-        self.new_kri_threshold_green = int(value) if value else 0
-    
-    def set_new_kri_threshold_yellow(self, value: str):
-        self.new_kri_threshold_yellow = int(value) if value else 5
-    
-    def set_new_kri_threshold_red(self, value: str):
-        self.new_kri_threshold_red = int(value) if value else 10
-    
-    def set_new_kri_current_value(self, value: str):
-        self.new_kri_current_value = int(value) if value else 0
+    live_collections: ClassVar[tuple[str, ...]] = ("kris",)
     
-    def set_new_kri_unit(self, value: str):
-        self.new_kri_unit = value
-    
-    def set_new_kri_frequency(self, value: str):
-        self.new_kri_frequency = value
+    kris: list[dict[str, Any]] = []
     
-    def set_new_kri_owner(self, value: str):
-        self.new_kri_owner = value
+    show_kri_form: bool = False
     
     def toggle_kri_form(self):
         self.show_kri_form = not self.show_kri_form
     
-    def create_kri(self):
+    def load(self):
+        self.kris = db_service.get_kris()
+    
+    def create_kri(self, form_data: dict):
         """Create new KRI"""
-        if not self.new_kri_name or not self.new_kri_risk_id:
+        if not form_data.get("name", "") or not form_data.get("risk_id", ""):
             return rx.toast.error("Please fill required fields")
+        numbers = _form_ints(form_data, {"threshold_green": 0, "threshold_yellow": 5, "threshold_red": 10, "current_value": 0})
+        if numbers is None:
+            return rx.toast.error("Thresholds and current value must be whole numbers")
         
         kri = {
             "id": str(uuid.uuid4()),
-            "name": self.new_kri_name,
-            "description": self.new_kri_description,
-            "risk_id": self.new_kri_risk_id,
-            "threshold_green": self.new_kri_threshold_green,
-            "threshold_yellow": self.new_kri_threshold_yellow,
-            "threshold_red": self.new_kri_threshold_red,
-            "current_value": self.new_kri_current_value,
-            "unit": self.new_kri_unit,
-            "frequency": self.new_kri_frequency,
-            "owner": self.new_kri_owner,
+            "name": form_data.get("name", ""),
+            "description": form_data.get("description", ""),
+            "risk_id": form_data.get("risk_id", ""),
+            **numbers,
+            "unit": form_data.get("unit", "Count"),
+            "frequency": form_data.get("frequency", "Monthly"),
+            "owner": form_data.get("owner", ""),
             "kci_ids": [],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         
         db_service.create_kri(kri)
         
-        # Reset form
-        self.new_kri_name = ""
-        self.new_kri_description = ""
-        self.new_kri_risk_id = ""
-        self.new_kri_threshold_green = 0
-        self.new_kri_threshold_yellow = 5
-        self.new_kri_threshold_red = 10
-        self.new_kri_current_value = 0
-        self.new_kri_owner = ""
+        # Close and clear the form
         self.show_kri_form = False
         
-        self.load_all_data()
-        return rx.toast.success("KRI created successfully")
+        self.load()
+        return [_reset_form("kri-form"), rx.toast.success("KRI created successfully")]
 
 
-class KCIState(GRCState):
+class KCIState(WorkspaceMixin, GRCState):
     """State for KCI management"""
     
-    new_kci_name: str = ""
-    new_kci_description: str = ""
-    new_kci_kri_id: str = ""
-    new_kci_control_id: str = ""
-    new_kci_threshold_green: int = 95
-    new_kci_threshold_yellow: int = 85
-    new_kci_threshold_red: int = 75
-    new_kci_current_value: int = 100
-    new_kci_unit: str = "Percentage"
-    new_kci_frequency: str = "Monthly"
-    new_kci_owner: str = ""
-    show_kci_form: bool = False
-    
-    def set_new_kci_name(self, value: str):
-        self.new_kci_name = value
-    
-    def set_new_kci_description(self, value: str):
-        self.new_kci_description = value
-    
-    def set_new_kci_kri_id(self, value: str):
-        self.new_kci_kri_id = value
+    live_collections: ClassVar[tuple[str, ...]] = ("kcis",)
     
-    def set_new_kci_control_id(self, value: str):
-        self.new_kci_control_id = value
-    
-    def set_new_kci_threshold_green(self, value: str):
-        self.new_kci_threshold_green = int(value) if value else 95
-    
-    def set_new_kci_threshold_yellow(self, value: str):
-        self.new_kci_threshold_yellow = int(value) if value else 85
-    
-    def set_new_kci_threshold_red(self, value: str):
-        self.new_kci_threshold_red = int(value) if value else 75
-    
-    def set_new_kci_current_value(self, value: str):
-        self.new_kci_current_value = int(value) if value else 100
-    
-    def set_new_kci_unit(self, value: str):
-        self.new_kci_unit = value
-    
-    def set_new_kci_frequency(self, value: str):
-        self.new_kci_frequency = value
+    kcis: list[dict[str, Any]] = []
     
-    def set_new_kci_owner(self, value: str):
-        self.new_kci_owner = value
+    show_kci_form: bool = False
     
     def toggle_kci_form(self):
         self.show_kci_form = not self.show_kci_form
     
-    def create_kci(self):
+    def load(self):
+        self.kcis = db_service.get_kcis()
+    
+    def create_kci(self, form_data: dict):
         """Create new KCI"""
-        if not self.new_kci_name or not self.new_kci_kri_id:
+        if not form_data.get("name", "") or not form_data.get("kri_id", ""):
             return rx.toast.error("Please fill required fields")
+        numbers = _form_ints(form_data, {"threshold_green": 95, "threshold_yellow": 85, "threshold_red": 75, "current_value": 100})
+        if numbers is None:
+            return rx.toast.error("Thresholds and current value must be whole numbers")
         
         kci = {
             "id": str(uuid.uuid4()),
-            "name": self.new_kci_name,
-            "description": self.new_kci_description,
-            "kri_id": self.new_kci_kri_id,
-            "control_id": self.new_kci_control_id,
-            "threshold_green": self.new_kci_threshold_green,
-            "threshold_yellow": self.new_kci_threshold_yellow,
-            "threshold_red": self.new_kci_threshold_red,
-            "current_value": self.new_kci_current_value,
-            "unit": self.new_kci_unit,
-            "frequency": self.new_kci_frequency,
-            "owner": self.new_kci_owner,
-            "created_at": datetime.utcnow().isoformat()
+            "name": form_data.get("name", ""),
+            "description": form_data.get("description", ""),
+            "kri_id": form_data.get("kri_id", ""),
+            "control_id": form_data.get("control_id", ""),
+            **numbers,
+            "unit": form_data.get("unit", "Percentage"),
+            "frequency": form_data.get("frequency", "Monthly"),
+            "owner": form_data.get("owner", ""),
+            "created_at": datetime.now(timezone.utc)
         }
         
         db_service.create_kci(kci)
         
-        # Reset form
-        self.new_kci_name = ""
-        self.new_kci_description = ""
-        self.new_kci_kri_id = ""
-        self.new_kci_control_id = ""
-        self.new_kci_threshold_green = 95
-        self.new_kci_threshold_yellow = 85
-        self.new_kci_threshold_red = 75
-        self.new_kci_current_value = 100
-        self.new_kci_owner = ""
+        # Close and clear the form
         self.show_kci_form = False
         
-        self.load_all_data()
-        return rx.toast.success("KCI created successfully")
+        self.load()
+        return [_reset_form("kci-form"), rx.toast.success("KCI created successfully")]
 
 
-class HeatmapState(GRCState):
+class HeatmapState(WorkspaceMixin, GRCState):
     """State for risk heatmap visualization"""
-    pass
+    
+    live_collections: ClassVar[tuple[str, ...]] = ("risks", "kris", "kcis")
+    
+    risks: list[dict[str, Any]] = []
+    kris: list[dict[str, Any]] = []
+    kcis: list[dict[str, Any]] = []
+    
+    def load(self):
+        """Load the Risk -> KRI -> KCI network"""
+        self.risks = db_service.get_risks_by_dept(self._filter_dept())
+        self.kris = db_service.get_kris()
+        self.kcis = db_service.get_kcis()
 
 
-class AIGovernanceState(GRCState):
+class AIGovernanceState(WorkspaceMixin, PaginationMixin, GRCState):
     """State for AI Governance module"""
     
+    live_collections: ClassVar[tuple[str, ...]] = ("ai_models",)
+    page_source: ClassVar[tuple[str, str]] = ("ai_models", "created_at")
+    
+    ai_assessments: list[dict[str, Any]] = []
+    
     # AI Model form
-    new_model_name: str = ""
-    new_model_type: str = "Classification"
-    new_model_version: str = "1.0.0"
-    new_model_status: str = "Development"
-    new_model_risk_level: str = "Medium"
-    new_model_owner: str = ""
-    new_model_department: str = ""
-    new_model_purpose: str = ""
     show_model_form: bool = False
     
     # Assessment form
     show_assessment_form: bool = False
-    assessment_model_id: str = ""
-    assessment_bias_risk: str = "Medium"
-    assessment_privacy_risk: str = "Medium"
-    assessment_security_risk: str = "Medium"
-    assessment_transparency_risk: str = "Medium"
-    assessment_findings: str = ""
-    assessment_recommendations: str = ""
-    
-    def set_new_model_name(self, value: str):
-        self.new_model_name = value
-    
-    def set_new_model_type(self, value: str):
-        self.new_model_type = value
-    
-    def set_new_model_version(self, value: str):
-        self.new_model_version = value
-    
-    def set_new_model_status(self, value: str):
-        self.new_model_status = value
-    
-    def set_new_model_risk_level(self, value: str):
-        self.new_model_risk_level = value
     
-    def set_new_model_owner(self, value: str):
-        self.new_model_owner = value
+    def toggle_model_form(self):
+        self.show_model_form = not self.show_model_form
     
-    def set_new_model_department(self, value: str):
-        self.new_model_department = value
+    def _page_query(self) -> dict:
+        return {}  # AI models are not department-owned
     
-    def set_new_model_purpose(self, value: str):
-        self.new_model_purpose = value
+    def load(self):
+        self.load_page()
+        self.load_assessments()
     
-    def toggle_model_form(self):
-        self.show_model_form = not self.show_model_form
+    def load_assessments(self):
+        self.ai_assessments = db_service.get_ai_assessments()
     
-    def create_ai_model(self):
+    def create_ai_model(self, form_data: dict):
         """Create new AI model"""
-        if not self.new_model_name or not self.new_model_owner:
+        if not form_data.get("name", "") or not form_data.get("owner", ""):
             return rx.toast.error("Please fill required fields")
         
         model = {
             "id": str(uuid.uuid4()),
-            "name": self.new_model_name,
-            "type": self.new_model_type,
-            "version": self.new_model_version,
-            "status": self.new_model_status,
-            "risk_level": self.new_model_risk_level,
-            "owner": self.new_model_owner,
-            "department": self.new_model_department,
-            "purpose": self.new_model_purpose,
+            "name": form_data.get("name", ""),
+            "type": form_data.get("type", "Classification"),
+            "version": form_data.get("version", "1.0.0"),
+            "status": form_data.get("status", "Development"),
+            "risk_level": form_data.get("risk_level", "Medium"),
+            "owner": form_data.get("owner", ""),
+            "department": form_data.get("department", ""),
+            "purpose": form_data.get("purpose", ""),
             "data_sources": [],
             "training_data_size": "N/A",
             "last_trained": None,
@@ -762,145 +824,174 @@ class AIGovernanceState(GRCState):
             "has_human_oversight": True,
             "pii_involved": False,
             "automated_decisions": False,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         
         db_service.create_ai_model(model)
         
-        # Reset form
-        self.new_model_name = ""
-        self.new_model_type = "Classification"
-        self.new_model_version = "1.0.0"
-        self.new_model_status = "Development"
-        self.new_model_risk_level = "Medium"
-        self.new_model_owner = ""
-        self.new_model_department = ""
-        self.new_model_purpose = ""
+        # Close and clear the form
         self.show_model_form = False
         
-        self.load_all_data()
-        return rx.toast.success("AI Model registered successfully")
-    
-    def set_assessment_model_id(self, value: str):
-        self.assessment_model_id = value
-    
-    def set_assessment_bias_risk(self, value: str):
-        self.assessment_bias_risk = value
-    
-    def set_assessment_privacy_risk(self, value: str):
-        self.assessment_privacy_risk = value
-    
-    def set_assessment_security_risk(self, value: str):
-        self.assessment_security_risk = value
-    
-    def set_assessment_transparency_risk(self, value: str):
-        self.assessment_transparency_risk = value
-    
-    def set_assessment_findings(self, value: str):
-        self.assessment_findings = value
-    
-    def set_assessment_recommendations(self, value: str):
-        self.assessment_recommendations = value
+        self.refresh_page()
+        return [DashboardState.load, _reset_form("ai-model-form"), rx.toast.success("AI Model registered successfully")]
     
     def toggle_assessment_form(self):
         self.show_assessment_form = not self.show_assessment_form
     
-    def create_assessment(self):
+    def create_assessment(self, form_data: dict):
         """Create new AI assessment"""
-        if not self.assessment_model_id:
+        model_id = form_data.get("model_id", "")
+        if not model_id:
             return rx.toast.error("Please select a model")
         
         # Find model name
-        model = next((m for m in self.ai_models if m["id"] == self.assessment_model_id), None)
+        model = db_service.get_ai_model(model_id)
         model_name = model.get("name", "") if model else ""
         
         # Calculate overall risk
+        risks = {k: form_data.get(k, "Medium") for k in ("bias_risk", "privacy_risk", "security_risk", "transparency_risk")}
         risk_scores = {"Low": 1, "Medium": 2, "High": 3, "Critical": 4}
-        avg_score = (risk_scores.get(self.assessment_bias_risk, 2) + 
-                    risk_scores.get(self.assessment_privacy_risk, 2) +
-                    risk_scores.get(self.assessment_security_risk, 2) +
-                    risk_scores.get(self.assessment_transparency_risk, 2)) / 4
+        avg_score = sum(risk_scores.get(v, 2) for v in risks.values()) / 4
         
         overall_risk = "Low" if avg_score <= 1.5 else "Medium" if avg_score <= 2.5 else "High" if avg_score <= 3.5 else "Critical"
         
         assessment = {
             "id": str(uuid.uuid4()),
-            "model_id": self.assessment_model_id,
+            "model_id": model_id,
             "model_name": model_name,
-            "assessment_date": datetime.utcnow().strftime("%Y-%m-%d"),
+            "assessment_date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
             "assessor": self.current_user.get("name", "Unknown"),
             "status": "Completed",
             "overall_risk": overall_risk,
-            "bias_risk": self.assessment_bias_risk,
-            "privacy_risk": self.assessment_privacy_risk,
-            "security_risk": self.assessment_security_risk,
-            "transparency_risk": self.assessment_transparency_risk,
-            "findings": [f.strip() for f in self.assessment_findings.split("\n") if f.strip()],
-            "recommendations": [r.strip() for r in self.assessment_recommendations.split("\n") if r.strip()],
+            **risks,
+            "findings": [f.strip() for f in form_data.get("findings", "").split("\n") if f.strip()],
+            "recommendations": [r.strip() for r in form_data.get("recommendations", "").split("\n") if r.strip()],
             "next_review": "",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         
         db_service.create_ai_assessment(assessment)
         
-        # Reset form
-        self.assessment_model_id = ""
-        self.assessment_bias_risk = "Medium"
-        self.assessment_privacy_risk = "Medium"
-        self.assessment_security_risk = "Medium"
-        self.assessment_transparency_risk = "Medium"
-        self.assessment_findings = ""
-        self.assessment_recommendations = ""
+        # Close and clear the form
         self.show_assessment_form = False
         
-        self.load_all_data()
-        return rx.toast.success("AI Assessment created successfully")
+        self.load_assessments()
+        return [_reset_form("ai-assessment-form"), rx.toast.success("AI Assessment created successfully")]
 
 
-class AuditLogState(GRCState):
-    """State for audit logs"""
-    pass
+class AuditLogState(WorkspaceMixin, GRCState):
+    """State for audit logs.
+    
+    Logs live in monthly partitions, so instead of counting and skipping the
+    page keeps a stack of (timestamp, id) cursors and only ever asks for the
+    next `page_size` rows after one of them.
+    """
+    
+    log_rows: list[dict[str, Any]] = []
+    page_size: int = 50
+    page_index: int = 0
+    has_older: bool = False
+    
+    filter_user: str = ""
+    filter_action: str = ""
+    filter_resource: str = ""
+    
+    # Backend-only: start cursor of every page visited so far
+    _cursors: list[Any] = []
+    
+    def _filters(self) -> dict:
+        return {
+            "user_email": self.filter_user.strip(),
+            "action": self.filter_action,
+            "resource": self.filter_resource.strip(),
+        }
+    
+    def _fetch(self):
+        after = self._cursors[self.page_index] if self.page_index < len(self._cursors) else None
+        rows = db_service.get_audit_log_page(
+            self._filters(), after=tuple(after) if after else None, limit=self.page_size + 1
+        )
+        self.has_older = len(rows) > self.page_size
+        self.log_rows = rows[:self.page_size]
+    
+    def load(self):
+        # Audit events are written behind; make the page include the latest ones
+        db_service.flush_audit_logs()
+        self.page_index = 0
+        self._cursors = [None]
+        self._fetch()
+    
+    def apply_filters(self, form_data: dict):
+        self.filter_user = form_data.get("user_email", "")
+        self.filter_action = form_data.get("action", "")
+        if self.filter_action == "All actions":
+            self.filter_action = ""
+        self.filter_resource = form_data.get("resource", "")
+        self.load()
+    
+    def clear_filters(self):
+        self.filter_user = ""
+        self.filter_action = ""
+        self.filter_resource = ""
+        self.load()
+    
+    def older_page(self):
+        if not self.has_older or not self.log_rows:
+            return
+        last = self.log_rows[-1]
+        self._cursors = self._cursors[:self.page_index + 1] + [[last["timestamp"], last.get("id", "")]]
+        self.page_index += 1
+        self._fetch()
+    
+    def newer_page(self):
+        if self.page_index > 0:
+            self.page_index -= 1
+            self._fetch()
 
 
-class ConnectorState(GRCState):
+class ConnectorState(WorkspaceMixin, GRCState):
     """State for connector management"""
     
+    live_collections: ClassVar[tuple[str, ...]] = ("connectors",)
+    
+    connectors: list[dict[str, Any]] = []
+    
+    def load(self):
+        self.connectors = db_service.get_connectors()
+    
     def toggle_connector(self, connector_id: str, current_status: str):
         """Toggle connector status"""
         new_status = "Disconnected" if current_status == "Connected" else "Connected"
         db_service.update_connector_status(connector_id, new_status)
-        self.load_all_data()
+        self.load()
         return rx.toast.success(f"Connector {'connected' if new_status == 'Connected' else 'disconnected'}")
 
 
 
-class GapAnalysisState(GRCState):
+class GapAnalysisState(WorkspaceMixin, GRCState):
     """State for AI-powered compliance gap analysis"""
     
+    framework_names: list[str] = []
     selected_framework: str = ""
     analysis_loading: bool = False
     analysis_complete: bool = False
     
-    # Results (flat types for Reflex compatibility)
+    # Results
     overall_score: int = 0
     maturity_level: str = ""
     summary: str = ""
-    strengths: list[str] = []
-    critical_gaps: list[str] = []
-    gap_severities: list[str] = []
-    gap_recommendations: list[str] = []
-    improvements: list[str] = []
+    strengths: list[Strength] = []
+    critical_gaps: list[CriticalGap] = []
+    improvements: list[Improvement] = []
     quick_wins: list[str] = []
-    roadmap_phases: list[str] = []
-    roadmap_actions: list[str] = []
+    roadmap: list[RoadmapPhase] = []
     
     def set_selected_framework(self, value: str):
         self.selected_framework = value
     
-    @rx.var
-    def framework_names(self) -> list[str]:
-        """Return list of framework names for the dropdown"""
-        return [fw.get("name", "") for fw in self.frameworks if fw.get("enabled", True)]
+    def load(self):
+        """Load framework names for the dropdown"""
+        self.framework_names = [fw.get("name", "") for fw in db_service.get_frameworks(fields=["name", "enabled"]) if fw.get("enabled", True)]
     
     def run_gap_analysis(self):
         """Run AI-powered compliance gap analysis"""
@@ -915,19 +1006,14 @@ class GapAnalysisState(GRCState):
             from .ai_service import ai_service
             
             # Find framework controls
-            fw_data = None
-            for fw in self.frameworks:
-                if fw.get("name") == self.selected_framework:
-                    fw_data = fw
-                    break
-            
+            fw_data = db_service.get_framework_by_name(self.selected_framework)
             fw_controls = fw_data.get("controls", []) if fw_data else []
             
             result = ai_service.analyze_compliance_gaps(
                 self.selected_framework,
                 fw_controls,
-                self.unified_controls,
-                self.policies
+                db_service.get_unified_controls(fields=["ccf_id", "name", "status", "mapped_framework_controls"]),
+                db_service.get_policies(fields=["name"])
             )
             
             # Parse results into flat types
@@ -935,34 +1021,26 @@ class GapAnalysisState(GRCState):
             self.maturity_level = result.get("maturity_level", "Unknown")
             self.summary = result.get("summary", "")
             
-            # Strengths: "Area: Detail"
             self.strengths = [
-                f"{s.get('area', '')}: {s.get('detail', '')}" 
+                Strength(area=str(s.get("area", "")), detail=str(s.get("detail", "")))
                 for s in result.get("strengths", [])
             ]
-            
-            # Critical gaps: separate lists for display
-            gaps = result.get("critical_gaps", [])
             self.critical_gaps = [
-                f"{g.get('gap', '')}: {g.get('detail', '')}" 
-                for g in gaps
+                CriticalGap(gap=str(g.get("gap", "")), detail=str(g.get("detail", "")),
+                            severity=str(g.get("severity", "Medium")),
+                            recommendation=str(g.get("recommendation", "")))
+                for g in result.get("critical_gaps", [])
             ]
-            self.gap_severities = [g.get("severity", "Medium") for g in gaps]
-            self.gap_recommendations = [g.get("recommendation", "") for g in gaps]
-            
-            # Improvements: "Area | Current -> Target (Effort)"
             self.improvements = [
-                f"{i.get('area', '')} | {i.get('current_state', '')} -> {i.get('target_state', '')} ({i.get('effort', '')} effort)"
+                Improvement(area=str(i.get("area", "")), current_state=str(i.get("current_state", "")),
+                            target_state=str(i.get("target_state", "")), effort=str(i.get("effort", "")))
                 for i in result.get("improvements", [])
             ]
-            
-            # Quick wins
-            self.quick_wins = result.get("quick_wins", [])
-            
-            # Roadmap
-            roadmap = result.get("roadmap", [])
-            self.roadmap_phases = [r.get("phase", "") for r in roadmap]
-            self.roadmap_actions = [" | ".join(r.get("actions", [])) for r in roadmap]
+            self.quick_wins = [str(q) for q in result.get("quick_wins", [])]
+            self.roadmap = [
+                RoadmapPhase(phase=str(r.get("phase", "")), actions=[str(a) for a in r.get("actions", [])])
+                for r in result.get("roadmap", [])
+            ]
             
             self.analysis_complete = True
             
@@ -976,140 +1054,129 @@ class GapAnalysisState(GRCState):
         self.analysis_loading = False
 
 
-class AuditManagementState(GRCState):
+class AuditManagementState(WorkspaceMixin, ControlPickerMixin, GRCState):
     """State for Internal Audit Management"""
     
+    live_collections: ClassVar[tuple[str, ...]] = ("audits", "audit_findings", "control_tests", "unified_controls", "frameworks")
+    
     # Data
     audits: list[dict[str, Any]] = []
     audit_findings: list[dict[str, Any]] = []
+    framework_options: list[str] = []
+    
+    # Backend-only indexes, rebuilt on load and keyed by `_data_version`.
+    # Framework -> control mappings come from the shared coverage matrix.
+    _data_version: int = 0
+    _findings_by_audit: dict[str, list[dict[str, Any]]] = {}
+    _readiness_cache: dict[str, dict[str, Any]] = {}
     
     # Form state
     show_audit_form: bool = False
-    new_audit_name: str = ""
-    new_audit_framework: str = ""
-    new_audit_auditor: str = ""
-    new_audit_start: str = ""
-    new_audit_end: str = ""
-    new_audit_scope: str = ""
     
     # Finding form
     show_finding_form: bool = False
     selected_audit_id: str = ""
-    new_finding_control: str = ""
-    new_finding_desc: str = ""
-    new_finding_severity: str = "Medium"
-    new_finding_remediation: str = ""
-    new_finding_assigned: str = ""
-    new_finding_due: str = ""
+    
+    # CCF IDs with passing control tests — no re-audit needed
+    tested_ccf_ids: list[str] = []
     
     # Readiness view
     selected_readiness_fw: str = ""
+    readiness_controls: list[ReadinessRow] = []
+    readiness_summary: ReadinessSummary = ReadinessSummary()
+    framework_coverage: list[FrameworkCoverageRow] = []
     
-    def load_audit_data(self):
+    def load(self):
         """Load all audit-related data filtered by department"""
-        self.load_all_data()
         dept = self._filter_dept()
+        self.framework_options = [fw.get("name", "") for fw in db_service.get_frameworks(fields=["name", "enabled"]) if fw.get("enabled", True)]
         self.audits = db_service.get_audits(dept)
         self.audit_findings = db_service.get_audit_findings()
-    
-    # Setters
-    def set_new_audit_name(self, v: str): self.new_audit_name = v
-    def set_new_audit_framework(self, v: str): self.new_audit_framework = v
-    def set_new_audit_auditor(self, v: str): self.new_audit_auditor = v
-    def set_new_audit_start(self, v: str): self.new_audit_start = v
-    def set_new_audit_end(self, v: str): self.new_audit_end = v
-    def set_new_audit_scope(self, v: str): self.new_audit_scope = v
-    def set_new_finding_control(self, v: str): self.new_finding_control = v
-    def set_new_finding_desc(self, v: str): self.new_finding_desc = v
-    def set_new_finding_severity(self, v: str): self.new_finding_severity = v
-    def set_new_finding_remediation(self, v: str): self.new_finding_remediation = v
-    def set_new_finding_assigned(self, v: str): self.new_finding_assigned = v
-    def set_new_finding_due(self, v: str): self.new_finding_due = v
-    def set_selected_readiness_fw(self, v: str): self.selected_readiness_fw = v
-    
-    def toggle_audit_form(self):
-        self.show_audit_form = not self.show_audit_form
-    
-    def toggle_finding_form(self, audit_id: str = ""):
-        self.selected_audit_id = audit_id
-        self.show_finding_form = not self.show_finding_form
-    
-    @rx.var
-    def framework_options(self) -> list[str]:
-        return [fw.get("name", "") for fw in self.frameworks if fw.get("enabled", True)]
-    
-    @rx.var
-    def control_options(self) -> list[str]:
-        return [f"{c.get('ccf_id', '')}: {c.get('name', '')}" for c in self.unified_controls]
-    
-    @rx.var
-    def tested_ccf_ids(self) -> list[str]:
-        """CCF IDs with passing control tests — no re-audit needed"""
-        passed = set()
-        for t in self.control_tests:
-            if t.get("result") == "Pass":
-                passed.add(t.get("control_ccf_id", ""))
-        return list(passed)
-    
-    @rx.var
-    def readiness_controls(self) -> list[str]:
-        """For the selected framework, return list of formatted control readiness strings"""
-        if not self.selected_readiness_fw:
-            return []
+        self.tested_ccf_ids = sorted(db_service.get_tested_ccf_ids(dept))
+        self._build_indexes()
+        self._refresh_readiness()
+        self._refresh_coverage()
+    
+    def _build_indexes(self):
+        """Index audit -> findings for the loaded data"""
+        findings_by_audit: dict[str, list[dict[str, Any]]] = {}
+        for f in self.audit_findings:
+            findings_by_audit.setdefault(f.get("audit_id", ""), []).append(f)
         
-        tested = set()
-        for t in self.control_tests:
-            if t.get("result") == "Pass":
-                tested.add(t.get("control_ccf_id", ""))
+        self._findings_by_audit = findings_by_audit
+        self._data_version += 1
+        self._readiness_cache = {}
+    
+    def _compute_readiness(self, framework: str) -> dict[str, Any]:
+        """Readiness rows and counts for a framework, memoized per data version"""
+        cached = self._readiness_cache.get(framework)
+        if cached and cached["version"] == self._data_version:
+            return cached
         
+        tested = set(self.tested_ccf_ids)
         audited_ccfs = set()
         for a in self.audits:
-            if a.get("framework") == self.selected_readiness_fw and a.get("status") in ["Completed", "In Progress"]:
-                # Find findings for this audit to know which controls were audited
-                for f in self.audit_findings:
-                    if f.get("audit_id") == a.get("id"):
-                        ctrl_id = f.get("control_ccf_id", "")
-                        if ctrl_id:
-                            audited_ccfs.add(ctrl_id)
+            if a.get("framework") == framework and a.get("status") in ["Completed", "In Progress"]:
+                for f in self._findings_by_audit.get(a.get("id"), []):
+                    ctrl_id = f.get("control_ccf_id", "")
+                    if ctrl_id:
+                        audited_ccfs.add(ctrl_id)
         
-        results = []
-        for ctrl in self.unified_controls:
-            ccf_id = ctrl.get("ccf_id", "")
-            name = ctrl.get("name", "")
-            # Check if this control maps to the selected framework
-            mapped = False
-            for m in ctrl.get("mapped_framework_controls", []):
-                if m.get("framework") == self.selected_readiness_fw:
-                    mapped = True
-                    break
-            if not mapped:
-                continue
-            
+        rows = []
+        counts = {"covered": 0, "audited": 0, "needs_audit": 0}
+        for ccf_id, name in db_service.get_coverage().framework_controls(framework):
             if ccf_id in tested:
-                status = "COVERED (CCF Tested - Pass)"
+                status = "covered"
             elif ccf_id in audited_ccfs:
-                status = "AUDITED"
+                status = "audited"
             else:
-                status = "NEEDS AUDIT"
-            
-            results.append(f"{ccf_id} | {name} | {status}")
+                status = "needs_audit"
+            counts[status] += 1
+            rows.append((ccf_id, name, status))
         
-        return results
-    
-    @rx.var
-    def readiness_summary(self) -> str:
-        """Summary stats for the selected framework readiness"""
+        result = {"version": self._data_version, "rows": rows, "counts": counts}
+        cache = dict(self._readiness_cache)
+        cache[framework] = result
+        self._readiness_cache = cache
+        return result
+    
+    def _refresh_readiness(self):
+        """Publish readiness rows and summary for the selected framework"""
         if not self.selected_readiness_fw:
-            return ""
-        controls = self.readiness_controls
-        total = len(controls)
-        if total == 0:
-            return "No controls mapped to this framework"
-        covered = sum(1 for c in controls if "COVERED" in c)
-        audited = sum(1 for c in controls if "AUDITED" in c)
-        needs = sum(1 for c in controls if "NEEDS AUDIT" in c)
-        pct = round(((covered + audited) / total) * 100) if total > 0 else 0
-        return f"{pct}% ready | {covered} covered by CCF testing | {audited} audited | {needs} need audit | {total} total"
+            self.readiness_controls = []
+            self.readiness_summary = ReadinessSummary()
+            return
+        readiness = self._compute_readiness(self.selected_readiness_fw)
+        self.readiness_controls = [
+            ReadinessRow(ccf_id=ccf_id, name=name, status=status)
+            for ccf_id, name, status in readiness["rows"]
+        ]
+        
+        counts = readiness["counts"]
+        total = len(readiness["rows"])
+        pct = round(((counts["covered"] + counts["audited"]) / total) * 100) if total else 0
+        self.readiness_summary = ReadinessSummary(total=total, pct_ready=pct, **counts)
+    
+    def _refresh_coverage(self):
+        """Requirement coverage by passing controls for every enabled framework"""
+        enabled = set(self.framework_options)
+        self.framework_coverage = [
+            FrameworkCoverageRow(**score)
+            for score in db_service.get_coverage().framework_scores(self.tested_ccf_ids)
+            if score["framework"] in enabled
+        ]
+    
+    def set_selected_readiness_fw(self, v: str):
+        self.selected_readiness_fw = v
+        self._refresh_readiness()
+    
+    def toggle_audit_form(self):
+        self.show_audit_form = not self.show_audit_form
+    
+    def toggle_finding_form(self, audit_id: str = ""):
+        self.selected_audit_id = audit_id
+        self.show_finding_form = not self.show_finding_form
+        self._reset_control_picker()
     
     @rx.var
     def audit_stats(self) -> dict[str, int]:
@@ -1121,99 +1188,85 @@ class AuditManagementState(GRCState):
         return {"total": total, "planned": planned, "in_progress": in_progress, "completed": completed, "open_findings": open_findings}
     
     @rx.var
-    def selected_audit_findings(self) -> list[str]:
-        """Findings for the selected audit as formatted strings"""
+    def selected_audit_findings(self) -> list[AuditFindingRow]:
+        """Findings for the selected audit"""
         if not self.selected_audit_id:
             return []
-        results = []
-        for f in self.audit_findings:
-            if f.get("audit_id") == self.selected_audit_id:
-                sev = f.get("severity", "Medium")
-                status = f.get("status", "Open")
-                ctrl = f.get("control_ccf_id", "N/A")
-                desc = f.get("description", "")
-                remediation = f.get("remediation", "")
-                assigned = f.get("assigned_to", "Unassigned")
-                results.append(f"{sev} | {ctrl} | {desc} | Remediation: {remediation} | Assigned: {assigned} | Status: {status}")
-        return results
-    
-    def create_audit(self):
+        return [
+            AuditFindingRow(
+                id=f.get("id", ""),
+                severity=f.get("severity", "Medium"),
+                control_ccf_id=f.get("control_ccf_id") or "N/A",
+                description=f.get("description", ""),
+                remediation=f.get("remediation", ""),
+                assigned_to=f.get("assigned_to", "Unassigned"),
+                status=f.get("status", "Open"),
+            )
+            for f in self.audit_findings
+            if f.get("audit_id") == self.selected_audit_id
+        ]
+    
+    def create_audit(self, form_data: dict):
         """Create a new audit plan"""
-        if not self.new_audit_name or not self.new_audit_framework:
+        framework = form_data.get("framework", "")
+        if not form_data.get("name", "") or not framework:
             return rx.toast.error("Please fill in audit name and framework")
         
         # Determine which controls need audit (not already tested via CCF)
-        tested = set()
-        for t in self.control_tests:
-            if t.get("result") == "Pass":
-                tested.add(t.get("control_ccf_id", ""))
+        tested = set(self.tested_ccf_ids)
         
-        scope_controls = []
-        for ctrl in self.unified_controls:
-            ccf_id = ctrl.get("ccf_id", "")
-            for m in ctrl.get("mapped_framework_controls", []):
-                if m.get("framework") == self.new_audit_framework:
-                    if ccf_id not in tested:
-                        scope_controls.append(ccf_id)
-                    break
+        scope_controls = [
+            ccf_id for ccf_id, _ in db_service.get_coverage().framework_controls(framework)
+            if ccf_id not in tested
+        ]
         
         audit = {
             "id": str(uuid.uuid4()),
-            "name": self.new_audit_name,
-            "framework": self.new_audit_framework,
+            "name": form_data.get("name", ""),
+            "framework": framework,
             "department": self.current_department if self.current_department != "All Departments" else "Unassigned",
             "status": "Planned",
-            "auditor": self.new_audit_auditor or "Unassigned",
-            "start_date": self.new_audit_start or "TBD",
-            "end_date": self.new_audit_end or "TBD",
-            "scope": self.new_audit_scope or f"Audit of {self.new_audit_framework} controls",
+            "auditor": form_data.get("auditor", "") or "Unassigned",
+            "start_date": form_data.get("start", "") or "TBD",
+            "end_date": form_data.get("end", "") or "TBD",
+            "scope": form_data.get("scope", "") or f"Audit of {framework} controls",
             "scope_controls": scope_controls,
             "skipped_controls": list(tested),
             "findings_count": 0,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         
         db_service.create_audit(audit)
         
-        # Reset form
-        self.new_audit_name = ""
-        self.new_audit_framework = ""
-        self.new_audit_auditor = ""
-        self.new_audit_start = ""
-        self.new_audit_end = ""
-        self.new_audit_scope = ""
+        # Close and clear the form
         self.show_audit_form = False
         
-        self.load_audit_data()
+        self.load()
         skipped = len(tested)
-        return rx.toast.success(f"Audit created! {skipped} controls auto-skipped (already CCF tested)")
+        return [_reset_form("audit-form"), rx.toast.success(f"Audit created! {skipped} controls auto-skipped (already CCF tested)")]
     
     def update_audit_status(self, audit_id: str, new_status: str):
         """Update audit status"""
         db_service.update_audit(audit_id, {"status": new_status})
-        self.load_audit_data()
+        self.load()
         return rx.toast.success(f"Audit status updated to {new_status}")
     
-    def create_finding(self):
+    def create_finding(self, form_data: dict):
         """Create a new audit finding"""
-        if not self.new_finding_desc:
+        if not form_data.get("desc", ""):
             return rx.toast.error("Please enter finding description")
         
-        ctrl_ccf = ""
-        if self.new_finding_control and ":" in self.new_finding_control:
-            ctrl_ccf = self.new_finding_control.split(":")[0].strip()
-        
         finding = {
             "id": str(uuid.uuid4()),
             "audit_id": self.selected_audit_id,
-            "control_ccf_id": ctrl_ccf,
-            "description": self.new_finding_desc,
-            "severity": self.new_finding_severity,
+            "control_ccf_id": self.picked_control_ccf,
+            "description": form_data.get("desc", ""),
+            "severity": form_data.get("severity", "Medium"),
             "status": "Open",
-            "remediation": self.new_finding_remediation,
-            "assigned_to": self.new_finding_assigned or "Unassigned",
-            "due_date": self.new_finding_due or "TBD",
-            "created_at": datetime.utcnow().isoformat()
+            "remediation": form_data.get("remediation", ""),
+            "assigned_to": form_data.get("assigned", "") or "Unassigned",
+            "due_date": form_data.get("due", "") or "TBD",
+            "created_at": datetime.now(timezone.utc)
         }
         
         db_service.create_audit_finding(finding)
@@ -1222,20 +1275,53 @@ class AuditManagementState(GRCState):
         findings = db_service.get_audit_findings(self.selected_audit_id)
         db_service.update_audit(self.selected_audit_id, {"findings_count": len(findings)})
         
-        # Reset
-        self.new_finding_control = ""
-        self.new_finding_desc = ""
-        self.new_finding_severity = "Medium"
-        self.new_finding_remediation = ""
-        self.new_finding_assigned = ""
-        self.new_finding_due = ""
+        # Close and clear the form
         self.show_finding_form = False
+        self._reset_control_picker()
         
-        self.load_audit_data()
-        return rx.toast.success("Finding added")
+        self.load()
+        return [_reset_form("audit-finding-form"), rx.toast.success("Finding added")]
     
     def resolve_finding(self, finding_id: str):
         """Mark a finding as resolved"""
         db_service.update_audit_finding(finding_id, {"status": "Resolved"})
-        self.load_audit_data()
+        self.load()
         return rx.toast.success("Finding resolved")
+
+
+class SearchState(WorkspaceMixin, GRCState):
+    """Global search across controls, framework requirements, policies, issues and risks"""
+    
+    live_collections: ClassVar[tuple[str, ...]] = tuple(SEARCH_RESULT_ROUTES)
+    
+    search_query: str = ""
+    search_hits: list[SearchHit] = []
+    
+    def submit_search(self, form_data: dict):
+        """Run the search bar query and show the results page"""
+        self.search_query = form_data.get("q", "").strip()
+        self.load()
+        return rx.redirect("/search")
+    
+    def load(self):
+        """Re-run the current query (workspace switch, live reload)"""
+        if not self.search_query:
+            self.search_hits = []
+            return
+        try:
+            # Strip a plural "s" so "controls" also highlights "control"
+            terms = [t[:-1] if len(t) > 3 and t.endswith("s") else t
+                     for t in re.findall(r"[a-z0-9]+", self.search_query.lower()) if len(t) > 1]
+            self.search_hits = [
+                SearchHit(
+                    collection=hit["collection"],
+                    label=hit["label"],
+                    title=_highlight_segments(hit["title"], terms),
+                    snippet=_highlight_segments(hit["text"], terms, SEARCH_SNIPPET_CHARS),
+                    href=SEARCH_RESULT_ROUTES[hit["collection"]],
+                )
+                for hit in db_service.search(self.search_query, self._filter_dept(), SEARCH_RESULT_LIMIT)
+            ]
+        except Exception as e:
+            print(f"[ERROR] Search failed: {e}")
+            self.search_hits = []
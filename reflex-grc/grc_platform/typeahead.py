@@ -0,0 +1,211 @@
+"""In-memory prefix index for type-ahead pickers.
+
+Entries (unified controls, risks, KRIs) sit in one trie per kind. Each entry is
+keyed by its code (CCF ID) and by every word-start suffix of its name, so
+"acc", "access r" and "CCF-AC" all reach "Access Control Policy". Every trie
+node caches the best `TOP_K` entries beneath it, so a lookup walks only
+the typed prefix and never the subtree. Inserts update the caches along
+their paths. Removals recompute an affected node's cache from its children's
+caches, which between them hold every candidate.
+
+Risks and KRIs belong to a department. They are also indexed in one trie per
+department, so a department-scoped lookup still gets a full top-k.
+"""
+import hmac
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Header, HTTPException
+
+TOP_K = 20
+TYPEAHEAD_KINDS = ("control", "risk", "kri")
+TYPEAHEAD_DEPARTMENT_SCOPED = {"risk", "kri"}
+
+# Shared secret required in the X-Typeahead-Token header; the endpoint is disabled when unset
+TYPEAHEAD_TOKEN = os.getenv("TYPEAHEAD_TOKEN", "")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _keys(code: str, name: str) -> List[str]:
+    """Index keys of an entry: the code plus each word-start suffix of the name"""
+    keys = [normalize(code)] if code else []
+    words = normalize(name).split()
+    keys.extend(" ".join(words[i:]) for i in range(len(words)))
+    return list(dict.fromkeys(k for k in keys if k))
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: set = set()  # entries whose key ends here
+        self.top: List[Tuple] = []  # best TOP_K sort keys in this subtree
+
+
+class PrefixTrie:
+    """Trie of (code, name) entries with a cached top-k per node"""
+
+    def __init__(self):
+        self._root = _Node()
+        self._entries: Dict[str, Dict] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _sort_key(entry: Dict) -> Tuple:
+        # Codes sort naturally (CCF-AC-001 < CCF-AC-002); entries without one follow, by name
+        return (not entry["code"], entry["code"].lower(), entry["name"].lower(), entry["id"])
+
+    def add(self, entry: Dict):
+        """Insert or replace an entry {id, code, name}"""
+        self.remove(entry["id"])
+        self._entries[entry["id"]] = entry
+        key = self._sort_key(entry)
+        for text in _keys(entry["code"], entry["name"]):
+            node = self._root
+            self._offer(node, key)
+            for ch in text:
+                node = node.children.setdefault(ch, _Node())
+                self._offer(node, key)
+            node.entries.add(key)
+
+    def remove(self, entry_id: str):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        key = self._sort_key(entry)
+        for text in _keys(entry["code"], entry["name"]):
+            path = [self._root]
+            for ch in text:
+                path.append(path[-1].children[ch])
+            path[-1].entries.discard(key)
+            # Bottom-up, so each parent is recomputed from already-corrected children
+            for depth in range(len(path) - 1, -1, -1):
+                node = path[depth]
+                if key in node.top:
+                    self._recompute(node)
+                if depth and not node.top and not node.children:
+                    del path[depth - 1].children[text[depth - 1]]
+
+    def lookup(self, prefix: str, limit: int = TOP_K) -> List[Dict]:
+        node = self._root
+        for ch in normalize(prefix):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [self._entries[key[-1]] for key in node.top[:limit]]
+
+    @staticmethod
+    def _offer(node: _Node, key: Tuple):
+        top = node.top
+        if key in top or (len(top) >= TOP_K and key >= top[-1]):
+            return
+        # Keep sorted; lists are at most TOP_K long
+        i = len(top)
+        while i and top[i - 1] > key:
+            i -= 1
+        top.insert(i, key)
+        del top[TOP_K:]
+
+    @staticmethod
+    def _recompute(node: _Node):
+        candidates = set(node.entries)
+        for child in node.children.values():
+            candidates.update(child.top)
+        node.top = sorted(candidates)[:TOP_K]
+
+
+class TypeaheadIndex:
+    """Per-kind prefix tries over unified controls, risks and KRIs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tries = {kind: PrefixTrie() for kind in TYPEAHEAD_KINDS}
+        # Department-scoped kinds: kind -> department -> trie of that department's entries
+        self._dept_tries: Dict[str, Dict[str, PrefixTrie]] = {kind: {} for kind in TYPEAHEAD_DEPARTMENT_SCOPED}
+
+    def build(self, kind: str, docs: Iterable[Dict]):
+        trie = PrefixTrie()
+        dept_tries: Dict[str, PrefixTrie] = {}
+        for doc in docs:
+            entry = self._entry(kind, doc)
+            trie.add(entry)
+            if kind in TYPEAHEAD_DEPARTMENT_SCOPED and doc.get("department"):
+                dept_tries.setdefault(doc["department"], PrefixTrie()).add(entry)
+        with self._lock:
+            self._tries[kind] = trie
+            if kind in TYPEAHEAD_DEPARTMENT_SCOPED:
+                self._dept_tries[kind] = dept_tries
+
+    def add(self, kind: str, doc: Dict):
+        entry = self._entry(kind, doc)
+        with self._lock:
+            self._tries[kind].add(entry)
+            if kind in TYPEAHEAD_DEPARTMENT_SCOPED:
+                for trie in self._dept_tries[kind].values():  # the department may have changed
+                    trie.remove(entry["id"])
+                if doc.get("department"):
+                    self._dept_tries[kind].setdefault(doc["department"], PrefixTrie()).add(entry)
+
+    def remove(self, kind: str, doc_id: str):
+        with self._lock:
+            self._tries[kind].remove(doc_id)
+            for trie in self._dept_tries.get(kind, {}).values():
+                trie.remove(doc_id)
+
+    def lookup(self, prefix: str, kinds: Optional[Iterable[str]] = None, limit: int = TOP_K,
+               department: Optional[str] = None) -> List[Dict]:
+        """Up to `limit` matches for `prefix`; with several kinds, each kind's best come first in turn.
+
+        With `department`, risks and KRIs are limited to that department's.
+        """
+        if not normalize(prefix):
+            return []
+        limit = min(limit, TOP_K)
+        with self._lock:
+            per_kind = [self._trie(k, department).lookup(prefix, limit) for k in (kinds or TYPEAHEAD_KINDS)]
+        merged = []
+        for rank in range(limit):
+            merged.extend(matches[rank] for matches in per_kind if rank < len(matches))
+        return merged[:limit]
+
+    def _trie(self, kind: str, department: Optional[str]) -> PrefixTrie:
+        if department and kind in TYPEAHEAD_DEPARTMENT_SCOPED:
+            return self._dept_tries[kind].get(department) or PrefixTrie()
+        return self._tries[kind]
+
+    @staticmethod
+    def _entry(kind: str, doc: Dict) -> Dict:
+        return {
+            "kind": kind,
+            "id": doc.get("id", ""),
+            "code": doc.get("ccf_id", "") if kind == "control" else "",
+            "name": doc.get("name", ""),
+        }
+
+
+def typeahead_matches(q: str = "", kinds: str = "", limit: int = TOP_K, department: str = "",
+                      x_typeahead_token: str = Header("")):
+    """GET /typeahead?q=acc&kinds=control,risk&department=IT - top matches for one keystroke"""
+    from .database import db_service
+
+    if not TYPEAHEAD_TOKEN:
+        raise HTTPException(status_code=503, detail="Type-ahead is not configured")
+    if not hmac.compare_digest(x_typeahead_token.encode("utf-8"), TYPEAHEAD_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid type-ahead token")
+    selected = [k.strip() for k in kinds.split(",") if k.strip()] or None
+    unknown = [k for k in selected or [] if k not in TYPEAHEAD_KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(unknown)}")
+    if not 1 <= limit <= TOP_K:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {TOP_K}")
+    return {"matches": db_service.typeahead(q, selected, limit, department or None)}
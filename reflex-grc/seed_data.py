@@ -2,7 +2,7 @@
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
 import hashlib
 
@@ -17,7 +17,7 @@ def hash_password(password: str) -> str:
 
 def seed_database():
     """Seed the database with comprehensive GRC data"""
-    client = MongoClient(MONGO_URL)
+    client = MongoClient(MONGO_URL, tz_aware=True)
     db = client[DB_NAME]
     
     print("🗑️  Clearing existing data...")
@@ -32,7 +32,9 @@ def seed_database():
     db.users.delete_many({})
     db.ai_models.delete_many({})
     db.ai_assessments.delete_many({})
-    db.audit_logs.delete_many({})
+    for name in db.list_collection_names():
+        if name.startswith("audit_logs"):
+            db.drop_collection(name)
     db.connectors.delete_many({})
     
     # ========== USERS ==========
@@ -44,7 +46,7 @@ def seed_database():
             "password": hash_password("admin123"),
             "name": "Admin User",
             "role": "admin",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "user-auditor",
@@ -52,7 +54,7 @@ def seed_database():
             "password": hash_password("auditor123"),
             "name": "John Auditor",
             "role": "auditor",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "user-analyst",
@@ -60,7 +62,7 @@ def seed_database():
             "password": hash_password("analyst123"),
             "name": "Jane Analyst",
             "role": "analyst",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     db.users.insert_many(users)
@@ -465,7 +467,7 @@ def seed_database():
             "type": "cloud",
             "provider": "AWS",
             "status": "Connected",
-            "last_sync": datetime.utcnow().isoformat(),
+            "last_sync": datetime.now(timezone.utc),
             "controls_covered": ["CCF-AC-001", "CCF-DP-001", "CCF-VM-001"],
             "config": {"region": "us-east-1", "account_id": "***hidden***"}
         },
@@ -475,7 +477,7 @@ def seed_database():
             "type": "code",
             "provider": "GitHub",
             "status": "Connected",
-            "last_sync": datetime.utcnow().isoformat(),
+            "last_sync": datetime.now(timezone.utc),
             "controls_covered": ["CCF-VM-001"],
             "config": {"org": "your-org", "repos": ["main-app", "api-service"]}
         },
@@ -516,7 +518,7 @@ def seed_database():
             "result": "Pass",
             "evidence": "aws-security-hub-report-2024.pdf",
             "notes": "All IAM policies compliant with least privilege principle",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -529,7 +531,7 @@ def seed_database():
             "result": "Pass",
             "evidence": "access-review-q4-2024.xlsx",
             "notes": "Quarterly access review completed. 3 stale accounts removed.",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -542,7 +544,7 @@ def seed_database():
             "result": "Pass",
             "evidence": "encryption-status-report.json",
             "notes": "All S3 buckets encrypted, RDS encryption enabled",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -555,7 +557,7 @@ def seed_database():
             "result": "Partial",
             "evidence": "ai-governance-assessment.pdf",
             "notes": "AI inventory complete but risk assessments pending for 2 models",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -568,7 +570,7 @@ def seed_database():
             "result": "Fail",
             "evidence": "dependabot-alerts.json",
             "notes": "3 critical vulnerabilities found in dependencies",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -581,7 +583,7 @@ def seed_database():
             "result": "Pass",
             "evidence": "dr-test-results-2024.pdf",
             "notes": "Annual DR test successful. RTO: 2 hours, RPO: 15 minutes",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     db.control_tests.insert_many(control_tests)
@@ -598,7 +600,7 @@ def seed_database():
             "control_id": "ctrl-006",
             "assigned_to": "Security Team",
             "due_date": (datetime.utcnow() + timedelta(days=3)).strftime("%Y-%m-%d"),
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -609,7 +611,7 @@ def seed_database():
             "control_id": "ctrl-004",
             "assigned_to": "AI Ethics Board",
             "due_date": (datetime.utcnow() + timedelta(days=7)).strftime("%Y-%m-%d"),
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -620,7 +622,7 @@ def seed_database():
             "control_id": "ctrl-002",
             "assigned_to": "IT Operations",
             "due_date": (datetime.utcnow() + timedelta(days=1)).strftime("%Y-%m-%d"),
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -631,7 +633,7 @@ def seed_database():
             "control_id": "ctrl-001",
             "assigned_to": "CISO",
             "due_date": (datetime.utcnow() - timedelta(days=10)).strftime("%Y-%m-%d"),
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     db.issues.insert_many(issues)
@@ -651,7 +653,7 @@ def seed_database():
             "treatment": "Mitigate",
             "kri_ids": ["kri-001", "kri-002"],
             "linked_control_ids": ["ctrl-001", "ctrl-002", "ctrl-003"],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "risk-002",
@@ -665,7 +667,7 @@ def seed_database():
             "treatment": "Mitigate",
             "kri_ids": ["kri-003"],
             "linked_control_ids": ["ctrl-004", "ctrl-005"],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "risk-003",
@@ -679,7 +681,7 @@ def seed_database():
             "treatment": "Mitigate",
             "kri_ids": ["kri-004"],
             "linked_control_ids": ["ctrl-001", "ctrl-003"],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "risk-004",
@@ -693,7 +695,7 @@ def seed_database():
             "treatment": "Mitigate",
             "kri_ids": ["kri-005"],
             "linked_control_ids": ["ctrl-007"],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     db.risks.insert_many(risks)
@@ -714,7 +716,7 @@ def seed_database():
             "frequency": "Daily",
             "owner": "Security Team",
             "kci_ids": ["kci-001"],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "kri-002",
@@ -729,7 +731,7 @@ def seed_database():
             "frequency": "Weekly",
             "owner": "Security Team",
             "kci_ids": ["kci-002"],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "kri-003",
@@ -744,7 +746,7 @@ def seed_database():
             "frequency": "Weekly",
             "owner": "AI Ethics Board",
             "kci_ids": ["kci-003"],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "kri-004",
@@ -759,7 +761,7 @@ def seed_database():
             "frequency": "Weekly",
             "owner": "Compliance Officer",
             "kci_ids": ["kci-004"],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "kri-005",
@@ -774,7 +776,7 @@ def seed_database():
             "frequency": "Monthly",
             "owner": "IT Operations",
             "kci_ids": ["kci-005"],
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     db.kris.insert_many(kris)
@@ -795,7 +797,7 @@ def seed_database():
             "unit": "Percentage",
             "frequency": "Quarterly",
             "owner": "IT Operations",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "kci-002",
@@ -810,7 +812,7 @@ def seed_database():
             "unit": "Percentage",
             "frequency": "Weekly",
             "owner": "Security Team",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "kci-003",
@@ -825,7 +827,7 @@ def seed_database():
             "unit": "Percentage",
             "frequency": "Monthly",
             "owner": "AI Ethics Board",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "kci-004",
@@ -840,7 +842,7 @@ def seed_database():
             "unit": "Percentage",
             "frequency": "Annual",
             "owner": "Compliance Officer",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "kci-005",
@@ -855,7 +857,7 @@ def seed_database():
             "unit": "Percentage",
             "frequency": "Annual",
             "owner": "IT Operations",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     db.kcis.insert_many(kcis)
@@ -882,7 +884,7 @@ def seed_database():
             "has_human_oversight": True,
             "pii_involved": True,
             "automated_decisions": False,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "ai-model-002",
@@ -903,7 +905,7 @@ def seed_database():
             "has_human_oversight": True,
             "pii_involved": True,
             "automated_decisions": True,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "ai-model-003",
@@ -924,7 +926,7 @@ def seed_database():
             "has_human_oversight": True,
             "pii_involved": True,
             "automated_decisions": False,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "ai-model-004",
@@ -945,7 +947,7 @@ def seed_database():
             "has_human_oversight": False,
             "pii_involved": False,
             "automated_decisions": True,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     db.ai_models.insert_many(ai_models)
@@ -976,7 +978,7 @@ def seed_database():
                 "Deploy SHAP explanations for customer service team"
             ],
             "next_review": "2025-05-20",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": "assess-002",
@@ -1001,7 +1003,7 @@ def seed_database():
                 "Quarterly bias audits for protected groups"
             ],
             "next_review": "2025-03-05",
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     db.ai_assessments.insert_many(ai_assessments)
@@ -1011,7 +1013,7 @@ def seed_database():
     audit_logs = [
         {
             "id": str(uuid.uuid4()),
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc),
             "user_id": "user-admin",
             "user_email": "admin@grcplatform.com",
             "action": "LOGIN",
@@ -1021,7 +1023,7 @@ def seed_database():
         },
         {
             "id": str(uuid.uuid4()),
-            "timestamp": (datetime.utcnow() - timedelta(hours=2)).isoformat(),
+            "timestamp": (datetime.now(timezone.utc) - timedelta(hours=2)),
             "user_id": "user-admin",
             "user_email": "admin@grcplatform.com",
             "action": "UPDATE",
@@ -1031,7 +1033,7 @@ def seed_database():
         },
         {
             "id": str(uuid.uuid4()),
-            "timestamp": (datetime.utcnow() - timedelta(hours=5)).isoformat(),
+            "timestamp": (datetime.now(timezone.utc) - timedelta(hours=5)),
             "user_id": "user-auditor",
             "user_email": "auditor@grcplatform.com",
             "action": "CREATE",
@@ -1041,7 +1043,7 @@ def seed_database():
         },
         {
             "id": str(uuid.uuid4()),
-            "timestamp": (datetime.utcnow() - timedelta(days=1)).isoformat(),
+            "timestamp": (datetime.now(timezone.utc) - timedelta(days=1)),
             "user_id": "user-analyst",
             "user_email": "analyst@grcplatform.com",
             "action": "VIEW",
@@ -1050,7 +1052,13 @@ def seed_database():
             "ip_address": "192.168.1.110"
         }
     ]
-    db.audit_logs.insert_many(audit_logs)
+    # Audit logs are partitioned by month (audit_logs_YYYY_MM), see grc_platform/database.py
+    by_partition = {}
+    for log in audit_logs:
+        ts = log["timestamp"]
+        by_partition.setdefault(f"audit_logs_{ts.year:04d}_{ts.month:02d}", []).append(log)
+    for name, logs in by_partition.items():
+        db[name].insert_many(logs)
     
     print("\n" + "="*50)
     print("✅ Database seeding completed!")
@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The API modules import each other as top-level modules (`from live import ...`),
+# and the Reflex helpers live in the grc_platform package
+for path in (ROOT / "backend", ROOT / "reflex-grc"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,112 @@
+import math
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from automap import AutoMapper, TfidfIndex, tokenize, top_k_cosine
+
+W = math.log(3 / 2) + 1  # smoothed idf of a term in one of two documents
+
+
+def test_tokenize_drops_stop_words_and_adds_bigrams():
+    assert tokenize("Review of the Access logs") == ["review", "access", "logs", "review access", "access logs"]
+
+
+def test_weights_and_cosine_match_hand_computation():
+    index = TfidfIndex(["alpha beta", "alpha gamma"])
+    assert list(index.vocabulary) == ["alpha", "alpha beta", "alpha gamma", "beta", "gamma"]
+    np.testing.assert_allclose(index.idf, [1, W, W, W, W])
+
+    norm = math.sqrt(1 + 2 * W ** 2)
+    np.testing.assert_allclose(index.matrix.toarray(), [
+        [1 / norm, W / norm, 0, W / norm, 0],
+        [1 / norm, 0, W / norm, 0, W / norm],
+    ])
+    cosine = (index.matrix @ index.matrix.T).toarray()
+    np.testing.assert_allclose(cosine, [[1, 1 / norm ** 2], [1 / norm ** 2, 1]])
+
+
+def test_sublinear_term_frequency_and_unseen_terms():
+    index = TfidfIndex(["alpha beta", "alpha gamma"])
+    row = index.transform(["beta beta delta"]).toarray()[0]
+    # Only "beta" is in the vocabulary; a single term normalises to 1 whatever its count
+    np.testing.assert_allclose(row, [0, 0, 0, 1, 0])
+    assert index.transform(["delta epsilon"]).nnz == 0
+
+
+def normalized(rows):
+    m = np.asarray(rows, dtype=np.float64)
+    return sparse.csr_matrix(m / np.linalg.norm(m, axis=1, keepdims=True))
+
+
+def test_top_k_orders_best_first_and_breaks_ties_by_row():
+    corpus = normalized([[1, 0], [0, 1], [1, 1], [1, 0], [0, 1]])
+    queries = normalized([[1, 0], [0, 1], [1, 1]])
+    idx, scores = top_k_cosine(queries, corpus, 3, batch_size=2)
+    assert idx.tolist() == [[0, 3, 2], [1, 4, 2], [2, 0, 1]]
+    np.testing.assert_allclose(scores, [[1, 1, 1 / math.sqrt(2)]] * 2 + [[1, 1 / math.sqrt(2), 1 / math.sqrt(2)]])
+
+
+def test_top_k_matches_full_sort_on_random_data():
+    rng = np.random.default_rng(0)
+    corpus = normalized(rng.integers(0, 3, (200, 12)) + 0.0 + (np.arange(12) == 0))
+    queries = normalized(rng.integers(0, 3, (30, 12)) + 0.0 + (np.arange(12) == 0))
+    idx, scores = top_k_cosine(queries, corpus, 7, batch_size=8)
+    full = (queries @ corpus.T).toarray()
+    for q in range(30):
+        expected = sorted(range(200), key=lambda c: (-full[q, c], c))[:7]
+        assert idx[q].tolist() == expected
+        np.testing.assert_allclose(scores[q], full[q, expected])
+
+
+def test_top_k_larger_than_corpus():
+    idx, scores = top_k_cosine(normalized([[1, 0]]), normalized([[1, 1], [1, 0]]), 5)
+    assert idx.tolist() == [[1, 0]]
+    assert top_k_cosine(normalized([[1, 0]]), sparse.csr_matrix((0, 2)), 5)[0].shape == (1, 0)
+
+
+CONTROLS = [
+    {"id": "uc1", "ccf_id": "CCF-AC-001", "name": "User access review", "description": "Quarterly review of user access rights"},
+    {"id": "uc2", "ccf_id": "CCF-AC-002", "name": "Access review for admins", "description": "Review privileged access"},
+    {"id": "uc3", "ccf_id": "CCF-BK-001", "name": "Backups", "description": "Encrypted nightly backups tested monthly"},
+]
+FRAMEWORK_CONTROLS = [
+    {"id": "fc1", "control_id": "A.9.2.5", "title": "Review of user access rights", "description": "Owners review user access"},
+    {"id": "fc2", "control_id": "A.12.3", "title": "Information backup", "description": "Backups are tested"},
+]
+
+
+@pytest.fixture
+def mapper():
+    m = AutoMapper()
+    m.fit(CONTROLS, version=3)
+    return m
+
+
+def candidate_ids(result):
+    return [c["unified_control_id"] for c in result["candidates"]]
+
+
+def test_suggest_ranks_related_controls(mapper):
+    assert mapper.is_current(3) and not mapper.is_current(4)
+    access, backup = mapper.suggest(FRAMEWORK_CONTROLS, top_k=2)
+    assert candidate_ids(access) == ["uc1", "uc2"]
+    assert candidate_ids(backup) == ["uc3"]  # the others fall below min_score
+    assert access["control_id"] == "A.9.2.5"
+    scores = [c["score"] for c in access["candidates"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_suggest_leaves_out_mapped_controls(mapper):
+    [access] = mapper.suggest(FRAMEWORK_CONTROLS[:1], top_k=1, mapped={"fc1": {"uc1"}})
+    assert candidate_ids(access) == ["uc2"]
+    [access] = mapper.suggest(FRAMEWORK_CONTROLS[:1], top_k=3, min_score=0, mapped={"fc1": {"uc1", "uc2"}})
+    assert candidate_ids(access) == ["uc3"]
+
+
+def test_suggest_without_framework_controls_or_fit(mapper):
+    # An empty or unknown framework id finds no framework controls
+    assert mapper.suggest([]) == []
+    assert AutoMapper().suggest([]) == []
+    assert AutoMapper().suggest(FRAMEWORK_CONTROLS[:1]) == [{"framework_control_id": "fc1", "candidates": []}]
@@ -0,0 +1,79 @@
+import random
+
+from grc_platform.coverage import CoverageMatrix
+
+FRAMEWORKS = [
+    {"name": "ISO 27001", "controls": [{"id": f"A.{i}"} for i in range(12)]},
+    {"name": "SOC 2", "controls": [{"id": f"CC{i}"} for i in range(9)]},
+]
+
+
+def random_controls(rng, count):
+    controls = []
+    for i in range(count):
+        mappings = []
+        for fw in FRAMEWORKS:
+            for req in rng.sample(fw["controls"], rng.randint(0, 3)):
+                mappings.append({"framework": fw["name"], "control_id": req["id"]})
+        controls.append({"ccf_id": f"CCF-{i:03d}", "name": f"Control {i}", "mapped_framework_controls": mappings})
+    return controls
+
+
+def brute_force_scores(controls, passing):
+    scores = []
+    for fw in FRAMEWORKS:
+        reqs = [r["id"] for r in fw["controls"]]
+        mapped = {m["control_id"] for c in controls for m in c["mapped_framework_controls"] if m["framework"] == fw["name"]}
+        covered = {
+            m["control_id"]
+            for c in controls if c["ccf_id"] in passing
+            for m in c["mapped_framework_controls"] if m["framework"] == fw["name"]
+        }
+        scores.append({
+            "framework": fw["name"],
+            "total": len(reqs),
+            "mapped": len(mapped),
+            "covered": len(covered),
+            "pct_covered": round(100 * len(covered) / len(reqs)),
+        })
+    return scores
+
+
+def test_framework_scores_match_brute_force():
+    rng = random.Random(3)
+    controls = random_controls(rng, 70)  # more than one packed byte of columns, forcing growth
+    matrix = CoverageMatrix()
+    matrix.build(FRAMEWORKS, controls)
+    for _ in range(20):
+        passing = {c["ccf_id"] for c in controls if rng.random() < 0.4}
+        assert matrix.framework_scores(passing) == brute_force_scores(controls, passing)
+
+
+def test_update_control_matches_rebuild():
+    rng = random.Random(5)
+    controls = random_controls(rng, 30)
+    matrix = CoverageMatrix()
+    matrix.build(FRAMEWORKS, controls)
+    for i in rng.sample(range(30), 10):
+        controls[i] = random_controls(rng, i + 1)[i]
+        matrix.update_control(controls[i])
+    rebuilt = CoverageMatrix()
+    rebuilt.build(FRAMEWORKS, controls)
+    passing = {c["ccf_id"] for c in controls[::2]}
+    assert matrix.framework_scores(passing) == rebuilt.framework_scores(passing)
+    assert matrix.covered_requirements("SOC 2", passing) == rebuilt.covered_requirements("SOC 2", passing)
+
+
+def test_covered_requirements_counts_passing_controls():
+    controls = [
+        {"ccf_id": "CCF-1", "name": "MFA", "mapped_framework_controls": [{"framework": "SOC 2", "control_id": "CC1"}]},
+        {"ccf_id": "CCF-2", "name": "SSO", "mapped_framework_controls": [{"framework": "SOC 2", "control_id": "CC1"}]},
+    ]
+    matrix = CoverageMatrix()
+    matrix.build(FRAMEWORKS, controls)
+    counts = dict(matrix.covered_requirements("SOC 2", {"CCF-1", "CCF-2"}))
+    assert counts["CC1"] == 2
+    assert counts["CC2"] == 0
+    matrix.remove_control("CCF-2")
+    assert dict(matrix.covered_requirements("SOC 2", {"CCF-1", "CCF-2"}))["CC1"] == 1
+    assert matrix.framework_controls("SOC 2") == [("CCF-1", "MFA")]
@@ -0,0 +1,55 @@
+from dedup import MinHashLSH, build_index, document_text, minhash, shingles, similarity
+
+BASE = "Access to production systems requires multi factor authentication and quarterly access reviews by the system owner"
+
+
+def signature(text):
+    return minhash(shingles(text))
+
+
+def jaccard(a, b):
+    sa, sb = set(shingles(a).tolist()), set(shingles(b).tolist())
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_signature_estimates_jaccard():
+    other = BASE.replace("quarterly", "annual")
+    assert abs(similarity(signature(BASE), signature(other)) - jaccard(BASE, other)) < 0.15
+    assert similarity(signature(BASE), signature(BASE)) == 1.0
+
+
+def test_query_finds_near_duplicates_only():
+    docs = [
+        {"id": "a", "name": "Access control", "description": BASE},
+        {"id": "b", "name": "Access control", "description": BASE + " where possible"},
+        {"id": "c", "name": "Backups", "description": "Nightly encrypted backups are restored and tested every month"},
+    ]
+    index = build_index(docs, ("name", "description"))
+    matches = index.query(signature(document_text(docs[0], ("name", "description"))), exclude="a")
+    assert [key for key, _ in matches] == ["b"]
+
+
+def test_remove_and_re_add():
+    index = MinHashLSH(threshold=0.5)
+    index.add("a", signature(BASE))
+    index.add("b", signature(BASE))
+    index.remove("b")
+    assert index.query(signature(BASE)) == [("a", 1.0)]
+    index.add("a", signature("completely unrelated text about vendor onboarding questionnaires"))
+    assert index.query(signature(BASE)) == []
+    assert len(index) == 1
+
+
+def test_clusters_group_connected_pairs():
+    index = MinHashLSH(threshold=0.6)
+    for key in ("x", "y", "z"):
+        index.add(key, signature(BASE))
+    index.add("w", signature("Vendors complete a security questionnaire before onboarding and annually after"))
+    clusters = index.clusters()
+    assert [c["members"] for c in clusters] == [["x", "y", "z"]]
+    assert clusters[0]["max_score"] == 1.0
+
+
+def test_blank_documents_are_not_indexed():
+    index = build_index([{"id": "a", "name": "", "description": None}], ("name", "description"))
+    assert len(index) == 0
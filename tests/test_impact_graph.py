@@ -0,0 +1,105 @@
+import random
+
+from impact_graph import ImpactGraph, summarize
+
+
+def register():
+    return {
+        "unified_controls": [
+            {"id": "uc1", "ccf_id": "CCF-AC-001", "mapped_framework_controls": ["fc1", "fc2"], "mapped_policies": ["p1"]},
+            {"id": "uc2", "ccf_id": "CCF-BK-001", "mapped_framework_controls": ["fc3"]},
+        ],
+        "framework_controls": [
+            {"id": "fc1", "control_id": "A.9.1", "framework_id": "iso"},
+            {"id": "fc2", "control_id": "CC6.1", "framework_id": "soc2"},
+            {"id": "fc3", "control_id": "A.12.3", "framework_id": "iso"},
+        ],
+        "frameworks": [{"id": "iso", "name": "ISO 27001"}, {"id": "soc2", "name": "SOC 2"}],
+        "policies": [{"id": "p1", "policy_id": "POL-1", "name": "Access policy"}],
+        "risks": [{"id": "r1", "name": "Unauthorized access", "linked_control_ids": ["uc1", "uc2"], "kri_ids": ["kri1"]}],
+        "kris": [{"id": "kri1", "name": "Failed logins", "risk_id": "r1", "kci_ids": ["kci1"]}],
+        "kcis": [{"id": "kci1", "name": "MFA coverage", "kri_id": "kri1", "unified_control_id": "uc1"}],
+    }
+
+
+def reached(impact):
+    """Affected nodes with their depths; `via` may name any parent on a shortest path"""
+    return {kind: sorted((n["id"], n["depth"]) for n in nodes) for kind, nodes in impact["affected"].items()}
+
+
+def affected_ids(impact):
+    return {kind: sorted(n["id"] for n in nodes) for kind, nodes in impact["affected"].items()}
+
+
+def test_failure_propagates_along_allowed_directions():
+    graph = ImpactGraph()
+    graph.build(register())
+    impact = graph.impact("uc1")
+    assert affected_ids(impact) == {
+        "framework_control": ["fc1", "fc2"],
+        "framework": ["iso", "soc2"],
+        "policy": ["p1"],
+        "risk": ["r1"],
+        "kci": ["kci1"],
+        "kri": ["kri1"],
+    }
+    # The other control of the same risk is not reached
+    assert "control" not in impact["affected"]
+    assert summarize(impact) == "1 risk, 1 KRI, 1 KCI, 2 framework controls, 2 frameworks (ISO 27001, SOC 2), 1 policy"
+
+
+def test_max_depth_and_unknown_control():
+    graph = ImpactGraph()
+    graph.build(register())
+    assert affected_ids(graph.impact("uc1", max_depth=1)) == {
+        "framework_control": ["fc1", "fc2"], "policy": ["p1"], "risk": ["r1"], "kci": ["kci1"],
+    }
+    assert graph.impact("missing") is None
+
+
+def test_link_stored_on_both_ends_survives_one_removal():
+    graph = ImpactGraph()
+    graph.build(register())
+    graph.upsert("risks", {"id": "r1", "name": "Unauthorized access", "linked_control_ids": ["uc1", "uc2"], "kri_ids": []})
+    assert "kri1" in affected_ids(graph.impact("uc2"))["kri"]  # still linked through kri.risk_id
+    graph.remove("kris", "kri1")
+    assert "kri" not in graph.impact("uc2")["affected"]
+
+
+def random_docs(rng):
+    ids = {kind: [f"{kind}{i}" for i in range(8)] for kind in ("uc", "fc", "fw", "p", "r", "kri", "kci")}
+    pick = lambda kind, k: rng.sample(ids[kind], rng.randint(0, k))
+    return {
+        "unified_controls": [{"id": i, "ccf_id": i.upper(), "mapped_framework_controls": pick("fc", 3), "mapped_policies": pick("p", 2)} for i in ids["uc"]],
+        "framework_controls": [{"id": i, "control_id": i, "framework_id": rng.choice(ids["fw"])} for i in ids["fc"]],
+        "frameworks": [{"id": i, "name": i} for i in ids["fw"]],
+        "policies": [{"id": i, "name": i} for i in ids["p"]],
+        "risks": [{"id": i, "name": i, "linked_control_ids": pick("uc", 3), "kri_ids": pick("kri", 2)} for i in ids["r"]],
+        "kris": [{"id": i, "name": i, "risk_id": rng.choice(ids["r"]), "kci_ids": pick("kci", 2)} for i in ids["kri"]],
+        "kcis": [{"id": i, "name": i, "kri_id": rng.choice(ids["kri"]), "unified_control_id": rng.choice(ids["uc"])} for i in ids["kci"]],
+    }
+
+
+def test_incremental_updates_match_rebuild():
+    rng = random.Random(4)
+    docs = random_docs(rng)
+    graph = ImpactGraph()
+    graph.build(docs)
+    for _ in range(300):
+        replacement = random_docs(rng)
+        collection = rng.choice(list(docs))
+        i = rng.randrange(len(docs[collection]))
+        doc = replacement[collection][i]
+        if rng.random() < 0.2:
+            graph.remove(collection, doc["id"])
+            docs[collection] = [d for d in docs[collection] if d["id"] != doc["id"]]
+        else:
+            graph.upsert(collection, doc)
+            docs[collection] = [d for d in docs[collection] if d["id"] != doc["id"]] + [doc]
+
+    rebuilt = ImpactGraph()
+    rebuilt.build(docs)
+    assert graph._adj == rebuilt._adj
+    assert graph.edge_count == rebuilt.edge_count
+    for doc in docs["unified_controls"]:
+        assert reached(graph.impact(doc["id"])) == reached(rebuilt.impact(doc["id"]))
@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pytest
+
+import quant
+from quant import RiskModels, chunk_sizes, loss_exceedance, simulate
+
+RISKS = [
+    {"id": "breach", "quantification": {"annual_frequency": 0.4, "loss_low": 50_000, "loss_high": 2_000_000}},
+    {"id": "outage", "quantification": {"annual_frequency": 2.5, "loss_low": 5_000, "loss_high": 80_000, "max_loss": 60_000}},
+    {"id": "fraud", "quantification": {"annual_frequency": 0.05, "loss_low": 100_000, "loss_high": 900_000}},
+    {"id": "unquantified", "quantification": None},
+]
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(quant, "CHUNK_CELLS", 5_000)  # several chunks from a small run
+
+
+def test_models_skip_unquantified_and_validate():
+    models = RiskModels.from_risks(RISKS)
+    assert models.risk_ids == ["breach", "outage", "fraud"]
+    assert models.cap.tolist() == [math.inf, 60_000, math.inf]
+    with pytest.raises(ValueError, match="loss_low < loss_high"):
+        RiskModels.from_risks([{"id": "x", "quantification": {"annual_frequency": 1, "loss_low": 10, "loss_high": 5}}])
+    with pytest.raises(ValueError, match="max_loss"):
+        RiskModels.from_risks([{"id": "x", "quantification": {"annual_frequency": 1, "loss_low": 10, "loss_high": 50, "max_loss": 5}}])
+
+
+def test_seeded_run_is_identical_in_process_and_across_workers(small_chunks):
+    models = RiskModels.from_risks(RISKS)
+    assert len(chunk_sizes(20_000, models)) > 4
+    single = simulate(models, 20_000, seed=42, workers=1)
+    assert simulate(models, 20_000, seed=42, workers=3) == single
+    with quant.process_pool(2) as pool:
+        assert simulate(models, 20_000, seed=42, workers=4, pool=pool) == single
+    assert simulate(models, 20_000, seed=43, workers=1) != single
+
+
+def test_estimates_match_the_models(small_chunks):
+    models = RiskModels.from_risks(RISKS[:1])
+    result = simulate(models, 40_000, seed=1)
+    [breach] = result["risks"]
+    # Lognormal mean exp(mu + sigma^2 / 2) times the event rate
+    expected_ale = 0.4 * math.exp(models.mu[0] + models.sigma[0] ** 2 / 2)
+    assert breach["annualized_loss"] == pytest.approx(expected_ale, rel=0.1)
+    assert breach["probability_of_loss"] == pytest.approx(1 - math.exp(-0.4), abs=0.01)
+    assert result["portfolio"]["probability_of_loss"] == breach["probability_of_loss"]
+
+
+def test_cap_bounds_single_event_losses():
+    models = RiskModels.from_risks([RISKS[1]])
+    portfolio, totals, years = quant.simulate_chunk(models, 10_000, np.random.SeedSequence(0))
+    assert totals[0] == pytest.approx(portfolio.sum())
+    events = np.random.default_rng(np.random.SeedSequence(0)).poisson(models.frequency * 10_000)
+    assert totals[0] <= events[0] * 60_000
+
+
+def test_var_and_exceedance_curve():
+    losses = np.sort(np.concatenate([np.zeros(900), np.arange(1, 101, dtype=np.float64) * 1000]))
+    summary = quant.portfolio_summary(losses)
+    assert summary["probability_of_loss"] == 0.1
+    var = summary["value_at_risk"]
+    assert var["0.99"]["var"] <= var["0.99"]["tvar"]
+    assert var["0.9"]["var"] <= var["0.95"]["var"] <= var["0.99"]["var"] <= var["0.999"]["var"]
+    curve = loss_exceedance(losses)
+    probabilities = [p["probability"] for p in curve]
+    assert probabilities == sorted(probabilities, reverse=True)
+    assert curve[0]["loss"] == 1000 and curve[-1]["probability"] == 0
+    assert loss_exceedance(np.zeros(10)) == []
@@ -0,0 +1,115 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from risk_scoring import CONTROL_STRENGTH, MAX_MITIGATION, RiskScorer, residual_scores
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def random_register(rng, n_risks=40, n_controls=25):
+    controls = [f"c{i}" for i in range(n_controls)]
+    risks = [
+        {"id": f"r{i}", "inherent_risk_score": rng.uniform(1, 25), "linked_control_ids": rng.sample(controls, rng.randint(0, 5))}
+        for i in range(n_risks)
+    ]
+    return controls, risks
+
+
+def test_single_control_formula():
+    scorer = RiskScorer()
+    scorer.load([{"id": "r", "inherent_risk_score": 10, "linked_control_ids": ["c"]}],
+                [{"id": "t", "unified_control_id": "c", "result": "Pass", "test_date": NOW}], [])
+    expected = round(10 * (1 - MAX_MITIGATION * CONTROL_STRENGTH), 2)
+    assert scorer.recompute_all() == {"r": expected}
+
+
+def test_incremental_updates_agree_with_batch():
+    rng = random.Random(1)
+    controls, risks = random_register(rng)
+    scorer = RiskScorer()
+    scorer.load(risks, [], [])
+    incremental = {r["id"]: scorer.upsert_risk(r) for r in risks}
+    tests, kcis = [], []
+    for step in range(150):
+        control = rng.choice(controls)
+        if rng.random() < 0.6:
+            test = {"id": f"t{step}", "unified_control_id": control, "result": rng.choice(["Pass", "Partial", "Fail"]),
+                    "test_date": NOW + timedelta(days=step)}
+            tests.append(test)
+            incremental.update(scorer.record_test(control, test["result"], test["test_date"], test["id"]))
+        else:
+            kci = {"id": f"k{rng.randrange(15)}", "unified_control_id": control, "status": rng.choice(["Green", "Amber", "Red"])}
+            kcis = [k for k in kcis if k["id"] != kci["id"]] + [kci]
+            incremental.update(scorer.record_kci(kci))
+        assert incremental == scorer.recompute_all()
+
+    batch = RiskScorer()
+    batch.load(risks, tests, kcis)
+    assert batch.recompute_all() == incremental
+
+
+def test_back_dated_test_is_ignored():
+    scorer = RiskScorer()
+    scorer.load([{"id": "r", "inherent_risk_score": 10, "linked_control_ids": ["c"]}],
+                [{"id": "t1", "unified_control_id": "c", "result": "Pass", "test_date": NOW}], [])
+    before = scorer.recompute_all()
+    assert scorer.record_test("c", "Fail", NOW - timedelta(days=30), "t0") == {}
+    assert scorer.record_test("c", "Fail", (NOW - timedelta(days=1)).replace(tzinfo=None), "t0") == {}
+    assert scorer.recompute_all() == before
+    assert scorer.record_test("c", "Fail", NOW + timedelta(days=1), "t2") == {"r": 10.0}
+
+
+def test_load_keeps_latest_test_in_any_order():
+    tests = [
+        {"id": "new", "unified_control_id": "c", "result": "Pass", "test_date": NOW},
+        {"id": "old", "unified_control_id": "c", "result": "Fail", "test_date": NOW - timedelta(days=5)},
+    ]
+    scorer = RiskScorer()
+    scorer.load([{"id": "r", "inherent_risk_score": 10, "linked_control_ids": ["c"]}], tests, [])
+    assert scorer.recompute_all()["r"] < 10
+    assert scorer.scored_test_control("new") == "c"
+    assert scorer.scored_test_control("old") is None
+
+
+def test_replace_test_falls_back_to_an_older_result():
+    scorer = RiskScorer()
+    scorer.load([{"id": "r", "inherent_risk_score": 10, "linked_control_ids": ["c"]}],
+                [{"id": "t1", "unified_control_id": "c", "result": "Pass", "test_date": NOW}], [])
+    assert scorer.replace_test("c", {"id": "t0", "result": "Partial", "test_date": NOW - timedelta(days=9)}) == {
+        "r": round(10 * (1 - MAX_MITIGATION * CONTROL_STRENGTH * 0.5), 2)
+    }
+    assert scorer.replace_test("c", None) == {"r": 10.0}
+
+
+def test_removals():
+    scorer = RiskScorer()
+    scorer.load([{"id": "r", "inherent_risk_score": 10, "linked_control_ids": ["c"]}], [],
+                [{"id": "k", "unified_control_id": "c", "status": "Green"}])
+    assert scorer.recompute_all()["r"] < 10
+    scorer.remove_kci("k")
+    assert scorer.recompute_all() == {"r": 10.0}
+    scorer.remove_risk("r")
+    assert scorer.recompute_all() == {}
+    assert scorer.record_test("c", "Pass", NOW) == {}
+
+
+def test_residual_scores_scores_many_states_at_once():
+    rng = random.Random(2)
+    controls, risks = random_register(rng, 10, 6)
+    scorer = RiskScorer()
+    scorer.load(risks, [], [])
+    snapshot = scorer.snapshot()
+    states = np.random.default_rng(0).random((len(snapshot["control_ids"]), 4))
+    together = residual_scores(snapshot["inherent"], snapshot["links"], states)
+    for j in range(states.shape[1]):
+        np.testing.assert_array_equal(together[:, j], residual_scores(snapshot["inherent"], snapshot["links"], states[:, j]))
+
+
+@pytest.mark.parametrize("result", ["pass", " PASS ", "Pass"])
+def test_result_matching_is_case_insensitive(result):
+    scorer = RiskScorer()
+    scorer.load([{"id": "r", "inherent_risk_score": 10, "linked_control_ids": ["c"]}], [], [])
+    assert scorer.record_test("c", result, NOW)["r"] < 10
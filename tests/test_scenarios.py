@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from risk_scoring import RiskScorer, residual_scores
+from scenarios import ScenarioModel, control_state
+
+
+def model():
+    scorer = RiskScorer()
+    scorer.load(
+        [
+            {"id": "r1", "inherent_risk_score": 20, "linked_control_ids": ["c1", "c2"]},
+            {"id": "r2", "inherent_risk_score": 10, "linked_control_ids": ["c3"]},
+        ],
+        [{"id": f"t{c}", "unified_control_id": c, "result": "Pass"} for c in ("c1", "c2", "c3")],
+        [],
+    )
+    unified_controls = [
+        {"id": "c1", "mapped_framework_controls": ["fc1"]},
+        {"id": "c2", "mapped_framework_controls": ["fc1", "fc2"]},
+        {"id": "c3", "mapped_framework_controls": ["fc3"]},
+        {"id": "c4", "mapped_framework_controls": []},
+    ]
+    framework_controls = [
+        {"id": "fc1", "framework_id": "iso"},
+        {"id": "fc2", "framework_id": "iso"},
+        {"id": "fc3", "framework_id": "soc2"},
+    ]
+    kcis = [{"kri_id": "k1", "unified_control_id": "c1"}, {"kri_id": "k1", "unified_control_id": "c3"}]
+    names = {"risk": {"r1": "Access", "r2": "Backups"}, "kri": {"k1": "Logins"}, "framework": {"iso": "ISO", "soc2": "SOC 2"}}
+    return scorer, ScenarioModel(scorer.snapshot(), unified_controls, framework_controls, kcis, names)
+
+
+def test_no_change_scenario_matches_baseline():
+    _, m = model()
+    [result] = m.run([{"name": "as is", "control_states": {"c1": "Pass"}}])
+    assert result["risks"]["changed"] == []
+    assert result["risks"]["total_residual"]["delta"] == 0
+    assert result["kris"] == [] and result["frameworks"] == []
+
+
+def test_scenario_residuals_match_direct_scoring():
+    scorer, m = model()
+    [result] = m.run([{"name": "c2 fails", "control_states": {"c2": "Fail", "c3": 0.5}}])
+    effectiveness = m.baseline.copy()
+    effectiveness[m.control_index["c2"]] = 0.0
+    effectiveness[m.control_index["c3"]] = 0.5
+    expected = residual_scores(m.inherent, m.risk_links, effectiveness)
+    scenario = {r["id"]: r["scenario"] for r in result["risks"]["changed"]}
+    assert scenario == {rid: expected[i] for i, rid in enumerate(m.risk_ids)}
+    # Only fc2 depends on c2 alone; fc3 stays covered at Partial
+    assert [(f["id"], f["lost"]) for f in result["frameworks"]] == [("iso", ["fc2"])]
+    assert result["kris"][0]["scenario_control_health"] == 0.75
+
+
+def test_batch_results_match_one_by_one():
+    _, m = model()
+    rng = np.random.default_rng(3)
+    scenarios = [
+        {"name": f"s{i}", "control_states": {c: float(rng.random()) for c in rng.choice(m.control_ids, 2, replace=False)}}
+        for i in range(300)  # more than one SCENARIO_CHUNK
+    ]
+    together = m.run(scenarios)
+    assert together == [m.run([s])[0] for s in scenarios]
+
+
+def test_unknown_controls_and_states_are_rejected():
+    _, m = model()
+    with pytest.raises(ValueError, match="Unknown unified controls: nope"):
+        m.run([{"control_states": {"nope": "Pass"}}])
+    with pytest.raises(ValueError):
+        control_state("Excellent")
+    with pytest.raises(ValueError):
+        control_state(1.5)
+    with pytest.raises(ValueError):
+        control_state(True)
+
+
+def test_baseline_summary():
+    _, m = model()
+    summary = m.baseline_summary()
+    assert [(f["id"], f["covered"], f["requirements"]) for f in summary["frameworks"]] == [("iso", 2, 2), ("soc2", 1, 1)]
@@ -0,0 +1,81 @@
+import random
+
+import search
+from search import SearchIndex, highlight
+
+DOCS = {
+    "unified_controls": [
+        {"id": "uc1", "ccf_id": "CCF-AC-001", "name": "Access reviews", "description": "Quarterly review of user access"},
+        {"id": "uc2", "ccf_id": "CCF-BK-001", "name": "Backups", "description": "Encrypted nightly backups"},
+    ],
+    "risks": [
+        {"id": "r1", "name": "Unauthorized access", "description": "Stale accounts keep access after leaving"},
+    ],
+    "issues": [
+        {"id": "i1", "title": "Backup restore failed", "description": "Restore test failed for the finance database"},
+    ],
+}
+
+
+def ids(hits):
+    return [(h["collection"], h["id"]) for h in hits]
+
+
+def test_finds_matches_across_collections():
+    index = SearchIndex()
+    index.build(DOCS)
+    hits = index.search("access")
+    assert set(ids(hits)) == {("unified_controls", "uc1"), ("risks", "r1")}
+    assert all("<mark>" in h["title"] for h in hits)
+    assert hits[0]["score"] >= hits[1]["score"]
+
+
+def test_title_counts_more_than_body():
+    index = SearchIndex()
+    index.build({"risks": [
+        {"id": "title", "name": "Vendor risk", "description": "Third parties"},
+        {"id": "body", "name": "Third parties", "description": "Vendor risk"},
+    ]})
+    assert [h["id"] for h in index.search("vendor")] == ["title", "body"]
+
+
+def test_collection_filter_and_limit():
+    index = SearchIndex()
+    index.build(DOCS)
+    assert ids(index.search("backup restore", ["issues"])) == [("issues", "i1")]
+    assert len(index.search("backups access", limit=1)) == 1
+    assert index.search("the and of") == []
+
+
+def test_incremental_updates_match_rebuild(monkeypatch):
+    monkeypatch.setattr(search, "COMPACT_MIN_DEAD", 5)  # exercise compaction too
+    rng = random.Random(11)
+    words = "access backup review encryption vendor incident policy password audit restore".split()
+    docs = {}
+    index = SearchIndex()
+    for step in range(200):
+        doc_id = f"d{rng.randrange(40)}"
+        if rng.random() < 0.25:
+            docs.pop(doc_id, None)
+            index.remove("risks", doc_id)
+        else:
+            doc = {"id": doc_id, "name": " ".join(rng.sample(words, 2)), "description": " ".join(rng.choices(words, k=6))}
+            docs[doc_id] = doc
+            index.upsert("risks", doc)
+    rebuilt = SearchIndex()
+    rebuilt.build({"risks": list(docs.values())})
+    assert len(index) == len(rebuilt) == len(docs)
+    for word in words:
+        got = {h["id"]: h["score"] for h in index.search(word, limit=50)}
+        expected = {h["id"]: h["score"] for h in rebuilt.search(word, limit=50)}
+        assert got.keys() == expected.keys()
+        for doc_id, score in expected.items():
+            assert abs(got[doc_id] - score) < 1e-3
+
+
+def test_highlight_escapes_and_windows():
+    assert highlight("<b>Access</b> review", ["access"]) == "&lt;b&gt;<mark>Access</mark>&lt;/b&gt; review"
+    text = "word " * 50 + "access " + "word " * 50
+    snippet = highlight(text, ["access"], max_chars=60)
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert "<mark>access</mark>" in snippet
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from grc_platform.typeahead import TOP_K, PrefixTrie, TypeaheadIndex, _keys, normalize
+
+WORDS = ["access", "account", "audit", "backup", "policy", "privileged", "review", "vendor", "encryption", "key"]
+
+
+def entry(i, rng):
+    code = f"CCF-{rng.choice(['AC', 'AU', 'BK'])}-{i:03d}" if rng.random() < 0.7 else ""
+    return {"id": f"e{i}", "code": code, "name": " ".join(rng.choices(WORDS, k=rng.randint(1, 4)))}
+
+
+def brute_force(entries, prefix, limit=TOP_K):
+    """Every entry with a key starting with the prefix, in the trie's order"""
+    p = normalize(prefix)
+    hits = [e for e in entries.values() if any(k.startswith(p) for k in _keys(e["code"], e["name"]))]
+    hits.sort(key=PrefixTrie._sort_key)
+    return hits[:limit]
+
+
+def prefixes(entries):
+    found = {"a", "ac", "acc", "ccf", "ccf a", "ccf ac", "re", "rev", "vendor k", "x"}
+    for e in entries.values():
+        for key in _keys(e["code"], e["name"]):
+            found.update(key[:n] for n in (1, 2, 3, len(key)))
+    return sorted(found)
+
+
+def test_lookup_matches_brute_force_after_random_updates():
+    rng = random.Random(7)
+    trie, entries = PrefixTrie(), {}
+    for step in range(600):
+        i = rng.randrange(120)
+        if rng.random() < 0.3:
+            trie.remove(f"e{i}")
+            entries.pop(f"e{i}", None)
+        else:
+            e = entry(i, rng)
+            trie.add(e)
+            entries[e["id"]] = e
+        if step % 50 == 0:
+            for prefix in prefixes(entries):
+                assert trie.lookup(prefix) == brute_force(entries, prefix), prefix
+    assert len(trie) == len(entries)
+    for prefix in prefixes(entries):
+        assert trie.lookup(prefix, 5) == brute_force(entries, prefix, 5), prefix
+
+
+def test_word_start_and_code_keys():
+    trie = PrefixTrie()
+    trie.add({"id": "1", "code": "CCF-AC-001", "name": "Access Control Policy"})
+    for prefix in ("acc", "control p", "policy", "CCF-AC", "ccf ac 0"):
+        assert [e["id"] for e in trie.lookup(prefix)] == ["1"], prefix
+    assert trie.lookup("ontrol") == []
+
+
+def test_department_scoped_lookup():
+    index = TypeaheadIndex()
+    index.build("risk", [
+        {"id": f"r{i}", "name": f"Access risk {i:02d}", "department": "IT" if i % 4 else "HR"} for i in range(60)
+    ])
+    hr = index.lookup("access", ["risk"], TOP_K, department="HR")
+    assert len(hr) == 15
+    assert len(index.lookup("access", ["risk"], TOP_K)) == TOP_K
+    index.add("risk", {"id": "r0", "name": "Access risk 00", "department": "IT"})
+    assert "r0" not in {e["id"] for e in index.lookup("access", ["risk"], TOP_K, department="HR")}
+    assert index.lookup("access", ["risk"], TOP_K, department="Legal") == []
+    index.remove("risk", "r4")
+    assert "r4" not in {e["id"] for e in index.lookup("access", ["risk"], TOP_K, department="HR")}
+
+
+def test_controls_are_not_department_scoped():
+    index = TypeaheadIndex()
+    index.build("control", [{"id": "c1", "ccf_id": "CCF-AC-001", "name": "Access reviews", "department": "IT"}])
+    assert [e["id"] for e in index.lookup("acc", ["control"], department="HR")] == ["c1"]
+
+
+def test_merges_kinds_round_robin():
+    index = TypeaheadIndex()
+    index.build("control", [{"id": f"c{i}", "ccf_id": f"CCF-AC-00{i}", "name": "Access"} for i in range(3)])
+    index.build("kri", [{"id": "k1", "name": "Access failures"}])
+    assert [e["id"] for e in index.lookup("access", ["control", "kri"], 3)] == ["c0", "k1", "c1"]
+
+
+@pytest.mark.parametrize("prefix", ["", "  ", "--"])
+def test_blank_prefix_matches_nothing(prefix):
+    index = TypeaheadIndex()
+    index.add("control", {"id": "1", "ccf_id": "CCF-AC-001", "name": "Access"})
+    assert index.lookup(prefix) == []